@@ -34,13 +34,28 @@ class SchedulerStatus(BaseModel):
     error_count: int
     uptime_seconds: float
     next_sync_time: Optional[str] = None  # CORRIGÉ - Le champ peut être None
+    tables_next_due: Dict[str, str] = {}  # Prochaine sync de chaque table (ISO)
+    tables_syncing: List[str] = []
+    change_watcher: Optional[Dict[str, Any]] = None
+    last_sweeps: Dict[str, Dict[str, Any]] = {}
+    last_dead_letter_retries: Dict[str, Dict[str, Any]] = {}
     last_sync_summary: Dict[str, Any]
 
 
+class TransformAnomaly(BaseModel):
+    table_name: str
+    kind: str
+    field: str = ''
+    count: int
+    sample_ids: List[Any] = []
+
+
 class SyncDashboard(BaseModel):
     scheduler: SchedulerStatus
     tables: List[SyncTableStatus]
     stats_24h: SyncStats24h
+    anomalies_24h: List[TransformAnomaly] = []  # Anomalies de transformation agrégées (sync_log)
+    dead_letters: Dict[str, Dict[str, int]] = {}  # Rejets en attente / résolus par table
     generated_at: str
 
 
@@ -122,6 +137,8 @@ async def get_sync_dashboard():
             scheduler=SchedulerStatus(**scheduler_data),
             tables=[SyncTableStatus(**table) for table in tables_data],
             stats_24h=SyncStats24h(**report['stats_24h']),
+            anomalies_24h=[TransformAnomaly(**anomaly) for anomaly in report.get('anomalies_24h', [])],
+            dead_letters=report.get('dead_letters', {}),
             generated_at=report['generated_at']
         )
 
@@ -194,6 +211,12 @@ async def trigger_manual_sync(background_tasks: BackgroundTasks):
                     'table_name': r.table_name,
                     'status': r.status,
                     'records_processed': r.records_processed,
+                    'pages_processed': r.pages_processed,
+                    'rows_per_second': round(r.rows_per_second, 1),
+                    'remaining_lag': r.remaining_lag,
+                    'inserted': r.inserted,
+                    'updated': r.updated,
+                    'unchanged': r.unchanged,
                     'error_message': r.error_message
                 }
                 for r in results
@@ -302,6 +325,138 @@ async def stop_sync_service():
         )
 
 
+@router.post("/initial-load/{table_name}")
+async def start_initial_load(table_name: str, background_tasks: BackgroundTasks,
+                             partitions: Optional[int] = None, restart: bool = False):
+    """
+    Lance (ou reprend) le chargement initial parallèle d'une table
+    """
+    scheduler = get_scheduler_instance()
+
+    if table_name not in scheduler.sync_manager.sync_tables_config:
+        raise HTTPException(status_code=404, detail=f"Table {table_name} non configurée")
+
+    background_tasks.add_task(scheduler.sync_manager.initial_load_table, table_name, partitions, restart)
+
+    return {
+        "status": "started",
+        "message": f"Chargement initial de {table_name} lancé en arrière-plan",
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.post("/sweep/{table_name}")
+async def sweep_table_changes(table_name: str, max_rows: Optional[int] = None):
+    """
+    Balayage immédiat des empreintes: recharge les lignes HFSQL modifiées
+    """
+    scheduler = get_scheduler_instance()
+
+    config = scheduler.sync_manager.sync_tables_config.get(table_name)
+    if config is None or not config.get('content_hash'):
+        raise HTTPException(status_code=404, detail=f"Table {table_name} sans empreintes de contenu")
+
+    result = await scheduler.sync_manager.sweep_table_changes(table_name, max_rows)
+    scheduler.last_sweep_results[table_name] = result
+
+    return {
+        "status": result.status,
+        "rows_scanned": result.rows_scanned,
+        "rows_per_second": round(result.rows_per_second, 1),
+        "changed_rows": result.updated,
+        "missing_rows": result.inserted,
+        "sweep_cursor_id": result.last_sync_id,
+        "duration_ms": result.duration_ms,
+        "error_message": result.error_message,
+        "timestamp": result.timestamp.isoformat()
+    }
+
+
+@router.post("/reconcile/{table_name}")
+async def reconcile_table(table_name: str, repair: bool = True):
+    """
+    Audit par plages d'ID et réparation des seuls IDs en écart
+    """
+    scheduler = get_scheduler_instance()
+
+    if table_name not in scheduler.sync_manager.sync_tables_config:
+        raise HTTPException(status_code=404, detail=f"Table {table_name} non configurée")
+
+    try:
+        return await scheduler.sync_manager.reconcile_table(table_name, repair)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur réconciliation: {str(e)}"
+        )
+
+
+@router.get("/dead-letters")
+async def get_dead_letters(table_name: Optional[str] = None, limit: int = 50):
+    """
+    Rejets en attente et résolus par table, avec les derniers rejets d'une table
+    """
+    scheduler = get_scheduler_instance()
+    dead_letters = scheduler.sync_manager.dead_letters
+
+    if dead_letters is None:
+        raise HTTPException(status_code=404, detail="File des rejets désactivée (SYNC_DEAD_LETTER_ENABLED)")
+
+    try:
+        async with get_async_session_context() as session:
+            response = {"counts": await dead_letters.get_counts(session)}
+            if table_name:
+                response["pending"] = await dead_letters.get_pending_sample(session, table_name, limit)
+
+        response["timestamp"] = datetime.now().isoformat()
+        return response
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur récupération des rejets: {str(e)}"
+        )
+
+
+@router.post("/dead-letters/retry/{table_name}")
+async def retry_dead_letters(table_name: str, batch_size: Optional[int] = None):
+    """
+    Repasse les rejets en attente d'une table dans les transformateurs actuels
+    """
+    scheduler = get_scheduler_instance()
+
+    if table_name not in scheduler.sync_manager.sync_tables_config:
+        raise HTTPException(status_code=404, detail=f"Table {table_name} non configurée")
+
+    try:
+        result = await scheduler.sync_manager.retry_dead_letters(table_name, batch_size)
+        scheduler.last_dead_letter_retries[table_name] = result
+        return result
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur relance des rejets: {str(e)}"
+        )
+
+
+@router.get("/initial-load/{table_name}")
+async def get_initial_load_progress(table_name: str):
+    """
+    Progression du chargement initial, partition par partition
+    """
+    try:
+        scheduler = get_scheduler_instance()
+        return await scheduler.sync_manager.get_initial_load_progress(table_name)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur récupération progression: {str(e)}"
+        )
+
+
 @router.get("/health")
 async def sync_health_check():
     """
@@ -314,17 +469,15 @@ async def sync_health_check():
             "checks": {}
         }
 
-        # 1. Test connecteur HFSQL
+        # 1. Test connecteur HFSQL (ping sur une connexion du pool, sans reconnexion)
         try:
-            from ...utils.hfsql_connector import HFSQLConnector
-            hfsql = HFSQLConnector()
-            hfsql_test = await hfsql.test_connection_step_by_step()
+            from ...utils.hfsql_connector import get_hfsql_pool
+            hfsql_test = await get_hfsql_pool().health_check()
 
             health_status["checks"]["hfsql"] = {
-                "status": "ok" if hfsql_test.get("final_status") == "success" else "error",
+                "status": hfsql_test["status"],
                 "details": hfsql_test
             }
-            hfsql.close()
         except Exception as e:
             health_status["checks"]["hfsql"] = {
                 "status": "error",
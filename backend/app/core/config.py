@@ -17,6 +17,12 @@ class Settings(BaseSettings):
     HFSQL_DATABASE: str = "EASYPHARM" 
     HFSQL_USER: str = "admin"
     HFSQL_PASSWORD: str = "25061986"
+    HFSQL_ODBC_WORKERS: int = 4  # Threads dédiés aux appels pyodbc bloquants
+    HFSQL_POOL_MIN_SIZE: int = 1  # Connexions HFSQL gardées ouvertes en permanence
+    HFSQL_POOL_MAX_SIZE: int = 4  # Connexions HFSQL simultanées maximum
+    HFSQL_POOL_IDLE_TIMEOUT: int = 300  # Fermeture des connexions inactives (secondes)
+    HFSQL_POOL_PING_INTERVAL: int = 30  # Ping avant réutilisation après cette inactivité (secondes)
+    HFSQL_POOL_PING_QUERY: str = "SELECT TOP 1 id FROM nomenclature"
     
     # Security
     SECRET_KEY: str = "synergo-pharm"
@@ -25,8 +31,36 @@ class Settings(BaseSettings):
     
     # Sync
     SYNC_INTERVAL_MINUTES: int = 30
-    SYNC_BATCH_SIZE: int = 1000
+    SYNC_BATCH_SIZE: int = 1000  # Taille de lot par défaut (point de départ du réglage adaptatif)
+    SYNC_BATCH_SIZE_MIN: int = 100
+    SYNC_BATCH_SIZE_MAX: int = 10000
+    SYNC_BATCH_TARGET_SECONDS: float = 2.0  # Durée visée extraction + transformation + chargement par lot
     SYNC_MAX_RETRIES: int = 3
+    SYNC_MAX_ROWS_PER_CYCLE: int = 50000  # Budget de lignes par table et par cycle (mode drain)
+    SYNC_MAX_SECONDS_PER_CYCLE: int = 300  # Budget de temps par table et par cycle (mode drain)
+    SYNC_INITIAL_LOAD_PARTITIONS: int = 4  # Plages d'ID extraites en parallèle au chargement initial
+    SYNC_PIPELINE_DEPTH: int = 2  # Pages extraites/transformées d'avance pendant le chargement
+    SYNC_BULK_LOADER: str = "copy"  # 'copy' (COPY + fusion) ou 'insert' (INSERT ... ON CONFLICT)
+    SYNC_COPY_MIN_ROWS: int = 100  # En dessous, l'INSERT classique reste plus rapide
+    SYNC_WATCH_ENABLED: bool = True  # Sondage MAX(id) entre deux syncs planifiées
+    SYNC_WATCH_POLL_SECONDS: float = 5.0
+    SYNC_WATCH_DEBOUNCE_SECONDS: float = 3.0  # MAX(id) stable depuis ce délai avant de déclencher
+    SYNC_WATCH_MIN_INTERVAL_SECONDS: float = 30.0  # Au plus une sync déclenchée par table sur ce délai
+    SYNC_HASH_SWEEP_INTERVAL_MINUTES: int = 120  # Balayage des empreintes (tables content_hash), 0 = désactivé
+    SYNC_HASH_SWEEP_ROWS: int = 50000  # Lignes relues par table et par balayage
+    SYNC_RECONCILE_FANOUT: int = 16  # Sous-plages par plage divergente
+    SYNC_RECONCILE_LEAF_SIZE: int = 1000  # Taille de plage comparée ID par ID
+    SYNC_SPOOL_ENABLED: bool = True  # Pages HFSQL brutes conservées jusqu'au commit
+    SYNC_SPOOL_DIR: str = "data/spool"
+    SYNC_SPOOL_MAX_MB: int = 512  # Au-delà, les pages ne sont plus spoolées
+    SYNC_TRANSFORM_PROCESS_POOL: bool = True  # Gros lots transformés dans des processus dédiés
+    SYNC_TRANSFORM_WORKERS: int = 0  # Processus de transformation, 0 = nombre de cœurs - 1
+    SYNC_TRANSFORM_PROCESS_MIN_ROWS: int = 5000  # En dessous, transformation dans le processus
+    SYNC_TRANSFORM_CHUNK_MIN_ROWS: int = 2000  # Taille minimale d'une tranche envoyée à un processus
+    SYNC_STRING_CACHE_SIZE: int = 50000  # Chaînes nettoyées mémorisées par cycle, 0 = désactivé
+    SYNC_DEAD_LETTER_ENABLED: bool = True  # Lignes rejetées conservées dans synergo_sync.dead_letter
+    SYNC_DEAD_LETTER_RETRY_BATCH: int = 5000  # Rejets repassés par lot lors d'une relance
+    SYNC_DEAD_LETTER_RETRY_INTERVAL_MINUTES: int = 0  # Relance périodique, 0 = au démarrage seulement
     
     # Logging
     LOG_LEVEL: str = "INFO"
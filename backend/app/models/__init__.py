@@ -1,8 +1,8 @@
 # Mod�les Synergo
-from .sync_models import SyncTable, SyncState, SyncLog
+from .sync_models import SyncTable, SyncState, SyncLog, SyncPartition, DeadLetter
 from .pharma_models import ProductsCatalog, PurchaseOrders, PurchaseDetails, SalesOrders, SalesDetails, CurrentStockCalculated
 
 __all__ = [
-    'SyncTable', 'SyncState', 'SyncLog',
+    'SyncTable', 'SyncState', 'SyncLog', 'SyncPartition', 'DeadLetter',
     'PurchaseOrders', 'ProductsCatalog', 'PurchaseDetails', 'SalesOrders', 'SalesDetails', 'CurrentStockCalculated',
 ]
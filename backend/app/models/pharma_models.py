@@ -26,6 +26,7 @@ class ProductsCatalog(Base):
 
     # Métadonnées sync
     sync_version = Column(Integer, default=1)
+    content_hash = Column(BigInteger)  # Empreinte de la ligne HFSQL (détection des modifications)
     last_synced_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -69,6 +70,7 @@ class PurchaseOrders(Base):
 
     # Métadonnées sync
     sync_version = Column(Integer, default=1)
+    content_hash = Column(BigInteger)  # Empreinte de la ligne HFSQL (détection des modifications)
     last_synced_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -110,6 +112,7 @@ class PurchaseDetails(Base):
 
     # Métadonnées sync
     sync_version = Column(Integer, default=1)
+    content_hash = Column(BigInteger)  # Empreinte de la ligne HFSQL (détection des modifications)
     last_synced_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -165,6 +168,7 @@ class SalesOrders(Base):
 
     # Métadonnées sync
     sync_version = Column(Integer, default=1)
+    content_hash = Column(BigInteger)  # Empreinte de la ligne HFSQL (détection des modifications)
     last_synced_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -214,6 +218,7 @@ class SalesDetails(Base):
 
     # Métadonnées sync
     sync_version = Column(Integer, default=1)
+    content_hash = Column(BigInteger)  # Empreinte de la ligne HFSQL (détection des modifications)
     last_synced_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
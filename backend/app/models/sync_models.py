@@ -1,5 +1,5 @@
 # backend/app/models/sync_models.py
-from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Boolean, Text, DECIMAL
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Boolean, Text, DECIMAL, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -37,6 +37,8 @@ class SyncState(Base):
     last_sync_status = Column(String(20), default='PENDING')
     error_message = Column(Text)
     records_processed_last_sync = Column(Integer, default=0)
+    learned_batch_size = Column(Integer)  # Taille de lot adaptative apprise
+    sweep_cursor_id = Column(BigInteger)  # Dernier ID balayé pour les empreintes de contenu
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
@@ -53,4 +55,48 @@ class SyncLog(Base):
     records_processed = Column(Integer, default=0)
     processing_time_ms = Column(Integer)
     error_details = Column(JSONB)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SyncPartition(Base):
+    """Progression du chargement initial par plages d'ID"""
+    __tablename__ = "sync_partitions"
+    __table_args__ = (
+        UniqueConstraint('table_name', 'partition_index'),
+        {'schema': 'synergo_sync', 'extend_existing': True}
+    )
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(100), nullable=False)
+    partition_index = Column(Integer, nullable=False)
+    range_start = Column(BigInteger, nullable=False)
+    range_end = Column(BigInteger, nullable=False)  # Borne incluse
+    last_loaded_id = Column(BigInteger, nullable=False)  # Point de reprise
+    records_loaded = Column(BigInteger, default=0)
+    status = Column(String(20), default='PENDING')  # 'PENDING', 'RUNNING', 'COMPLETED', 'ERROR'
+    error_message = Column(Text)
+    started_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DeadLetter(Base):
+    """Lignes HFSQL rejetées, conservées brutes pour être rejouées"""
+    __tablename__ = "dead_letter"
+    __table_args__ = (
+        UniqueConstraint('table_name', 'hfsql_id'),
+        {'schema': 'synergo_sync', 'extend_existing': True}
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    table_name = Column(String(100), nullable=False)
+    hfsql_id = Column(BigInteger)  # NULL si la ligne brute n'a pas d'ID exploitable
+    stage = Column(String(20), nullable=False)  # 'TRANSFORM', 'INSERT'
+    reason = Column(Text)
+    raw_data = Column(JSONB, nullable=False)  # Ligne HFSQL brute
+    status = Column(String(20), default='PENDING')  # 'PENDING', 'RESOLVED'
+    retry_count = Column(Integer, default=0)
+    first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_attempt_at = Column(DateTime(timezone=True))
+    resolved_at = Column(DateTime(timezone=True))
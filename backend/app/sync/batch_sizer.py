@@ -0,0 +1,60 @@
+# backend/app/sync/batch_sizer.py
+"""
+Taille de lot adaptative par table
+
+Mesure la durée extraction + transformation + chargement de chaque lot et
+ajuste la taille du suivant pour viser une durée cible: des lots trop petits
+paient le coût fixe des allers-retours HFSQL/PostgreSQL, des lots trop gros
+allongent les transactions et la mémoire par page.
+"""
+from typing import Optional
+from loguru import logger
+
+
+class AdaptiveBatchSizer:
+    """
+    Contrôleur de taille de lot borné
+
+    Le temps moyen par ligne est lissé (moyenne mobile exponentielle) pour
+    ne pas réagir à un lot isolé; chaque ajustement est limité à un facteur
+    max_step_factor par rapport à la taille courante.
+    """
+
+    def __init__(self, initial_size: int, min_size: int = 100, max_size: int = 10000,
+                 target_seconds: float = 2.0, smoothing: float = 0.3, max_step_factor: float = 2.0):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self.max_step_factor = max_step_factor
+
+        self.batch_size = self._clamp(initial_size)
+        self.seconds_per_row: Optional[float] = None
+        self.batches_measured = 0
+
+    def _clamp(self, size: float) -> int:
+        return int(min(max(size, self.min_size), self.max_size))
+
+    def record(self, rows: int, duration_seconds: float) -> int:
+        """Enregistre la mesure d'un lot et retourne la taille du suivant"""
+        if rows <= 0 or duration_seconds <= 0:
+            return self.batch_size
+
+        sample = duration_seconds / rows
+        if self.seconds_per_row is None:
+            self.seconds_per_row = sample
+        else:
+            self.seconds_per_row += self.smoothing * (sample - self.seconds_per_row)
+        self.batches_measured += 1
+
+        ideal_size = self.target_seconds / self.seconds_per_row
+        step_bounded = min(max(ideal_size, self.batch_size / self.max_step_factor),
+                           self.batch_size * self.max_step_factor)
+
+        new_size = self._clamp(step_bounded)
+        if new_size != self.batch_size:
+            logger.debug(f"📏 Taille de lot {self.batch_size} → {new_size} "
+                         f"({self.seconds_per_row * 1000:.2f} ms/ligne, cible {self.target_seconds}s)")
+            self.batch_size = new_size
+
+        return self.batch_size
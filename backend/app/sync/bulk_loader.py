@@ -0,0 +1,151 @@
+# backend/app/sync/bulk_loader.py
+"""
+Chargement PostgreSQL en masse par COPY + fusion ensembliste
+
+L'INSERT ... ON CONFLICT exécuté en executemany envoie une instruction par
+ligne. Ici les lignes transformées sont poussées en un seul flux COPY binaire
+(asyncpg copy_records_to_table) dans une table temporaire, puis fusionnées
+dans la table cible par un unique INSERT ... SELECT ... ON CONFLICT.
+
+Tout se passe dans la transaction de la session: la table temporaire est
+supprimée au commit et le checkpoint de la page reste atomique avec ses données.
+
+La fusion ne réécrit que les lignes dont le contenu a changé: une re-synchro
+(réparation des trous, lots qui se chevauchent) ne produit ni tuple mort ni
+WAL pour les lignes identiques, qui gardent leur last_synced_at.
+"""
+from typing import List, Dict, Any, Optional
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def get_asyncpg_connection(session: AsyncSession) -> Any:
+    """Connexion asyncpg sous-jacente à la session (None si autre pilote)"""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = getattr(raw_connection, 'driver_connection', None)
+    return driver_connection if hasattr(driver_connection, 'copy_records_to_table') else None
+
+
+# Limite de paramètres par requête du protocole PostgreSQL
+MAX_QUERY_PARAMETERS = 32767
+
+
+def dedupe_records(records: List[Dict[str, Any]], conflict_column: str = 'hfsql_id') -> List[Dict[str, Any]]:
+    """
+    Une ligne par clé, dernière occurrence gagnante
+
+    Comme l'executemany ligne à ligne: une même clé deux fois dans un
+    INSERT ... ON CONFLICT ensembliste ferait échouer la fusion.
+    """
+    return list({record[conflict_column]: record for record in records}.values())
+
+
+def build_merge_query(schema: str, table_name: str, columns: List[str], update_columns: List[str],
+                      source: str, conflict_column: str = 'hfsql_id') -> str:
+    """
+    INSERT ... ON CONFLICT DO UPDATE gardé par IS DISTINCT FROM
+
+    La requête renvoie une ligne (inserted, updated); les lignes de la source
+    absentes des deux comptes étaient déjà à jour. xmax = 0 distingue une
+    ligne insérée d'une ligne mise à jour.
+    """
+    target_values = ', '.join(f"target.{col}" for col in update_columns)
+    excluded_values = ', '.join(f"EXCLUDED.{col}" for col in update_columns)
+
+    return f"""
+    WITH merged AS (
+        INSERT INTO {schema}.{table_name} AS target ({', '.join(columns)})
+        {source}
+        ON CONFLICT ({conflict_column}) DO UPDATE SET
+        {', '.join([f"{col} = EXCLUDED.{col}" for col in update_columns])},
+        last_synced_at = CURRENT_TIMESTAMP
+        WHERE ROW({target_values}) IS DISTINCT FROM ROW({excluded_values})
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT COUNT(*) FILTER (WHERE inserted) AS inserted,
+           COUNT(*) FILTER (WHERE NOT inserted) AS updated
+    FROM merged
+    """
+
+
+async def _execute_merge(session: AsyncSession, query: str, params: Optional[Dict[str, Any]],
+                         counts: Dict[str, int]):
+    row = (await session.execute(text(query), params)).fetchone()
+    counts['inserted'] += row[0] or 0
+    counts['updated'] += row[1] or 0
+
+
+def _merge_counts(row_count: int, counts: Dict[str, int]) -> Dict[str, int]:
+    counts['unchanged'] = row_count - counts['inserted'] - counts['updated']
+    return counts
+
+
+async def values_upsert(session: AsyncSession, schema: str, table_name: str, records: List[Dict[str, Any]],
+                        columns: List[str], update_columns: List[str],
+                        conflict_column: str = 'hfsql_id') -> Dict[str, int]:
+    """
+    Fusion par INSERT ... VALUES multi-lignes (petits lots, pilotes sans COPY)
+
+    Les enregistrements doivent être uniques par conflict_column. Découpé pour
+    rester sous la limite de paramètres PostgreSQL.
+    """
+    counts = {'inserted': 0, 'updated': 0}
+    rows_per_query = max(MAX_QUERY_PARAMETERS // len(columns), 1)
+
+    for start in range(0, len(records), rows_per_query):
+        chunk = records[start:start + rows_per_query]
+        params = {}
+        values = []
+        for index, record in enumerate(chunk):
+            placeholders = []
+            for column in columns:
+                params[f"{column}_{index}"] = record.get(column)
+                placeholders.append(f":{column}_{index}")
+            values.append(f"({', '.join(placeholders)})")
+
+        source = f"VALUES {', '.join(values)}"
+        await _execute_merge(session, build_merge_query(schema, table_name, columns, update_columns,
+                                                        source, conflict_column), params, counts)
+
+    return _merge_counts(len(records), counts)
+
+
+async def copy_upsert(session: AsyncSession, schema: str, table_name: str, records: List[Dict[str, Any]],
+                      columns: List[str], update_columns: List[str],
+                      conflict_column: str = 'hfsql_id') -> Optional[Dict[str, int]]:
+    """
+    COPY des enregistrements dans une table de transit puis fusion dans schema.table_name
+
+    Les enregistrements doivent être uniques par conflict_column. Retourne les
+    comptes inserted/updated/unchanged, ou None si la session n'utilise pas
+    asyncpg (l'appelant retombe alors sur values_upsert).
+    """
+    asyncpg_connection = await get_asyncpg_connection(session)
+    if asyncpg_connection is None:
+        return None
+
+    rows = [tuple(record.get(column) for column in columns) for record in records]
+
+    staging_table = f"_staging_{table_name}"
+    column_list = ', '.join(columns)
+
+    # Table de transit aux types exacts des colonnes chargées, sans contraintes
+    # ni valeurs par défaut (pas de séquence consommée), supprimée au commit.
+    # Passer par la session démarre sa transaction avant le COPY asyncpg.
+    await session.execute(text(f"DROP TABLE IF EXISTS pg_temp.{staging_table}"))
+    await session.execute(text(f"""
+    CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+    SELECT {column_list} FROM {schema}.{table_name} WITH NO DATA
+    """))
+
+    await asyncpg_connection.copy_records_to_table(staging_table, records=rows, columns=columns)
+
+    counts = {'inserted': 0, 'updated': 0}
+    source = f"SELECT {column_list} FROM {staging_table}"
+    await _execute_merge(session, build_merge_query(schema, table_name, columns, update_columns,
+                                                    source, conflict_column), None, counts)
+
+    logger.debug(f"📦 COPY {len(rows)} lignes → {schema}.{table_name}")
+    return _merge_counts(len(rows), counts)
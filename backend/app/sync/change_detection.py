@@ -0,0 +1,63 @@
+# backend/app/sync/change_detection.py
+"""
+Détection des modifications HFSQL par empreinte de contenu
+
+La stratégie par ID ne voit que les lignes id > last_sync_id: une correction
+de prix dans nomenclature ou un en-tête de vente modifié n'atteint jamais
+PostgreSQL. Chaque ligne HFSQL reçoit donc une empreinte compacte (BIGINT)
+calculée à l'extraction et stockée dans content_hash à côté de hfsql_id.
+
+Un balayage périodique relit des fenêtres d'ID déjà synchronisées, recalcule
+les empreintes et ne transforme et ne recharge que les lignes dont
+l'empreinte diffère de celle stockée.
+"""
+import hashlib
+from typing import List, Dict, Any, Awaitable, Callable, Iterable, Optional
+
+# Séparateur de champs improbable dans les données ERP
+_FIELD_SEPARATOR = '\x1f'
+
+
+def row_content_hash(record: Dict[str, Any], fields: Iterable[str]) -> int:
+    """Empreinte 64 bits signée (BIGINT PostgreSQL) des champs de la ligne"""
+    payload = _FIELD_SEPARATOR.join(repr(record.get(field)) for field in fields)
+    digest = hashlib.blake2b(payload.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def compute_content_hashes(records: List[Dict[str, Any]], id_field: str) -> Dict[int, int]:
+    """Empreintes par ID HFSQL; l'ordre des champs est fixé une fois par lot"""
+    if not records:
+        return {}
+
+    fields = sorted(records[0])
+    return {int(record[id_field]): row_content_hash(record, fields) for record in records}
+
+
+def attach_content_hashes(records: List[Dict[str, Any]], transformed_records: List[Dict[str, Any]],
+                          id_field: str) -> List[Dict[str, Any]]:
+    """Ajoute content_hash aux enregistrements transformés (jointure sur hfsql_id)"""
+    hashes = compute_content_hashes(records, id_field)
+    for transformed in transformed_records:
+        transformed['content_hash'] = hashes.get(int(transformed['hfsql_id']))
+    return transformed_records
+
+
+def with_content_hashes(transform: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+                        id_field: str) -> Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]:
+    """Enveloppe une transformation de lot pour y joindre les empreintes"""
+
+    async def transform_with_hashes(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return attach_content_hashes(records, await transform(records), id_field)
+
+    return transform_with_hashes
+
+
+def select_changed_records(records: List[Dict[str, Any]], stored_hashes: Dict[int, Optional[int]],
+                           id_field: str) -> List[Dict[str, Any]]:
+    """Lignes HFSQL absentes de PostgreSQL ou dont l'empreinte a changé"""
+    hashes = compute_content_hashes(records, id_field)
+    return [
+        record for record in records
+        if stored_hashes.get(int(record[id_field])) != hashes[int(record[id_field])]
+    ]
@@ -0,0 +1,170 @@
+# backend/app/sync/change_watcher.py
+"""
+Détection rapide des nouvelles lignes HFSQL par sondage MAX(id)
+
+Toutes les quelques secondes, un SELECT MAX(id) par table (une connexion du
+pool pour toute la ronde) est comparé au last_sync_id connu en mémoire. Seules
+les tables qui ont bougé sont synchronisées, sans attendre leur intervalle.
+
+Pour protéger HFSQL:
+- anti-rebond: on attend que MAX(id) soit stable debounce_seconds (rafale de
+  saisies terminée) avant de déclencher, sans dépasser min_interval_seconds
+  d'attente sous un flux continu;
+- fréquence plafonnée: au plus un déclenchement par table toutes les
+  min_interval_seconds.
+"""
+import asyncio
+import time
+from typing import List, Dict, Any, Awaitable, Callable, Optional, Set
+from loguru import logger
+from ..core.config import settings
+
+
+class ChangeWatcher:
+    """
+    Sonde MAX(id) des tables et déclenche une sync ciblée des tables modifiées
+
+    on_change reçoit la liste des tables à synchroniser; record_results()
+    met à jour les last_sync_id connus après chaque sync.
+    """
+
+    def __init__(self, sync_manager, on_change: Callable[[List[str]], Awaitable[Any]],
+                 tables: Optional[List[str]] = None,
+                 poll_seconds: float = None,
+                 debounce_seconds: float = None,
+                 min_interval_seconds: float = None):
+        self.sync_manager = sync_manager
+        self.on_change = on_change
+        self.tables = tables or list(sync_manager.sync_tables_config)
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.SYNC_WATCH_POLL_SECONDS
+        self.debounce_seconds = (debounce_seconds if debounce_seconds is not None
+                                 else settings.SYNC_WATCH_DEBOUNCE_SECONDS)
+        self.min_interval_seconds = (min_interval_seconds if min_interval_seconds is not None
+                                     else settings.SYNC_WATCH_MIN_INTERVAL_SECONDS)
+
+        self.known_ids: Dict[str, int] = {}  # last_sync_id par table
+        self._probed_ids: Dict[str, int] = {}  # MAX(id) HFSQL au dernier sondage
+        self._changed_at: Dict[str, float] = {}  # Dernier mouvement de MAX(id)
+        self._pending_since: Dict[str, float] = {}  # Première détection non encore déclenchée
+        self._triggered_at: Dict[str, float] = {}
+        self._stale_ids: Set[str] = set()  # last_sync_id supposé faux, à relire dans sync_state
+        self.is_running = False
+        self.probe_count = 0
+        self.trigger_count = 0
+
+    def record_results(self, results) -> None:
+        """Met à jour les last_sync_id connus depuis des SyncResult"""
+        for result in results:
+            if result.table_name not in self.known_ids:
+                continue
+            if result.last_sync_id:
+                self.known_ids[result.table_name] = result.last_sync_id
+            elif result.status == 'ERROR':
+                # Échec sans checkpoint (timeout HFSQL...): le MAX(id) supposé
+                # rattrapé par select_changed_tables est faux
+                self._stale_ids.add(result.table_name)
+
+    async def refresh_stale_ids(self) -> None:
+        """Relit dans sync_state le last_sync_id des tables dont la sync a échoué"""
+        if not self._stale_ids:
+            return
+
+        stale_tables, self._stale_ids = self._stale_ids, set()
+        try:
+            last_sync_ids = await self.sync_manager.get_last_sync_ids()
+        except Exception as e:
+            logger.warning(f"⚠️ last_sync_id indisponibles, tables considérées en retard: {e}")
+            last_sync_ids = {}
+
+        for table_name in stale_tables:
+            self.known_ids[table_name] = last_sync_ids.get(table_name, 0)
+
+    async def load_known_ids(self) -> None:
+        """Charge les last_sync_id depuis synergo_sync.sync_state"""
+        last_sync_ids = await self.sync_manager.get_last_sync_ids()
+        for table_name in self.tables:
+            self.known_ids[table_name] = last_sync_ids.get(table_name, 0)
+
+    async def probe(self) -> Dict[str, int]:
+        """MAX(id) HFSQL de chaque table surveillée (0 si indisponible)"""
+        max_ids = {}
+        async with self.sync_manager.hfsql_pool.acquire() as hfsql_connector:
+            for table_name in self.tables:
+                config = self.sync_manager.sync_tables_config[table_name]
+                max_ids[table_name] = await hfsql_connector.get_max_id(config['hfsql_table'],
+                                                                       config.get('id_field', 'id'))
+        self.probe_count += 1
+        return max_ids
+
+    def select_changed_tables(self, max_ids: Dict[str, int], now: float) -> List[str]:
+        """Tables ayant bougé, stables depuis l'anti-rebond et hors plafond de fréquence"""
+        changed_tables = []
+
+        for table_name, max_id in max_ids.items():
+            if max_id <= self.known_ids.get(table_name, 0):
+                self._pending_since.pop(table_name, None)
+                self._probed_ids[table_name] = max_id
+                continue
+
+            if max_id != self._probed_ids.get(table_name):
+                self._changed_at[table_name] = now
+                self._probed_ids[table_name] = max_id
+            self._pending_since.setdefault(table_name, now)
+
+            settled = now - self._changed_at[table_name] >= self.debounce_seconds
+            overdue = now - self._pending_since[table_name] >= self.min_interval_seconds
+            allowed = now - self._triggered_at.get(table_name, float('-inf')) >= self.min_interval_seconds
+
+            if (settled or overdue) and allowed:
+                changed_tables.append(table_name)
+                self._triggered_at[table_name] = now
+                del self._pending_since[table_name]
+                # Considéré comme rattrapé; record_results corrige si la sync échoue
+                self.known_ids[table_name] = max_id
+
+        return changed_tables
+
+    async def run(self) -> None:
+        """Boucle de sondage jusqu'à stop() ou annulation"""
+        self.is_running = True
+        logger.info(f"👀 Surveillance MAX(id) toutes les {self.poll_seconds}s: {', '.join(self.tables)}")
+
+        try:
+            try:
+                await self.load_known_ids()
+            except Exception as e:
+                logger.warning(f"⚠️ last_sync_id indisponibles, référence = premier sondage: {e}")
+
+            while self.is_running:
+                try:
+                    await self.refresh_stale_ids()
+                    max_ids = await self.probe()
+                    for table_name, max_id in max_ids.items():
+                        self.known_ids.setdefault(table_name, max_id)
+
+                    changed_tables = self.select_changed_tables(max_ids, time.monotonic())
+
+                    if changed_tables:
+                        self.trigger_count += 1
+                        logger.info(f"⚡ Nouvelles lignes HFSQL: {', '.join(changed_tables)}")
+                        await self.on_change(changed_tables)
+
+                except Exception as e:
+                    logger.error(f"❌ Erreur sondage MAX(id): {e}")
+
+                await asyncio.sleep(self.poll_seconds)
+
+        finally:
+            self.is_running = False
+
+    def stop(self) -> None:
+        self.is_running = False
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'is_running': self.is_running,
+            'poll_seconds': self.poll_seconds,
+            'probe_count': self.probe_count,
+            'trigger_count': self.trigger_count,
+            'pending_tables': sorted(self._pending_since)
+        }
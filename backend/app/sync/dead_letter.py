@@ -0,0 +1,127 @@
+# backend/app/sync/dead_letter.py
+"""
+File des rejets (dead letters) de la synchronisation
+
+Une ligne HFSQL rejetée par transform_single_record ou par
+_clean_record_for_insert était perdue: last_sync_id avançait quand même et
+elle n'était jamais retentée. Elle est désormais enregistrée, brute et avec
+sa raison, dans synergo_sync.dead_letter, dans la même transaction que le
+checkpoint de sa page. Après correction d'un transformateur, le job de
+relance (SynergoSyncManager.retry_dead_letters) repasse les rejets par
+gros lots dans les transformateurs actuels, sans resynchronisation
+complète.
+
+Les lignes sont stockées en JSON: dates, heures et décimaux reviennent en
+texte, formats que les transformateurs acceptent.
+"""
+import json
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Étapes où une ligne peut être rejetée
+STAGE_TRANSFORM = 'TRANSFORM'
+STAGE_INSERT = 'INSERT'
+
+
+def _hfsql_id(record: Dict[str, Any], id_field: str) -> Optional[int]:
+    try:
+        return int(record.get(id_field))
+    except (TypeError, ValueError):
+        return None
+
+
+class DeadLetterStore:
+    """Accès à synergo_sync.dead_letter (le commit est laissé à l'appelant)"""
+
+    async def add(self, session: AsyncSession, table_name: str, stage: str,
+                  rejected: List[Tuple[Dict[str, Any], str]], id_field: str = 'id') -> int:
+        """Enregistre en une requête groupée des lignes rejetées (ligne brute, raison)"""
+        if not rejected:
+            return 0
+
+        await session.execute(text("""
+        INSERT INTO synergo_sync.dead_letter (table_name, hfsql_id, stage, reason, raw_data)
+        VALUES (:table_name, :hfsql_id, :stage, :reason, :raw_data)
+        ON CONFLICT (table_name, hfsql_id) DO UPDATE SET
+            stage = EXCLUDED.stage,
+            reason = EXCLUDED.reason,
+            raw_data = EXCLUDED.raw_data,
+            status = 'PENDING',
+            resolved_at = NULL,
+            last_seen_at = CURRENT_TIMESTAMP
+        """), [
+            {
+                'table_name': table_name,
+                'hfsql_id': _hfsql_id(record, id_field),
+                'stage': stage,
+                'reason': str(reason)[:500],
+                'raw_data': json.dumps(record, default=str)
+            }
+            for record, reason in rejected
+        ])
+        return len(rejected)
+
+    async def fetch_pending(self, session: AsyncSession, table_name: str, after_id: int,
+                            limit: int) -> List[Dict[str, Any]]:
+        """Rejets en attente suivant after_id (pagination keyset sur l'id du rejet)"""
+        result = await session.execute(text("""
+        SELECT id, hfsql_id, raw_data FROM synergo_sync.dead_letter
+        WHERE table_name = :table_name AND status = 'PENDING' AND id > :after_id
+        ORDER BY id
+        LIMIT :limit
+        """), {'table_name': table_name, 'after_id': after_id, 'limit': limit})
+
+        return [
+            {'id': row[0], 'hfsql_id': row[1],
+             'raw_data': json.loads(row[2]) if isinstance(row[2], str) else row[2]}
+            for row in result.fetchall()
+        ]
+
+    async def mark_resolved(self, session: AsyncSession, letter_ids: List[int]) -> None:
+        if letter_ids:
+            await session.execute(text("""
+            UPDATE synergo_sync.dead_letter
+            SET status = 'RESOLVED', resolved_at = CURRENT_TIMESTAMP, last_attempt_at = CURRENT_TIMESTAMP,
+                retry_count = retry_count + 1
+            WHERE id = ANY(:letter_ids)
+            """), {'letter_ids': letter_ids})
+
+    async def mark_failed(self, session: AsyncSession, failures: List[Tuple[int, str]]) -> None:
+        """Rejets toujours invalides: raison mise à jour, tentative comptée"""
+        if failures:
+            await session.execute(text("""
+            UPDATE synergo_sync.dead_letter
+            SET reason = :reason, last_attempt_at = CURRENT_TIMESTAMP, retry_count = retry_count + 1
+            WHERE id = :letter_id
+            """), [{'letter_id': letter_id, 'reason': str(reason)[:500]} for letter_id, reason in failures])
+
+    async def get_counts(self, session: AsyncSession) -> Dict[str, Dict[str, int]]:
+        """Rejets par table: en attente, résolus"""
+        result = await session.execute(text("""
+        SELECT table_name,
+               COUNT(*) FILTER (WHERE status = 'PENDING') as pending,
+               COUNT(*) FILTER (WHERE status = 'RESOLVED') as resolved
+        FROM synergo_sync.dead_letter
+        GROUP BY table_name
+        ORDER BY table_name
+        """))
+        return {row[0]: {'pending': row[1] or 0, 'resolved': row[2] or 0} for row in result.fetchall()}
+
+    async def get_pending_sample(self, session: AsyncSession, table_name: str,
+                                 limit: int = 50) -> List[Dict[str, Any]]:
+        """Derniers rejets en attente d'une table (diagnostic)"""
+        result = await session.execute(text("""
+        SELECT hfsql_id, stage, reason, retry_count, first_seen_at, last_seen_at
+        FROM synergo_sync.dead_letter
+        WHERE table_name = :table_name AND status = 'PENDING'
+        ORDER BY last_seen_at DESC
+        LIMIT :limit
+        """), {'table_name': table_name, 'limit': limit})
+
+        return [
+            {'hfsql_id': row[0], 'stage': row[1], 'reason': row[2], 'retry_count': row[3],
+             'first_seen_at': row[4].isoformat() if row[4] else None,
+             'last_seen_at': row[5].isoformat() if row[5] else None}
+            for row in result.fetchall()
+        ]
@@ -0,0 +1,90 @@
+# backend/app/sync/pipeline.py
+"""
+Pipeline extraction → transformation → chargement
+
+Les trois étages tournent en parallèle, reliés par des files asyncio bornées:
+pendant que PostgreSQL charge la page N, HFSQL lit déjà la page N+1. La taille
+des files limite l'avance des étages amont (contre-pression) et donc la
+mémoire à quelques pages.
+
+Le chargement reste fait par le consommateur, page par page et dans l'ordre:
+le checkpoint last_sync_id n'avance qu'après le commit de sa page, et les
+pages lues d'avance mais non chargées sont simplement relues au cycle suivant.
+"""
+import asyncio
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Tuple
+
+# Marqueur de fin de flux entre étages
+_END_OF_STREAM = object()
+
+
+class _StageError:
+    """Erreur d'un étage amont, relancée côté consommateur"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class SyncPipeline:
+    """
+    Exécute extraction et transformation en tâches de fond
+
+    run() produit des couples (enregistrements HFSQL, résultat de transform)
+    dans l'ordre d'extraction; le consommateur charge chaque page puis passe
+    à la suivante, déjà extraite et transformée. Tout ce que la
+    transformation rapporte d'une page (anomalies...) doit donc voyager dans
+    ce résultat, pas dans un état partagé.
+    """
+
+    def __init__(self, transform: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+                 queue_size: int = 2):
+        self.transform = transform
+        self.queue_size = max(queue_size, 1)
+
+    async def run(self, source: AsyncIterator[List[Dict[str, Any]]]
+                  ) -> AsyncIterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        extracted = asyncio.Queue(maxsize=self.queue_size)
+        transformed = asyncio.Queue(maxsize=self.queue_size)
+
+        async def extract_stage():
+            try:
+                async for records in source:
+                    await extracted.put(records)
+                await extracted.put(_END_OF_STREAM)
+            except Exception as e:
+                await extracted.put(_StageError(e))
+
+        async def transform_stage():
+            while True:
+                records = await extracted.get()
+                if records is _END_OF_STREAM or isinstance(records, _StageError):
+                    await transformed.put(records)
+                    return
+
+                try:
+                    await transformed.put((records, await self.transform(records)))
+                except Exception as e:
+                    await transformed.put(_StageError(e))
+                    return
+
+        tasks = [asyncio.create_task(extract_stage()), asyncio.create_task(transform_stage())]
+
+        try:
+            while True:
+                page = await transformed.get()
+                if page is _END_OF_STREAM:
+                    return
+                if isinstance(page, _StageError):
+                    raise page.error
+
+                yield page
+
+        finally:
+            # Arrêt anticipé ou erreur: stopper les étages puis fermer le curseur HFSQL
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            aclose = getattr(source, 'aclose', None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,153 @@
+# backend/app/sync/reconciliation.py
+"""
+Réconciliation HFSQL ↔ PostgreSQL par plages d'ID (à la Merkle)
+
+COUNT(*) et MAX(id) globaux ne localisent ni les suppressions ni les trous.
+Ici la plage d'ID est découpée en fanout sous-plages; pour chacune on compare
+une empreinte des deux côtés. Seules les plages divergentes sont redécoupées,
+jusqu'à des feuilles de leaf_size IDs dont on compare les listes d'ID exactes.
+
+L'empreinte (nombre, somme, MIN, MAX, somme des carrés de MOD(id, p)) ne se
+limite pas à (nombre, somme): une suppression et un trou qui se compensent
+({2, 4} contre {1, 5}) gardent nombre et somme mais pas MIN/MAX ni la somme
+des carrés. p < √2³¹: les carrés restent dans un entier 32 bits côté HFSQL.
+
+Coût: fanout requêtes HFSQL par niveau et par plage divergente; un audit
+de plusieurs millions de lignes intègre coûte quelques dizaines de requêtes,
+quelques centaines avec des écarts dispersés. Côté PostgreSQL, toutes les
+plages d'un niveau sont résumées en une seule requête.
+"""
+from typing import List, Dict, Any, Set, Tuple
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+IdRange = Tuple[int, int]  # Bornes incluses
+RangeFingerprint = Tuple[int, int, int, int, int]  # Nombre, somme, MIN, MAX, somme des carrés mod p
+
+FINGERPRINT_PRIME = 46337
+
+
+def split_range(range_start: int, range_end: int, fanout: int) -> List[IdRange]:
+    """Découpe [range_start, range_end] en au plus fanout plages contiguës"""
+    span = range_end - range_start + 1
+    step = max(-(-span // fanout), 1)  # Division arrondie au supérieur
+    return [(start, min(start + step - 1, range_end)) for start in range(range_start, range_end + 1, step)]
+
+
+class RangeReconciler:
+    """
+    Compare les IDs d'une table HFSQL et de sa copie PostgreSQL
+
+    reconcile() renvoie les IDs absents de PostgreSQL (missing_ids) et ceux
+    supprimés dans HFSQL mais encore présents en PostgreSQL (extra_ids).
+    """
+
+    def __init__(self, hfsql_connector, hfsql_table: str, id_field: str, schema: str, table_name: str,
+                 fanout: int = 16, leaf_size: int = 1000):
+        self.hfsql_connector = hfsql_connector
+        self.hfsql_table = hfsql_table
+        self.id_field = id_field
+        self.schema = schema
+        self.table_name = table_name
+        self.fanout = max(fanout, 2)
+        self.leaf_size = min(max(leaf_size, 1), 10000)  # Limite de lignes de execute_query
+        self.hfsql_queries = 0
+        self.postgres_queries = 0
+
+    async def summarize_hfsql(self, ranges: List[IdRange]) -> List[RangeFingerprint]:
+        """Empreinte de chaque plage côté HFSQL, une requête par plage"""
+        id_mod = f"MOD({self.id_field}, {FINGERPRINT_PRIME})"
+        summaries = []
+        for range_start, range_end in ranges:
+            result = await self.hfsql_connector.execute_query(f"""
+            SELECT COUNT(*) AS row_count, SUM({self.id_field}) AS id_sum, MIN({self.id_field}) AS min_id,
+                   MAX({self.id_field}) AS max_id, SUM({id_mod} * {id_mod}) AS square_sum
+            FROM {self.hfsql_table}
+            WHERE {self.id_field} >= {range_start} AND {self.id_field} <= {range_end}
+            """)
+            self.hfsql_queries += 1
+            row = result[0] if result else {}
+            summaries.append(tuple(int(row.get(column) or 0)
+                                   for column in ('row_count', 'id_sum', 'min_id', 'max_id', 'square_sum')))
+        return summaries
+
+    async def summarize_postgres(self, session: AsyncSession, ranges: List[IdRange]) -> List[RangeFingerprint]:
+        """Empreinte de chaque plage côté PostgreSQL, une requête pour toutes"""
+        result = await session.execute(text(f"""
+        SELECT r.range_index, COUNT(t.hfsql_id), COALESCE(SUM(t.hfsql_id), 0),
+               COALESCE(MIN(t.hfsql_id), 0), COALESCE(MAX(t.hfsql_id), 0),
+               COALESCE(SUM(MOD(t.hfsql_id, {FINGERPRINT_PRIME}) * MOD(t.hfsql_id, {FINGERPRINT_PRIME})), 0)
+        FROM unnest(CAST(:starts AS BIGINT[]), CAST(:ends AS BIGINT[])) WITH ORDINALITY
+             AS r(range_start, range_end, range_index)
+        LEFT JOIN {self.schema}.{self.table_name} t
+               ON t.hfsql_id BETWEEN r.range_start AND r.range_end
+        GROUP BY r.range_index
+        ORDER BY r.range_index
+        """), {'starts': [start for start, end in ranges], 'ends': [end for start, end in ranges]})
+        self.postgres_queries += 1
+        return [tuple(int(value) for value in row[1:]) for row in result.fetchall()]
+
+    async def list_hfsql_ids(self, range_start: int, range_end: int) -> Set[int]:
+        result = await self.hfsql_connector.execute_query(f"""
+        SELECT {self.id_field} FROM {self.hfsql_table}
+        WHERE {self.id_field} >= {range_start} AND {self.id_field} <= {range_end}
+        """)
+        self.hfsql_queries += 1
+        return {int(row[self.id_field]) for row in result}
+
+    async def list_postgres_ids(self, session: AsyncSession, range_start: int, range_end: int) -> Set[int]:
+        result = await session.execute(text(f"""
+        SELECT hfsql_id FROM {self.schema}.{self.table_name}
+        WHERE hfsql_id BETWEEN :range_start AND :range_end
+        """), {'range_start': range_start, 'range_end': range_end})
+        self.postgres_queries += 1
+        return {int(row[0]) for row in result.fetchall()}
+
+    async def reconcile(self, session: AsyncSession, range_start: int, range_end: int) -> Dict[str, Any]:
+        """Rétrécit récursivement les plages divergentes jusqu'aux IDs en écart"""
+        missing_ids: List[int] = []
+        extra_ids: List[int] = []
+        totals = None
+        ranges_compared = 0
+
+        if range_end < range_start:
+            return {'missing_ids': [], 'extra_ids': [], 'hfsql_count': 0, 'postgres_count': 0,
+                    'ranges_compared': 0, 'hfsql_queries': 0, 'postgres_queries': 0}
+
+        level = [(range_start, range_end)]
+        while level:
+            hfsql_summaries = await self.summarize_hfsql(level)
+            postgres_summaries = await self.summarize_postgres(session, level)
+            ranges_compared += len(level)
+
+            if totals is None:
+                totals = (hfsql_summaries[0][0], postgres_summaries[0][0])
+
+            next_level = []
+            for (start, end), hfsql_summary, postgres_summary in zip(level, hfsql_summaries, postgres_summaries):
+                if hfsql_summary == postgres_summary:
+                    continue
+
+                if end - start + 1 <= self.leaf_size:
+                    hfsql_ids = await self.list_hfsql_ids(start, end)
+                    postgres_ids = await self.list_postgres_ids(session, start, end)
+                    missing_ids.extend(sorted(hfsql_ids - postgres_ids))
+                    extra_ids.extend(sorted(postgres_ids - hfsql_ids))
+                else:
+                    next_level.extend(split_range(start, end, self.fanout))
+
+            level = next_level
+
+        logger.debug(f"🌳 {self.table_name}: {ranges_compared} plages comparées, {len(missing_ids)} manquants, "
+                     f"{len(extra_ids)} en trop ({self.hfsql_queries} requêtes HFSQL)")
+
+        return {
+            'missing_ids': missing_ids,
+            'extra_ids': extra_ids,
+            'hfsql_count': totals[0],
+            'postgres_count': totals[1],
+            'ranges_compared': ranges_compared,
+            'hfsql_queries': self.hfsql_queries,
+            'postgres_queries': self.postgres_queries
+        }
@@ -1,9 +1,13 @@
 # backend/app/sync/scheduler.py
 import asyncio
+import heapq
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from loguru import logger
+from ..core.config import settings
 from .sync_manager import SynergoSyncManager, SyncResult
+from .change_watcher import ChangeWatcher
+from .transformers.string_cache import get_string_cache
 
 
 class SynergoSyncScheduler:
@@ -11,7 +15,7 @@ class SynergoSyncScheduler:
     Planificateur de synchronisation Synergo
 
     Responsabilités:
-    - Exécute la sync toutes les 30 minutes
+    - Exécute la sync de chaque table selon son sync_interval_minutes
     - Gère les erreurs et reprises automatiques
     - Monitoring et logs détaillés
     - Interface de contrôle (start/stop/status)
@@ -19,15 +23,84 @@ class SynergoSyncScheduler:
 
     def __init__(self, sync_interval_minutes: int = 30):
         self.sync_manager = SynergoSyncManager()
-        self.sync_interval_minutes = sync_interval_minutes
+        self.sync_interval_minutes = sync_interval_minutes  # Défaut des tables sans intervalle propre
         self.is_running = False
-        self.is_syncing = False
-        self.last_sync_results: List[SyncResult] = []
+        self.last_results: Dict[str, SyncResult] = {}
         self.next_sync_time: Optional[datetime] = None
         self.sync_count = 0
         self.error_count = 0
         self.start_time: Optional[datetime] = None
 
+        # File de priorité (échéance, table): une seule échéance valide par
+        # table, celle de next_due; les entrées périmées sont ignorées au dépilage
+        self.next_due: Dict[str, datetime] = {}
+        self._due_heap: List[Tuple[datetime, str]] = []
+        self._running_tables: Set[str] = set()
+        self._cycle_tasks: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+        # Sondage MAX(id): sync anticipée des tables qui ont bougé
+        self.change_watcher: Optional[ChangeWatcher] = None
+        if settings.SYNC_WATCH_ENABLED:
+            self.change_watcher = ChangeWatcher(self.sync_manager, on_change=self.request_sync)
+        self._watcher_task: Optional[asyncio.Task] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.last_sweep_results: Dict[str, SyncResult] = {}
+        self._dead_letter_task: Optional[asyncio.Task] = None
+        self.last_dead_letter_retries: Dict[str, Dict] = {}
+
+    @property
+    def is_syncing(self) -> bool:
+        return bool(self._running_tables)
+
+    @property
+    def last_sync_results(self) -> List[SyncResult]:
+        return list(self.last_results.values())
+
+    def get_table_interval(self, table_key: str) -> int:
+        """Intervalle de sync d'une table en minutes"""
+        config = self.sync_manager.sync_tables_config[table_key]
+        return config.get('sync_interval_minutes', self.sync_interval_minutes)
+
+    def _schedule_table(self, table_key: str, due_time: datetime):
+        self.next_due[table_key] = due_time
+        heapq.heappush(self._due_heap, (due_time, table_key))
+        self.next_sync_time = min(self.next_due.values())
+        self._wakeup.set()
+
+    def _unschedule_table(self, table_key: str):
+        self.next_due.pop(table_key, None)
+        self.next_sync_time = min(self.next_due.values(), default=None)
+
+    async def request_sync(self, table_keys: List[str]):
+        """
+        Avance l'échéance des tables à maintenant
+
+        Une table en cours est ignorée: sa sync en mode drain lit déjà les
+        nouvelles lignes, ou la prochaine les lira.
+        """
+        now = datetime.now()
+        for table_key in table_keys:
+            if table_key not in self._running_tables:
+                self._schedule_table(table_key, now)
+
+    def _pop_due_tables(self, now: datetime) -> List[str]:
+        """
+        Dépile les tables arrivées à échéance
+
+        Une table en cours n'a pas d'échéance: elle n'est replanifiée qu'à la
+        fin de sa sync, et une sync plus longue que son intervalle donne un
+        seul déclenchement immédiat au lieu de plusieurs empilés.
+        """
+        due_tables = []
+        while self._due_heap and self._due_heap[0][0] <= now:
+            due_time, table_key = heapq.heappop(self._due_heap)
+            if self.next_due.get(table_key) != due_time:
+                continue  # Entrée périmée (replanifiée ou sync manuelle en cours)
+            self._unschedule_table(table_key)
+            due_tables.append(table_key)
+        return due_tables
+
     async def start_scheduler(self):
         """
         Démarre le planificateur de synchronisation
@@ -40,20 +113,34 @@ class SynergoSyncScheduler:
         self.start_time = datetime.now()
 
         logger.info(f"🚀 Démarrage Synergo Sync Scheduler")
-        logger.info(f"   📅 Intervalle: {self.sync_interval_minutes} minutes")
+        for table_key in self.sync_manager.get_sync_order():
+            logger.info(f"   📅 {table_key}: toutes les {self.get_table_interval(table_key)} minutes")
         logger.info(f"   🕐 Première sync: immédiate")
 
+        # Première sync immédiate pour toutes les tables
+        now = datetime.now()
+        for table_key in self.sync_manager.get_sync_order():
+            self._schedule_table(table_key, now)
+
+        if self.change_watcher is not None:
+            self._watcher_task = asyncio.create_task(self.change_watcher.run())
+        if settings.SYNC_HASH_SWEEP_INTERVAL_MINUTES > 0:
+            self._sweep_task = asyncio.create_task(self._run_hash_sweeps())
+        if self.sync_manager.dead_letters is not None:
+            self._dead_letter_task = asyncio.create_task(self._run_dead_letter_retries())
+
         try:
             while self.is_running:
-                # Calculer la prochaine synchronisation
-                self.next_sync_time = datetime.now() + timedelta(minutes=self.sync_interval_minutes)
+                due_tables = self._pop_due_tables(datetime.now())
 
-                # Exécuter la synchronisation
-                await self._execute_sync_cycle()
+                # Les tables échues ensemble partent dans un même cycle (ordre FK)
+                if due_tables:
+                    task = asyncio.create_task(self._execute_sync_cycle(due_tables))
+                    self._cycle_tasks.add(task)
+                    task.add_done_callback(self._cycle_tasks.discard)
 
-                # Attendre le prochain cycle (seulement si on est toujours en marche)
+                # Attendre la prochaine échéance (seulement si on est toujours en marche)
                 if self.is_running:
-                    logger.info(f"⏰ Prochaine sync prévue: {self.next_sync_time.strftime('%H:%M:%S')}")
                     await self._wait_for_next_sync()
 
         except asyncio.CancelledError:
@@ -62,6 +149,15 @@ class SynergoSyncScheduler:
             logger.error(f"❌ Erreur critique planificateur: {e}")
         finally:
             self.is_running = False
+            for task in (self._watcher_task, self._sweep_task, self._dead_letter_task):
+                if task is not None:
+                    task.cancel()
+            self._watcher_task = None
+            self._sweep_task = None
+            self._dead_letter_task = None
+            self.next_due.clear()
+            self._due_heap.clear()
+            self.next_sync_time = None
             logger.info("🔌 Planificateur Synergo arrêté")
 
     async def stop_scheduler(self):
@@ -70,6 +166,7 @@ class SynergoSyncScheduler:
         """
         logger.info("🛑 Arrêt du planificateur demandé...")
         self.is_running = False
+        self._wakeup.set()
 
         # Attendre la fin de la sync en cours si nécessaire
         if self.is_syncing:
@@ -82,38 +179,53 @@ class SynergoSyncScheduler:
             if self.is_syncing:
                 logger.warning("⚠️ Timeout: synchronisation toujours en cours")
 
+        # Libérer les connexions HFSQL inactives du pool
+        await self.sync_manager.hfsql_pool.close_all()
+        self.sync_manager.transform_executor.shutdown()
+
     async def trigger_manual_sync(self) -> List[SyncResult]:
         """
         Déclenche une synchronisation manuelle
         """
-        if self.is_syncing:
+        table_keys = [table_key for table_key in self.sync_manager.get_sync_order()
+                      if table_key not in self._running_tables]
+        if not table_keys:
             logger.warning("⚠️ Synchronisation déjà en cours")
             return self.last_sync_results
 
         logger.info("🔄 Synchronisation manuelle déclenchée")
-        return await self._execute_sync_cycle()
+        return await self._execute_sync_cycle(table_keys)
 
-    async def _execute_sync_cycle(self) -> List[SyncResult]:
+    async def _execute_sync_cycle(self, table_keys: List[str]) -> List[SyncResult]:
         """
-        Exécute un cycle de synchronisation complet
+        Exécute un cycle de synchronisation sur les tables données
+
+        Chaque table est replanifiée à son intervalle depuis le début du cycle.
         """
-        if self.is_syncing:
+        table_keys = [table_key for table_key in table_keys if table_key not in self._running_tables]
+        if not table_keys:
             logger.warning("⚠️ Synchronisation déjà en cours, abandon")
             return []
 
-        self.is_syncing = True
+        self._running_tables.update(table_keys)
+        for table_key in table_keys:
+            self._unschedule_table(table_key)
         cycle_start = datetime.now()
 
         try:
-            logger.info(f"🔄 Début cycle de synchronisation #{self.sync_count + 1}")
+            logger.info(f"🔄 Début cycle de synchronisation #{self.sync_count + 1}: {', '.join(table_keys)}")
 
             # Exécuter la synchronisation via le manager
-            results = await self.sync_manager.sync_all_active_tables()
+            results = await self.sync_manager.sync_tables(table_keys)
 
             # Analyser les résultats
-            self.last_sync_results = results
+            for result in results:
+                self.last_results[result.table_name] = result
             self.sync_count += 1
 
+            if self.change_watcher is not None:
+                self.change_watcher.record_results(results)
+
             # Statistiques du cycle
             cycle_duration = (datetime.now() - cycle_start).total_seconds()
             total_records = sum(r.records_processed for r in results)
@@ -148,26 +260,64 @@ class SynergoSyncScheduler:
                 status="ERROR",
                 error_message=str(e)
             )
-            self.last_sync_results = [error_result]
+            self.last_results["GLOBAL"] = error_result
             return [error_result]
 
         finally:
-            self.is_syncing = False
+            self._running_tables.difference_update(table_keys)
+            if self.is_running:
+                for table_key in table_keys:
+                    due_time = cycle_start + timedelta(minutes=self.get_table_interval(table_key))
+                    self._schedule_table(table_key, due_time)
+                    logger.debug(f"⏰ {table_key}: prochaine sync prévue {due_time.strftime('%H:%M:%S')}")
+
+    async def _run_hash_sweeps(self):
+        """
+        Balayage périodique des empreintes des tables content_hash
 
-    async def _wait_for_next_sync(self):
+        Indépendant des syncs planifiées: le balayage ne relit que des IDs
+        déjà synchronisés, la sync incrémentale que des IDs plus récents.
+        """
+        sweep_tables = [table_key for table_key, config in self.sync_manager.sync_tables_config.items()
+                        if config.get('content_hash')]
+
+        while self.is_running:
+            await asyncio.sleep(settings.SYNC_HASH_SWEEP_INTERVAL_MINUTES * 60)
+
+            for table_key in sweep_tables:
+                if not self.is_running:
+                    break
+                result = await self.sync_manager.sweep_table_changes(table_key)
+                self.last_sweep_results[table_key] = result
+
+    async def _run_dead_letter_retries(self):
         """
-        Attente intelligente jusqu'à la prochaine synchronisation
+        Relance des rejets au démarrage (transformateurs éventuellement
+        corrigés depuis), puis périodique si SYNC_DEAD_LETTER_RETRY_INTERVAL_MINUTES > 0
         """
-        wait_seconds = self.sync_interval_minutes * 60
+        while self.is_running:
+            self.last_dead_letter_retries = await self.sync_manager.retry_all_dead_letters()
 
-        # Attente par petits intervalles pour permettre l'arrêt propre
-        interval = 10  # secondes
-        elapsed = 0
+            if settings.SYNC_DEAD_LETTER_RETRY_INTERVAL_MINUTES <= 0:
+                break
+            await asyncio.sleep(settings.SYNC_DEAD_LETTER_RETRY_INTERVAL_MINUTES * 60)
 
-        while elapsed < wait_seconds and self.is_running:
-            await asyncio.sleep(min(interval, wait_seconds - elapsed))
-            elapsed += interval
+    async def _wait_for_next_sync(self):
+        """
+        Attente jusqu'à la prochaine échéance
 
+        Réveillée plus tôt par une replanification ou par l'arrêt.
+        """
+        self._wakeup.clear()
+        if self._due_heap:
+            wait_seconds = max((self._due_heap[0][0] - datetime.now()).total_seconds(), 0)
+        else:
+            wait_seconds = self.sync_interval_minutes * 60
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=wait_seconds)
+        except asyncio.TimeoutError:
+            pass
 
 
     def get_status(self) -> Dict[str, any]:
@@ -176,6 +326,7 @@ class SynergoSyncScheduler:
         """
         now = datetime.now()
         uptime = (now - self.start_time).total_seconds() if self.start_time else 0
+        string_cache = get_string_cache()
 
         # Formater next_sync_time correctement
         next_sync_formatted = None
@@ -194,6 +345,26 @@ class SynergoSyncScheduler:
             'uptime_seconds': uptime,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'next_sync_time': next_sync_formatted,  # CORRIGÉ
+            'tables_next_due': {
+                table_key: due_time.isoformat() for table_key, due_time in sorted(self.next_due.items())
+            },
+            'tables_syncing': sorted(self._running_tables),
+            'change_watcher': self.change_watcher.get_status() if self.change_watcher else None,
+            'spool': self.sync_manager.spool.get_status() if self.sync_manager.spool else None,
+            'transform_executor': self.sync_manager.transform_executor.get_status(),
+            'string_cache': string_cache.get_status() if string_cache else None,
+            'last_sweeps': {
+                table_key: {
+                    'status': result.status,
+                    'rows_scanned': result.rows_scanned,
+                    'rows_per_second': round(result.rows_per_second, 1),
+                    'changed_rows': result.updated,
+                    'missing_rows': result.inserted,
+                    'timestamp': result.timestamp.isoformat()
+                }
+                for table_key, result in self.last_sweep_results.items()
+            },
+            'last_dead_letter_retries': self.last_dead_letter_retries,
             'last_sync_summary': self._get_last_sync_summary()
         }
 
@@ -235,6 +406,8 @@ class SynergoSyncScheduler:
             'scheduler': scheduler_status,
             'sync_states': dashboard_data.get('sync_states', []),
             'stats_24h': dashboard_data.get('stats_24h', {}),
+            'anomalies_24h': dashboard_data.get('anomalies_24h', []),
+            'dead_letters': dashboard_data.get('dead_letters', {}),
             'generated_at': datetime.now().isoformat()
         }
 
@@ -0,0 +1,164 @@
+# backend/app/sync/spool.py
+"""
+Spool disque des pages HFSQL brutes
+
+Chaque page extraite est écrite sur disque avant transformation et
+chargement. Si la transformation ou le chargement échoue, le cycle suivant
+rejoue la page depuis le disque au lieu de la relire sur le serveur HFSQL de
+production. Une page est supprimée dès que son checkpoint last_sync_id est
+commité.
+
+Format: un fichier par page, nommé {after_id}-{last_id}.page (after_id =
+borne keyset exclusive de la page), contenant un en-tête (magique, longueur,
+CRC32) suivi des enregistrements picklés et compressés zlib. Un fichier
+tronqué ou corrompu est ignoré et supprimé.
+
+Le volume total est borné: au-delà du budget, les pages ne sont plus
+spoolées (la sync continue, seule la reprise depuis le disque est perdue).
+"""
+import os
+import pickle
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional
+from loguru import logger
+
+_MAGIC = b'SPL1'
+_HEADER = struct.Struct('>4sII')  # magique, longueur du contenu, CRC32
+
+
+class SpooledPage(NamedTuple):
+    after_id: int  # Borne keyset exclusive (last_sync_id avant la page)
+    last_id: int
+    path: Path
+
+
+class PageSpool:
+    """Pages brutes par table et plage d'ID, dans un budget disque"""
+
+    def __init__(self, directory: str, max_bytes: int, compression_level: int = 1):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._budget_warned = False
+
+        for temporary_path in self.directory.glob('*/*.tmp'):
+            temporary_path.unlink()  # Écriture interrompue par un arrêt brutal
+        self.used_bytes = sum(path.stat().st_size for path in self.directory.glob('*/*.page'))
+
+    def _table_directory(self, table_name: str) -> Path:
+        return self.directory / table_name
+
+    def write(self, table_name: str, after_id: int, last_id: int,
+              records: List[Dict[str, Any]]) -> Optional[SpooledPage]:
+        """Écrit une page (écriture atomique); None si le budget disque est atteint"""
+        payload = zlib.compress(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL), self.compression_level)
+        size = _HEADER.size + len(payload)
+
+        with self._lock:
+            if self.used_bytes + size > self.max_bytes:
+                if not self._budget_warned:
+                    logger.warning(f"⚠️ Spool plein ({self.used_bytes // (1024 * 1024)} Mo), pages non spoolées")
+                    self._budget_warned = True
+                return None
+            self.used_bytes += size
+
+        table_directory = self._table_directory(table_name)
+        path = table_directory / f"{after_id}-{last_id}.page"
+        temporary_path = path.with_suffix('.tmp')
+
+        try:
+            table_directory.mkdir(parents=True, exist_ok=True)
+            with open(temporary_path, 'wb') as spool_file:
+                spool_file.write(_HEADER.pack(_MAGIC, len(payload), zlib.crc32(payload)))
+                spool_file.write(payload)
+            os.replace(temporary_path, path)
+
+        except OSError as e:
+            logger.warning(f"⚠️ Écriture spool impossible ({path.name}): {e}")
+            with self._lock:
+                self.used_bytes -= size
+            return None
+
+        return SpooledPage(after_id, last_id, path)
+
+    def read(self, page: SpooledPage) -> Optional[List[Dict[str, Any]]]:
+        """Relit une page; None (et suppression) si elle est illisible"""
+        try:
+            with open(page.path, 'rb') as spool_file:
+                magic, length, checksum = _HEADER.unpack(spool_file.read(_HEADER.size))
+                payload = spool_file.read(length)
+
+            if magic != _MAGIC or len(payload) != length or zlib.crc32(payload) != checksum:
+                raise ValueError("en-tête ou contenu invalide")
+
+            return pickle.loads(zlib.decompress(payload))
+
+        except Exception as e:
+            logger.warning(f"⚠️ Page spool illisible supprimée {page.path.name}: {e}")
+            self._remove(page.path)
+            return None
+
+    def pages(self, table_name: str) -> List[SpooledPage]:
+        """Pages d'une table, triées par plage d'ID"""
+        table_directory = self._table_directory(table_name)
+        if not table_directory.exists():
+            return []
+
+        pages = []
+        for path in table_directory.glob('*.page'):
+            try:
+                after_id, last_id = map(int, path.stem.split('-'))
+            except ValueError:
+                continue
+            pages.append(SpooledPage(after_id, last_id, path))
+        return sorted(pages)
+
+    def replay_chain(self, table_name: str, last_sync_id: int) -> List[SpooledPage]:
+        """
+        Pages rejouables à partir de last_sync_id, dans l'ordre
+
+        La chaîne suit after_id == last_id de la page précédente; les pages
+        déjà commitées ou qui ne se raccordent pas (autre point de reprise)
+        sont supprimées.
+        """
+        chain = []
+        cursor = last_sync_id
+        for page in self.pages(table_name):
+            if page.after_id == cursor:
+                chain.append(page)
+                cursor = page.last_id
+            else:
+                self._remove(page.path)
+        return chain
+
+    def discard_through(self, table_name: str, last_id: int) -> int:
+        """Supprime les pages entièrement commitées (last_id <= checkpoint)"""
+        removed = 0
+        for page in self.pages(table_name):
+            if page.last_id <= last_id:
+                self._remove(page.path)
+                removed += 1
+        return removed
+
+    def _remove(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+
+        with self._lock:
+            self.used_bytes = max(self.used_bytes - size, 0)
+            self._budget_warned = False
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'directory': str(self.directory),
+            'used_bytes': self.used_bytes,
+            'max_bytes': self.max_bytes,
+            'pages': sum(1 for _ in self.directory.glob('*/*.page'))
+        }
@@ -1,9 +1,17 @@
 # backend/app/sync/strategies/id_based_sync.py - VERSION CORRIGÉE
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Set, Tuple
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from ...core.config import settings
 from ...utils.hfsql_connector import HFSQLConnector
+from ..bulk_loader import copy_upsert, values_upsert, dedupe_records
+from ..reconciliation import RangeReconciler
+
+# Colonnes HFSQL réelles par table, découvertes une seule fois par processus
+_hfsql_columns_cache: Dict[str, List[str]] = {}
+# Listes SELECT calculées par (table HFSQL, champs du transformateur)
+_select_list_cache: Dict[tuple, str] = {}
 
 
 class IdBasedSyncStrategy:
@@ -16,13 +24,66 @@ class IdBasedSyncStrategy:
     3. Optimisé pour les tables avec auto-increment
     """
 
-    def __init__(self, config: Dict[str, Any], hfsql_connector: HFSQLConnector):
+    def __init__(self, config: Dict[str, Any], hfsql_connector: HFSQLConnector,
+                 source_fields: Optional[List[str]] = None):
         self.table_name = config['table_name']
         self.hfsql_table = config['hfsql_table']
         self.id_field = config.get('id_field', 'id')
-        self.batch_size = config.get('batch_size', 1000)
+        self.batch_size = config.get('batch_size', settings.SYNC_BATCH_SIZE)  # Ajustable en cours de flux
         self.schema = config.get('schema', 'synergo_core')
         self.hfsql_connector = hfsql_connector
+        self.source_fields = source_fields  # Colonnes lues par le transformateur (None = toutes)
+        self.bulk_loader = config.get('bulk_loader', settings.SYNC_BULK_LOADER)  # 'copy' ou 'insert'
+        self.rejected: List[Tuple[Dict[str, Any], str]] = []  # Lignes écartées au nettoyage, à reprendre
+
+    async def _get_hfsql_columns(self) -> List[str]:
+        """Colonnes réelles de la table HFSQL (une requête par table et par processus)"""
+        if self.hfsql_table not in _hfsql_columns_cache:
+            sample = await self.hfsql_connector.execute_query(f"SELECT TOP 1 * FROM {self.hfsql_table}")
+            if not sample:
+                return []  # Table vide: colonnes inconnues, nouvel essai au prochain cycle
+            _hfsql_columns_cache[self.hfsql_table] = list(sample[0].keys())
+        return _hfsql_columns_cache[self.hfsql_table]
+
+    async def get_select_list(self) -> str:
+        """
+        Liste SELECT limitée aux colonnes mappées par le transformateur
+
+        Moins d'octets transférés via COM/ODBC et moins de cellules à nettoyer
+        sur les tables ERP larges (nomenclature...). Les champs du mappage
+        absents de la table HFSQL sont ignorés; sans information fiable on
+        retombe sur SELECT *.
+        """
+        if not self.source_fields:
+            return '*'
+
+        cache_key = (self.hfsql_table, self.id_field, tuple(self.source_fields))
+        if cache_key in _select_list_cache:
+            return _select_list_cache[cache_key]
+
+        try:
+            available = {column.lower() for column in await self._get_hfsql_columns()}
+        except Exception as e:
+            logger.warning(f"⚠️ Colonnes {self.hfsql_table} non découvertes, SELECT * utilisé: {e}")
+            return '*'
+
+        if not available:
+            return '*'
+
+        columns = [self.id_field]
+        selected = {self.id_field.lower()}
+        for field in self.source_fields:
+            if field.lower() in available and field.lower() not in selected:
+                columns.append(field)
+                selected.add(field.lower())
+
+        ignored = [field for field in self.source_fields if field.lower() not in available]
+        if ignored:
+            logger.warning(f"⚠️ {self.hfsql_table}: champs mappés absents de HFSQL ignorés: {', '.join(ignored)}")
+
+        select_list = _select_list_cache[cache_key] = ', '.join(columns)
+        logger.debug(f"📐 {self.hfsql_table}: projection {len(columns)}/{len(available)} colonnes")
+        return select_list
 
     async def get_new_records(self, last_sync_id: int = 0) -> List[Dict[str, Any]]:
         """
@@ -33,7 +94,7 @@ class IdBasedSyncStrategy:
 
             # Requête optimisée pour récupérer uniquement les nouveaux
             query = f"""
-            SELECT * FROM {self.hfsql_table}
+            SELECT {await self.get_select_list()} FROM {self.hfsql_table}
             WHERE {self.id_field} > {last_sync_id}
             ORDER BY {self.id_field} ASC
             LIMIT {self.batch_size}
@@ -54,6 +115,32 @@ class IdBasedSyncStrategy:
             logger.error(f"❌ Erreur récupération nouveaux enregistrements: {e}")
             raise
 
+    async def stream_new_records(self, last_sync_id: int = 0, max_rows: Optional[int] = None,
+                                 upper_id: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Produit les nouveaux enregistrements par paquets de batch_size
+
+        Une seule requête keyset est ouverte côté HFSQL et lue au fil de l'eau:
+        la mémoire reste bornée à un paquet quel que soit le retard à rattraper.
+        upper_id borne la lecture (incluse) pour le chargement par partitions.
+        """
+        logger.debug(f"🔍 Flux nouveaux enregistrements {self.hfsql_table} depuis ID {last_sync_id}")
+
+        upper_bound = f"AND {self.id_field} <= {upper_id}" if upper_id is not None else ""
+        query = f"""
+        SELECT {await self.get_select_list()} FROM {self.hfsql_table}
+        WHERE {self.id_field} > {last_sync_id} {upper_bound}
+        ORDER BY {self.id_field} ASC
+        """
+        if max_rows is not None:
+            query += f"LIMIT {max_rows}\n"
+
+        # Taille relue à chaque paquet: le gestionnaire peut l'adapter en cours de flux
+        async for records in self.hfsql_connector.stream_query(query, chunk_size=lambda: self.batch_size):
+            logger.debug(f"✅ {len(records)} nouveaux enregistrements reçus "
+                         f"(ID {records[0][self.id_field]} à {records[-1][self.id_field]})")
+            yield records
+
     async def get_hfsql_max_id(self) -> int:
         """Récupère l'ID maximum de la table HFSQL"""
         try:
@@ -64,6 +151,28 @@ class IdBasedSyncStrategy:
             logger.error(f"❌ Erreur récupération max ID: {e}")
             return 0
 
+    async def get_hfsql_min_id(self) -> int:
+        """Récupère l'ID minimum de la table HFSQL"""
+        try:
+            query = f"SELECT MIN({self.id_field}) as min_id FROM {self.hfsql_table}"
+            result = await self.hfsql_connector.execute_query(query)
+            return result[0]['min_id'] if result and result[0]['min_id'] else 0
+        except Exception as e:
+            logger.error(f"❌ Erreur récupération min ID: {e}")
+            return 0
+
+    @staticmethod
+    def split_id_range(min_id: int, max_id: int, partitions: int) -> List[Tuple[int, int]]:
+        """Découpe [min_id, max_id] en plages contiguës de taille égale (bornes incluses)"""
+        if max_id < min_id:
+            return []
+
+        span = max_id - min_id + 1
+        partitions = max(1, min(partitions, span))
+        size = -(-span // partitions)  # Division arrondie au supérieur
+
+        return [(start, min(start + size - 1, max_id)) for start in range(min_id, max_id + 1, size)]
+
     async def get_postgres_max_hfsql_id(self, session: AsyncSession) -> int:
         """Récupère le dernier hfsql_id synchronisé dans PostgreSQL"""
         try:
@@ -75,47 +184,62 @@ class IdBasedSyncStrategy:
             logger.error(f"❌ Erreur récupération max hfsql_id PostgreSQL: {e}")
             return 0
 
-    async def validate_sync_integrity(self, session: AsyncSession) -> Dict[str, Any]:
+    async def validate_sync_integrity(self, session: AsyncSession, upper_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Valide l'intégrité de la synchronisation
-        Compare les comptes et derniers IDs entre HFSQL et PostgreSQL
+        Compare les IDs HFSQL et PostgreSQL plage par plage jusqu'à upper_id
+        (par défaut le dernier ID chargé en PostgreSQL) et liste les écarts
         """
         try:
-            # Compter les enregistrements PostgreSQL
-            pg_query = f"SELECT COUNT(*) as count, MAX(hfsql_id) as max_id FROM {self.schema}.{self.table_name}"
-            pg_result = await session.execute(text(pg_query))
-            pg_row = pg_result.fetchone()
-            pg_count = pg_row[0] if pg_row else 0
-            pg_max_id = pg_row[1] if pg_row else 0
-
-            # Compter les enregistrements HFSQL
-            hfsql_count_query = f"SELECT COUNT(*) as count FROM {self.hfsql_table}"
-            hfsql_count_result = await self.hfsql_connector.execute_query(hfsql_count_query)
-            hfsql_count = hfsql_count_result[0]['count'] if hfsql_count_result else 0
-
-            # ID maximum HFSQL
+            pg_result = await session.execute(text(
+                f"SELECT MIN(hfsql_id), MAX(hfsql_id) FROM {self.schema}.{self.table_name}"
+            ))
+            pg_min_id, pg_max_id = pg_result.fetchone() or (None, None)
+            pg_max_id = pg_max_id or 0
+
+            hfsql_min_id = await self.get_hfsql_min_id()
             hfsql_max_id = await self.get_hfsql_max_id()
 
-            # Calcul de l'écart
-            count_difference = hfsql_count - pg_count
+            # Au-delà de upper_id: pas un écart, simplement pas encore synchronisé
+            known_min_ids = [id_value for id_value in (pg_min_id, hfsql_min_id) if id_value]
+            range_start = min(known_min_ids) if known_min_ids else 1
+            range_end = upper_id if upper_id is not None else pg_max_id
+
+            reconciler = RangeReconciler(self.hfsql_connector, self.hfsql_table, self.id_field,
+                                         self.schema, self.table_name,
+                                         fanout=settings.SYNC_RECONCILE_FANOUT,
+                                         leaf_size=settings.SYNC_RECONCILE_LEAF_SIZE)
+            reconciliation = await reconciler.reconcile(session, range_start, range_end)
+
+            missing_count = len(reconciliation['missing_ids'])
+            extra_count = len(reconciliation['extra_ids'])
             id_difference = hfsql_max_id - pg_max_id
 
             sync_integrity = {
-                'hfsql_count': hfsql_count,
-                'postgres_count': pg_count,
-                'count_difference': count_difference,
+                'hfsql_count': reconciliation['hfsql_count'],
+                'postgres_count': reconciliation['postgres_count'],
+                'count_difference': reconciliation['hfsql_count'] - reconciliation['postgres_count'],
                 'hfsql_max_id': hfsql_max_id,
                 'postgres_max_hfsql_id': pg_max_id,
                 'id_difference': id_difference,
-                'is_synchronized': count_difference == 0 and id_difference == 0,
+                'audited_range': [range_start, range_end],
+                'missing_count': missing_count,
+                'extra_count': extra_count,
+                'missing_ids': reconciliation['missing_ids'],
+                'extra_ids': reconciliation['extra_ids'],
+                'ranges_compared': reconciliation['ranges_compared'],
+                'hfsql_queries': reconciliation['hfsql_queries'],
+                'postgres_queries': reconciliation['postgres_queries'],
+                'is_synchronized': missing_count == 0 and extra_count == 0 and id_difference <= 0,
                 'needs_sync': id_difference > 0
             }
 
-            if sync_integrity['is_synchronized']:
-                logger.info(f"✅ {self.table_name}: Synchronisation intègre ({hfsql_count} enregistrements)")
+            if missing_count == 0 and extra_count == 0:
+                logger.info(f"✅ {self.table_name}: Synchronisation intègre ({reconciliation['hfsql_count']} "
+                            f"enregistrements, {reconciliation['hfsql_queries']} requêtes HFSQL)")
             else:
-                logger.warning(
-                    f"⚠️ {self.table_name}: {count_difference} enregistrements de différence, {id_difference} IDs de retard")
+                logger.warning(f"⚠️ {self.table_name}: {missing_count} IDs manquants, {extra_count} IDs supprimés "
+                               f"dans HFSQL, {id_difference} IDs de retard")
 
             return sync_integrity
 
@@ -127,52 +251,116 @@ class IdBasedSyncStrategy:
                 'needs_sync': True
             }
 
-    async def repair_sync_gaps(self, session: AsyncSession, gap_size_limit: int = 10000) -> Dict[str, Any]:
+    async def repair_sync_gaps(self, session: AsyncSession,
+                               transform: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+                               upper_id: Optional[int] = None, gap_size_limit: int = 10000) -> Dict[str, Any]:
         """
-        Répare les écarts de synchronisation en récupérant les enregistrements manquants
+        Répare les écarts localisés par validate_sync_integrity
+
+        Recharge (via transform) les seuls IDs absents de PostgreSQL et
+        supprime ceux qui n'existent plus dans HFSQL. Le commit est laissé
+        à l'appelant.
         """
         try:
-            integrity = await self.validate_sync_integrity(session)
+            integrity = await self.validate_sync_integrity(session, upper_id)
+            if 'error' in integrity:
+                return {'status': 'error', 'message': integrity['error']}
 
-            if integrity.get('is_synchronized', False):
-                return {'status': 'no_repair_needed', 'message': 'Synchronisation déjà intègre'}
+            missing_ids = integrity['missing_ids']
+            extra_ids = integrity['extra_ids']
 
-            id_difference = integrity.get('id_difference', 0)
+            if not missing_ids and not extra_ids:
+                return {'status': 'no_repair_needed', 'message': 'Synchronisation déjà intègre',
+                        'hfsql_queries': integrity['hfsql_queries']}
 
-            if id_difference > gap_size_limit:
+            if len(missing_ids) + len(extra_ids) > gap_size_limit:
                 return {
                     'status': 'gap_too_large',
-                    'message': f'Écart trop important ({id_difference} enregistrements). Utiliser la synchronisation initiale.',
-                    'gap_size': id_difference
+                    'message': f'Écart trop important ({len(missing_ids) + len(extra_ids)} enregistrements). '
+                               f'Utiliser la synchronisation initiale.',
+                    'gap_size': len(missing_ids) + len(extra_ids)
                 }
 
-            # Récupérer et synchroniser les enregistrements manquants
-            pg_max_id = integrity.get('postgres_max_hfsql_id', 0)
-            missing_records = await self.get_new_records(pg_max_id)
+            inserted_count = 0
+            for start in range(0, len(missing_ids), 500):
+                missing_records = await self.get_records_by_ids(missing_ids[start:start + 500])
+                if missing_records:
+                    inserted_count += await self.insert_records(session, await transform(missing_records))
 
-            if missing_records:
-                # On assume que les enregistrements sont déjà transformés
-                # Dans un cas réel, il faudrait appliquer le transformer
-                inserted_count = await self.insert_records(session, missing_records)
+            deleted_count = await self.delete_records(session, extra_ids)
 
-                return {
-                    'status': 'repaired',
-                    'message': f'{inserted_count} enregistrements manquants récupérés',
-                    'records_inserted': inserted_count
-                }
-            else:
-                return {'status': 'no_missing_records', 'message': 'Aucun enregistrement manquant trouvé'}
+            logger.info(f"🔧 {self.table_name}: {inserted_count} enregistrements rechargés, {deleted_count} supprimés")
+
+            return {
+                'status': 'repaired',
+                'message': f'{inserted_count} enregistrements manquants récupérés, {deleted_count} supprimés',
+                'records_inserted': inserted_count,
+                'records_deleted': deleted_count,
+                'hfsql_queries': integrity['hfsql_queries']
+            }
 
         except Exception as e:
             logger.error(f"❌ Erreur réparation sync: {e}")
             return {'status': 'error', 'message': str(e)}
 
+    async def get_records_by_ids(self, hfsql_ids: List[int]) -> List[Dict[str, Any]]:
+        """Lignes HFSQL de ces IDs (colonnes projetées)"""
+        if not hfsql_ids:
+            return []
+
+        query = f"""
+        SELECT {await self.get_select_list()} FROM {self.hfsql_table}
+        WHERE {self.id_field} IN ({', '.join(str(int(hfsql_id)) for hfsql_id in hfsql_ids)})
+        ORDER BY {self.id_field} ASC
+        """
+        return await self.hfsql_connector.execute_query(query)
+
+    async def delete_records(self, session: AsyncSession, hfsql_ids: List[int]) -> int:
+        """Supprime de PostgreSQL les lignes disparues de HFSQL"""
+        if not hfsql_ids:
+            return 0
+
+        result = await session.execute(text(
+            f"DELETE FROM {self.schema}.{self.table_name} WHERE hfsql_id = ANY(:hfsql_ids)"
+        ), {'hfsql_ids': list(hfsql_ids)})
+        return result.rowcount
+
+    async def get_existing_ids(self, session: AsyncSession, hfsql_ids: List[int]) -> Set[int]:
+        """IDs déjà présents en PostgreSQL parmi hfsql_ids"""
+        if not hfsql_ids:
+            return set()
+
+        result = await session.execute(text(
+            f"SELECT hfsql_id FROM {self.schema}.{self.table_name} WHERE hfsql_id = ANY(:hfsql_ids)"
+        ), {'hfsql_ids': list(hfsql_ids)})
+        return {row[0] for row in result.fetchall()}
+
+    async def get_content_hashes(self, session: AsyncSession, hfsql_ids: List[int]) -> Dict[int, Optional[int]]:
+        """Empreintes stockées en PostgreSQL pour ces IDs (absents = non chargés)"""
+        query = f"""
+        SELECT hfsql_id, content_hash FROM {self.schema}.{self.table_name}
+        WHERE hfsql_id = ANY(:hfsql_ids)
+        """
+        result = await session.execute(text(query), {'hfsql_ids': hfsql_ids})
+        return {row[0]: row[1] for row in result.fetchall()}
+
     async def insert_records(self, session: AsyncSession, records: List[Dict[str, Any]]) -> int:
         """
         Insère les enregistrements transformés dans PostgreSQL - VERSION CORRIGÉE
         """
+        counts = await self.upsert_records(session, records)
+        return counts['inserted'] + counts['updated'] + counts['unchanged']
+
+    async def upsert_records(self, session: AsyncSession, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Insère ou met à jour les enregistrements transformés
+
+        Seules les lignes dont une colonne mappée a changé sont réécrites.
+        Retourne les comptes inserted / updated / unchanged du lot.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
         if not records:
-            return 0
+            return counts
 
         try:
             logger.debug(f"💾 Insertion de {len(records)} enregistrements dans {self.schema}.{self.table_name}")
@@ -183,36 +371,38 @@ class IdBasedSyncStrategy:
                 clean_record = self._clean_record_for_insert(record)
                 if clean_record:
                     clean_records.append(clean_record)
+                else:
+                    self.rejected.append((record, 'insert_invalid'))
 
             if not clean_records:
                 logger.warning("⚠️ Aucun enregistrement valide après nettoyage")
-                return 0
+                return counts
+
+            clean_records = dedupe_records(clean_records)
 
             # Construire la requête d'insertion dynamiquement
             sample_record = clean_records[0]
             columns = list(sample_record.keys())
-            placeholders = [f":{col}" for col in columns]
 
             # CORRECTION: Exclure last_synced_at et created_at des champs mis à jour
             # pour éviter les doublons dans la clause UPDATE
             excluded_from_update = ['hfsql_id', 'last_synced_at', 'created_at']
             update_columns = [col for col in columns if col not in excluded_from_update]
 
-            # Requête avec ON CONFLICT pour éviter les doublons - VERSION CORRIGÉE
-            insert_query = f"""
-            INSERT INTO {self.schema}.{self.table_name} 
-            ({', '.join(columns)})
-            VALUES ({', '.join(placeholders)})
-            ON CONFLICT (hfsql_id) DO UPDATE SET
-            {', '.join([f"{col} = EXCLUDED.{col}" for col in update_columns])},
-            last_synced_at = CURRENT_TIMESTAMP
-            """
+            # Gros lots: COPY dans une table de transit puis fusion ensembliste
+            merge_counts = None
+            if self.bulk_loader == 'copy' and len(clean_records) >= settings.SYNC_COPY_MIN_ROWS:
+                merge_counts = await copy_upsert(session, self.schema, self.table_name, clean_records,
+                                                 columns, update_columns)
 
-            # Exécution en batch pour performance
-            await session.execute(text(insert_query), clean_records)
+            # Petits lots: INSERT ... VALUES multi-lignes avec ON CONFLICT
+            if merge_counts is None:
+                merge_counts = await values_upsert(session, self.schema, self.table_name, clean_records,
+                                                   columns, update_columns)
 
-            logger.debug(f"✅ {len(clean_records)} enregistrements insérés/mis à jour")
-            return len(clean_records)
+            logger.debug(f"✅ {merge_counts['inserted']} insérés, {merge_counts['updated']} mis à jour, "
+                         f"{merge_counts['unchanged']} inchangés")
+            return merge_counts
 
         except Exception as e:
             logger.error(f"❌ Erreur insertion enregistrements: {e}")
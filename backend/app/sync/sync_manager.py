@@ -1,13 +1,25 @@
 # backend/app/sync/sync_manager.py - CONFIGURATION COMPLÈTE ERP
 import asyncio
+import json
+import time
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from ..core.config import settings
 from ..core.database import get_async_session_context
-from ..utils.hfsql_connector import HFSQLConnector
+from ..utils.hfsql_connector import get_hfsql_pool
 from .strategies.id_based_sync import IdBasedSyncStrategy
+from .batch_sizer import AdaptiveBatchSizer
+from .pipeline import SyncPipeline
+from .change_detection import with_content_hashes, select_changed_records
+from .spool import PageSpool
+from .transform_executor import TransformExecutor
+from .transformers.string_cache import reset_string_cache
+from .transformers.anomalies import AnomalyCounter
+from .dead_letter import DeadLetterStore, STAGE_TRANSFORM, STAGE_INSERT
 
 # Import de tous les transformers
 from .transformers.product_transformer import ProductTransformer
@@ -19,12 +31,25 @@ from .transformers.sales_detail_transformer import SalesDetailTransformer
 
 class SyncResult:
     def __init__(self, table_name: str, status: str, records_processed: int = 0,
-                 error_message: str = None, duration_ms: int = 0):
+                 error_message: str = None, duration_ms: int = 0, pages_processed: int = 0,
+                 rows_per_second: float = 0.0, remaining_lag: int = 0, last_sync_id: int = 0,
+                 inserted: int = 0, updated: int = 0, unchanged: int = 0, rows_scanned: int = 0,
+                 anomalies: int = 0, dead_letters: int = 0):
         self.table_name = table_name
         self.status = status  # 'SUCCESS', 'ERROR', 'NO_CHANGES'
         self.records_processed = records_processed
         self.error_message = error_message
         self.duration_ms = duration_ms
+        self.pages_processed = pages_processed  # Pages keyset traitées pendant le cycle
+        self.rows_per_second = rows_per_second  # Débit HFSQL → PostgreSQL
+        self.remaining_lag = remaining_lag  # IDs HFSQL restant à synchroniser après le cycle
+        self.last_sync_id = last_sync_id
+        self.inserted = inserted  # Lignes PostgreSQL créées
+        self.updated = updated  # Lignes existantes dont le contenu a changé
+        self.unchanged = unchanged  # Lignes déjà à jour, non réécrites
+        self.rows_scanned = rows_scanned  # Lignes HFSQL relues par un balayage d'empreintes
+        self.anomalies = anomalies  # Anomalies de transformation (conversions, calculs corrigés, rejets)
+        self.dead_letters = dead_letters  # Lignes rejetées mises en file des rejets
         self.timestamp = datetime.now()
 
 
@@ -35,13 +60,21 @@ class SynergoSyncManager:
     """
 
     def __init__(self):
-        self.hfsql_connector = HFSQLConnector()
+        self.hfsql_pool = get_hfsql_pool()
         self.sync_tables_config = self._load_complete_sync_config()
+        # Pages HFSQL brutes rejouées après un échec de transformation/chargement
+        self.spool = (PageSpool(settings.SYNC_SPOOL_DIR, settings.SYNC_SPOOL_MAX_MB * 1024 * 1024)
+                      if settings.SYNC_SPOOL_ENABLED else None)
+        # Gros lots transformés en parallèle dans des processus dédiés
+        self.transform_executor = TransformExecutor()
+        # Lignes rejetées conservées pour être rejouées
+        self.dead_letters = DeadLetterStore() if settings.SYNC_DEAD_LETTER_ENABLED else None
 
     def _load_complete_sync_config(self) -> Dict[str, Dict]:
         """
         Configuration complète des tables à synchroniser
-        Ordre critique pour respecter les FK: produits → achats → ventes
+        depends_on: tables parentes (FK) à synchroniser avant la table
+        content_hash: empreinte des lignes + balayage des modifications
         """
         return {
             # 1. PRODUITS - Base du référentiel (priorité max)
@@ -54,7 +87,8 @@ class SynergoSyncManager:
                 'sync_interval_minutes': 60,  # Moins fréquent car stable
                 'batch_size': 500,
                 'schema': 'synergo_core',
-                'sync_order': 1
+                'content_hash': True,  # Corrections de prix/fiches détectées par balayage
+                'depends_on': []
             },
 
             # 2. ACHATS EN-TÊTES - Commandes fournisseurs
@@ -67,7 +101,8 @@ class SynergoSyncManager:
                 'sync_interval_minutes': 45,
                 'batch_size': 750,
                 'schema': 'synergo_core',
-                'sync_order': 2
+                'content_hash': True,  # En-têtes modifiables après saisie
+                'depends_on': ['products_catalog']
             },
 
             # 3. ACHATS DÉTAILS - Crucial pour calcul marge
@@ -80,7 +115,7 @@ class SynergoSyncManager:
                 'sync_interval_minutes': 30,  # Fréquent car impact stock/prix
                 'batch_size': 1000,
                 'schema': 'synergo_core',
-                'sync_order': 3
+                'depends_on': ['purchase_orders', 'products_catalog']
             },
 
             # 4. VENTES EN-TÊTES - Transactions clients
@@ -93,7 +128,8 @@ class SynergoSyncManager:
                 'sync_interval_minutes': 15,  # Très fréquent car temps réel
                 'batch_size': 1000,
                 'schema': 'synergo_core',
-                'sync_order': 4
+                'content_hash': True,  # En-têtes modifiables après saisie
+                'depends_on': ['products_catalog']
             },
 
             # 5. VENTES DÉTAILS - Marges par ligne
@@ -106,50 +142,101 @@ class SynergoSyncManager:
                 'sync_interval_minutes': 15,  # Très fréquent car temps réel
                 'batch_size': 1000,
                 'schema': 'synergo_core',
-                'sync_order': 5
+                'depends_on': ['sales_orders', 'products_catalog']
             }
         }
 
+    def get_sync_order(self) -> List[str]:
+        """
+        Tables dans un ordre compatible avec les dépendances FK (tri topologique)
+
+        Lève ValueError si une dépendance est inconnue ou circulaire.
+        """
+        remaining = {
+            table_key: set(config.get('depends_on', []))
+            for table_key, config in self.sync_tables_config.items()
+        }
+
+        for table_key, dependencies in remaining.items():
+            unknown = dependencies - remaining.keys()
+            if unknown:
+                raise ValueError(f"Dépendance inconnue pour {table_key}: {', '.join(sorted(unknown))}")
+
+        order = []
+        while remaining:
+            ready = [table_key for table_key, dependencies in remaining.items() if not dependencies - set(order)]
+            if not ready:
+                raise ValueError(f"Dépendances circulaires entre: {', '.join(sorted(remaining))}")
+
+            for table_key in ready:
+                order.append(table_key)
+                del remaining[table_key]
+
+        return order
+
     async def sync_all_active_tables(self) -> List[SyncResult]:
         """
-        Synchronise toutes les tables actives dans l'ordre optimal
+        Synchronise toutes les tables actives en respectant les dépendances FK
         """
-        results = []
+        return await self.sync_tables(list(self.sync_tables_config))
+
+    async def sync_tables(self, table_keys: List[str]) -> List[SyncResult]:
+        """
+        Synchronise les tables demandées en respectant les dépendances FK
 
-        logger.info("🔄 Début synchronisation ERP complète Synergo")
+        Chaque table démarre dès que ses parentes présentes dans la liste sont
+        terminées; les tables indépendantes tournent en parallèle, au plus une
+        par connexion du pool HFSQL. Un cycle dure donc environ la chaîne la
+        plus lente.
+        """
+        logger.info(f"🔄 Début synchronisation ERP Synergo ({len(table_keys)} tables)")
         start_time = datetime.now()
 
-        # Tri par ordre de synchronisation (respect des FK)
-        sorted_configs = sorted(
-            self.sync_tables_config.items(),
-            key=lambda x: x[1].get('sync_order', 999)
-        )
+        # Cache de chaînes neuf pour le cycle, partagé par ses transformateurs
+        reset_string_cache()
+
+        sync_order = [table_key for table_key in self.get_sync_order() if table_key in table_keys]
+        finished = {table_key: asyncio.Event() for table_key in sync_order}
+        table_results: Dict[str, SyncResult] = {}
+        slots = asyncio.Semaphore(self.hfsql_pool.max_size)
 
-        for table_key, config in sorted_configs:
+        async def run_table(table_key: str):
+            config = self.sync_tables_config[table_key]
             try:
-                logger.info(f"📊 Sync {config['sync_order']}/5: {config['table_name']} ← {config['hfsql_table']}")
-                result = await self.sync_single_table(config)
-                results.append(result)
+                for dependency in config.get('depends_on', []):
+                    if dependency not in finished:
+                        continue  # Parente synchronisée à son propre rythme
+                    await finished[dependency].wait()
+                    if table_results[dependency].status == 'ERROR':
+                        logger.warning(f"⚠️ {config['table_name']}: table parente {dependency} en erreur")
+
+                async with slots:
+                    logger.info(f"📊 Sync {config['table_name']} ← {config['hfsql_table']}")
+                    result = await self.sync_single_table(config)
 
                 # Log résultat avec émojis pour lisibilité
                 if result.status == 'SUCCESS':
                     logger.info(
-                        f"✅ {config['table_name']}: {result.records_processed} enregistrements en {result.duration_ms}ms")
+                        f"✅ {config['table_name']}: {result.records_processed} enregistrements en {result.duration_ms}ms "
+                        f"({result.rows_per_second:.0f} lignes/s, retard {result.remaining_lag} IDs)")
                 elif result.status == 'NO_CHANGES':
                     logger.info(f"📌 {config['table_name']}: Aucun nouveau enregistrement")
                 else:
                     logger.error(f"❌ {config['table_name']}: {result.error_message}")
 
-                # Pause courte entre tables pour éviter la surcharge
-                await asyncio.sleep(0.5)
-
             except Exception as e:
                 logger.error(f"❌ Erreur sync {config['table_name']}: {e}")
-                results.append(SyncResult(
+                result = SyncResult(
                     table_name=config['table_name'],
                     status='ERROR',
                     error_message=str(e)
-                ))
+                )
+
+            table_results[table_key] = result
+            finished[table_key].set()
+
+        await asyncio.gather(*(run_table(table_key) for table_key in sync_order))
+        results = [table_results[table_key] for table_key in sync_order]
 
         # Résumé global avec statistiques détaillées
         total_duration = (datetime.now() - start_time).total_seconds()
@@ -187,9 +274,49 @@ class SynergoSyncManager:
 
         return results
 
+    async def _spooled_pages(self, table_name: str, strategy: IdBasedSyncStrategy, last_sync_id: int,
+                             row_limit: int, id_field: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Pages brutes depuis last_sync_id: d'abord celles du spool, puis HFSQL
+
+        Chaque page lue sur HFSQL est spoolée avant d'être transmise: si sa
+        transformation ou son chargement échoue, le cycle suivant la rejoue
+        sans solliciter HFSQL.
+        """
+        cursor = last_sync_id
+        rows = 0
+
+        for page in self.spool.replay_chain(table_name, last_sync_id):
+            if rows >= row_limit:
+                return
+
+            records = await asyncio.to_thread(self.spool.read, page)
+            if records is None:
+                break  # Page corrompue: la suite est relue sur HFSQL
+
+            logger.debug(f"💾 {table_name}: Page {page.after_id}-{page.last_id} rejouée depuis le spool")
+            cursor = page.last_id
+            rows += len(records)
+            yield records
+
+        if rows >= row_limit:
+            return
+
+        async for records in strategy.stream_new_records(cursor, max_rows=row_limit - rows):
+            page_last_id = int(max(record[id_field] for record in records))
+            await asyncio.to_thread(self.spool.write, table_name, cursor, page_last_id, records)
+            cursor = page_last_id
+            rows += len(records)
+            yield records
+
     async def sync_single_table(self, config: Dict[str, Any]) -> SyncResult:
         """
         Synchronise une table spécifique avec gestion d'erreurs renforcée
+
+        En mode drain (par défaut), le flux keyset (id > last_sync_id) est lu
+        page par page jusqu'à épuisement de HFSQL ou jusqu'au budget lignes/temps
+        du cycle. Chaque page est commitée avec son last_sync_id: un crash ne
+        fait perdre qu'une page au maximum.
         """
         start_time = datetime.now()
         table_name = config['table_name']
@@ -199,76 +326,200 @@ class SynergoSyncManager:
             async with get_async_session_context() as session:
                 sync_state = await self._get_sync_state(session, table_name)
                 last_sync_id = sync_state.get('last_sync_id', 0) if sync_state else 0
+                total_records = (sync_state.get('total_records') or 0) if sync_state else 0
+                learned_batch_size = sync_state.get('learned_batch_size') if sync_state else None
 
             logger.debug(f"🔍 {table_name}: Dernier ID synchronisé = {last_sync_id}")
 
-            # 2. Créer la stratégie de sync appropriée
-            if config['strategy'] == 'ID_BASED':
-                strategy = IdBasedSyncStrategy(config, self.hfsql_connector)
-            else:
-                raise ValueError(f"Stratégie non supportée: {config['strategy']}")
-
-            # 3. Récupérer les nouveaux enregistrements HFSQL
-            new_records = await strategy.get_new_records(last_sync_id)
-
-            if not new_records:
-                logger.debug(f"📌 {table_name}: Aucun nouveau enregistrement depuis ID {last_sync_id}")
+            # Chargement initial par partitions en cours: il reprendra lui-même la main
+            if sync_state and sync_state.get('last_sync_status') == 'INITIAL_LOAD':
+                logger.info(f"⏭️ {table_name}: Chargement initial en cours, sync incrémentale ignorée")
                 return SyncResult(
                     table_name=table_name,
                     status='NO_CHANGES',
-                    duration_ms=int((datetime.now() - start_time).total_seconds() * 1000)
-                )
-
-            logger.debug(f"📥 {table_name}: {len(new_records)} nouveaux enregistrements trouvés")
-
-            # 4. Transformer les données avec le bon transformer
-            transformer = config['transformer']()
-            transformed_records = await transformer.transform_batch(new_records)
-
-            if not transformed_records:
-                logger.warning(f"⚠️ {table_name}: Aucun enregistrement valide après transformation")
-                return SyncResult(
-                    table_name=table_name,
-                    status='ERROR',
-                    error_message="Aucun enregistrement valide après transformation",
-                    duration_ms=int((datetime.now() - start_time).total_seconds() * 1000)
+                    duration_ms=int((datetime.now() - start_time).total_seconds() * 1000),
+                    last_sync_id=last_sync_id
                 )
 
-            logger.debug(f"🔄 {table_name}: {len(transformed_records)} enregistrements transformés")
-
-            # 5. Insérer en PostgreSQL + Mettre à jour l'état de sync
-            async with get_async_session_context() as session:
-                inserted_count = await strategy.insert_records(session, transformed_records)
-
-                # 6. Mettre à jour last_sync_id
-                new_last_id = max(record[config['id_field']] for record in new_records)
+            # 2. Emprunter une connexion HFSQL au pool (réutilisée entre tables et cycles)
+            async with self.hfsql_pool.acquire() as hfsql_connector:
+                # Créer la stratégie de sync appropriée
+                transformer = config['transformer']()
 
-                # S'assurer que new_last_id est un entier
-                if isinstance(new_last_id, str):
-                    new_last_id = int(new_last_id)
-
-                await self._update_sync_state(session, table_name, {
-                    'last_sync_id': new_last_id,
-                    'last_sync_timestamp': datetime.now(),
-                    'total_records': sync_state.get('total_records',
-                                                    0) + inserted_count if sync_state else inserted_count,
-                    'last_sync_status': 'SUCCESS',
-                    'records_processed_last_sync': inserted_count,
-                    'last_sync_duration': int((datetime.now() - start_time).total_seconds())
-                })
+                if config['strategy'] == 'ID_BASED':
+                    # Projection: seules les colonnes mappées par le transformateur sont lues
+                    strategy = IdBasedSyncStrategy(config, hfsql_connector,
+                                                   source_fields=transformer.get_source_fields())
+                else:
+                    raise ValueError(f"Stratégie non supportée: {config['strategy']}")
+
+                # Taille de lot adaptative, repartant de la dernière valeur apprise
+                batch_sizer = None
+                if config.get('adaptive_batch', True):
+                    batch_sizer = AdaptiveBatchSizer(
+                        initial_size=learned_batch_size or strategy.batch_size,
+                        min_size=config.get('batch_size_min', settings.SYNC_BATCH_SIZE_MIN),
+                        max_size=config.get('batch_size_max', settings.SYNC_BATCH_SIZE_MAX),
+                        target_seconds=config.get('batch_target_seconds', settings.SYNC_BATCH_TARGET_SECONDS)
+                    )
+                    strategy.batch_size = batch_sizer.batch_size
+
+                # Budget du cycle: une seule page hors mode drain
+                drain_mode = config.get('drain_mode', True)
+                max_rows = config.get('max_rows_per_cycle', settings.SYNC_MAX_ROWS_PER_CYCLE)
+                max_seconds = config.get('max_seconds_per_cycle', settings.SYNC_MAX_SECONDS_PER_CYCLE)
+
+                records_fetched = 0
+                records_processed = 0
+                pages_processed = 0
+                write_counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+                budget_reached = False
+                anomaly_count = 0
+                dead_letter_count = 0
+
+                # 3. Pipeline HFSQL → transformation → chargement: la page N+1 est extraite
+                #    pendant le chargement de la page N (files bornées à quelques pages)
+                row_limit = max_rows if drain_mode else strategy.batch_size
+                pipeline = SyncPipeline(self._get_transform(config, transformer, page_report=True),
+                                        queue_size=config.get('pipeline_depth', settings.SYNC_PIPELINE_DEPTH))
+                if self.spool is not None:
+                    source = self._spooled_pages(table_name, strategy, last_sync_id, row_limit, config['id_field'])
+                else:
+                    source = strategy.stream_new_records(last_sync_id, max_rows=row_limit)
+                pages = pipeline.run(source)
+
+                page_started = time.monotonic()
+
+                async with aclosing(pages):
+                    # Anomalies et rejets propres à chaque page: les pages lues d'avance ont les leurs
+                    async for new_records, (transformed_records, anomalies, rejected) in pages:
+                        logger.debug(f"📥 {table_name}: {len(new_records)} nouveaux enregistrements trouvés")
+
+                        # 4. Page sans enregistrement valide: chargée comme les autres si ses
+                        #    lignes partent en file des rejets, sinon la table resterait bloquée
+                        if not transformed_records and not (self.dead_letters is not None and rejected):
+                            logger.warning(f"⚠️ {table_name}: Aucun enregistrement valide après transformation")
+                            await self._log_anomalies(table_name, anomalies, len(new_records))
+                            return SyncResult(
+                                table_name=table_name,
+                                status='ERROR',
+                                records_processed=records_processed,
+                                error_message="Aucun enregistrement valide après transformation",
+                                duration_ms=int((datetime.now() - start_time).total_seconds() * 1000),
+                                pages_processed=pages_processed,
+                                last_sync_id=last_sync_id
+                            )
+
+                        if transformed_records:
+                            logger.debug(f"🔄 {table_name}: {len(transformed_records)} enregistrements transformés")
+                        else:
+                            logger.warning(f"⚠️ {table_name}: Page entièrement rejetée, "
+                                           f"{len(rejected)} lignes mises en file des rejets")
+
+                        # 5. Insérer en PostgreSQL + checkpoint de la page
+                        async with get_async_session_context() as session:
+                            page_counts = await strategy.upsert_records(session, transformed_records)
+                            inserted_count = sum(page_counts.values())
+
+                            # 6. Mettre à jour last_sync_id
+                            new_last_id = max(record[config['id_field']] for record in new_records)
+
+                            # S'assurer que new_last_id est un entier
+                            if isinstance(new_last_id, str):
+                                new_last_id = int(new_last_id)
+
+                            total_records += inserted_count
+                            records_processed += inserted_count
+
+                            # Lignes rejetées gardées dans la transaction du checkpoint qui les dépasse
+                            dead_letter_count += await self._save_dead_letters(session, config, strategy,
+                                                                               rejected, new_records)
+
+                            state_updates = {
+                                'last_sync_id': new_last_id,
+                                'last_sync_timestamp': datetime.now(),
+                                'total_records': total_records,
+                                'last_sync_status': 'SUCCESS',
+                                'records_processed_last_sync': records_processed,
+                                'last_sync_duration': int((datetime.now() - start_time).total_seconds())
+                            }
+
+                            # Durée extraction + transformation + chargement du lot → taille du suivant
+                            if batch_sizer is not None:
+                                strategy.batch_size = batch_sizer.record(len(new_records),
+                                                                         time.monotonic() - page_started)
+                                state_updates['learned_batch_size'] = strategy.batch_size
+
+                            await self._update_sync_state(session, table_name, state_updates)
+
+                            await session.commit()
+
+                        # Page commitée: sa copie spool n'est plus nécessaire
+                        if self.spool is not None:
+                            await asyncio.to_thread(self.spool.discard_through, table_name, new_last_id)
+
+                        anomaly_count += anomalies.total
+                        await self._log_anomalies(table_name, anomalies, len(new_records))
+
+                        page_started = time.monotonic()
+
+                        for key, count in page_counts.items():
+                            write_counts[key] += count
+
+                        last_sync_id = new_last_id
+                        records_fetched += len(new_records)
+                        pages_processed += 1
+
+                        elapsed_seconds = (datetime.now() - start_time).total_seconds()
+                        if drain_mode and elapsed_seconds >= max_seconds:
+                            logger.info(f"⏸️ {table_name}: Budget temps du cycle atteint "
+                                        f"({records_fetched} lignes, {elapsed_seconds:.1f}s), reprise au prochain cycle")
+                            budget_reached = True
+                            break
+
+                # Flux terminé sur la limite de lignes: HFSQL n'est peut-être pas épuisé
+                exhausted = not budget_reached and records_fetched < row_limit
+                if drain_mode and not exhausted and not budget_reached:
+                    logger.info(f"⏸️ {table_name}: Budget lignes du cycle atteint "
+                                f"({records_fetched} lignes), reprise au prochain cycle")
+
+                duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+
+                if pages_processed == 0:
+                    logger.debug(f"📌 {table_name}: Aucun nouveau enregistrement depuis ID {last_sync_id}")
+                    return SyncResult(
+                        table_name=table_name,
+                        status='NO_CHANGES',
+                        duration_ms=duration_ms,
+                        last_sync_id=last_sync_id
+                    )
 
-                await session.commit()
+                # Retard restant: inutile d'interroger HFSQL si la table est épuisée
+                remaining_lag = 0
+                if not exhausted:
+                    remaining_lag = max(await strategy.get_hfsql_max_id() - last_sync_id, 0)
 
-            duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+                rows_per_second = records_fetched / (duration_ms / 1000) if duration_ms > 0 else 0.0
 
-            logger.debug(f"✅ {table_name}: {inserted_count} enregistrements synchronisés avec succès")
+                logger.debug(f"✅ {table_name}: {records_processed} enregistrements synchronisés avec succès "
+                             f"({pages_processed} pages, {rows_per_second:.0f} lignes/s, retard {remaining_lag} IDs, "
+                             f"{write_counts['inserted']} insérés, {write_counts['updated']} mis à jour, "
+                             f"{write_counts['unchanged']} inchangés, {anomaly_count} anomalies, "
+                             f"{dead_letter_count} rejets)")
 
-            return SyncResult(
-                table_name=table_name,
-                status='SUCCESS',
-                records_processed=inserted_count,
-                duration_ms=duration_ms
-            )
+                return SyncResult(
+                    table_name=table_name,
+                    status='SUCCESS',
+                    records_processed=records_processed,
+                    duration_ms=duration_ms,
+                    pages_processed=pages_processed,
+                    rows_per_second=rows_per_second,
+                    remaining_lag=remaining_lag,
+                    last_sync_id=last_sync_id,
+                    anomalies=anomaly_count,
+                    dead_letters=dead_letter_count,
+                    **write_counts
+                )
 
         except Exception as e:
             # En cas d'erreur, log détaillé et mettre à jour l'état
@@ -328,6 +579,399 @@ class SynergoSyncManager:
 
         return results
 
+    async def initial_load_table(self, table_name: str, partitions: Optional[int] = None,
+                                 restart: bool = False) -> SyncResult:
+        """
+        Chargement initial parallèle d'une table par plages d'ID
+
+        La plage [MIN(id), MAX(id)] HFSQL est découpée en N partitions extraites
+        simultanément sur des connexions distinctes du pool, puis transformées
+        et chargées indépendamment. La progression de chaque partition est
+        commitée dans synergo_sync.sync_partitions: après une interruption, un
+        nouvel appel ne relit que ce qui manque. Une fois toutes les partitions
+        terminées, la sync incrémentale reprend depuis MAX(id). Un nouvel appel
+        sur un chargement déjà promu ne touche pas au checkpoint (restart=True
+        pour tout recharger).
+        """
+        start_time = datetime.now()
+
+        config = self.sync_tables_config.get(table_name)
+        if config is None:
+            return SyncResult(table_name=table_name, status='ERROR',
+                              error_message=f"Table {table_name} non configurée")
+
+        partitions = partitions or config.get('initial_load_partitions', settings.SYNC_INITIAL_LOAD_PARTITIONS)
+
+        try:
+            async with get_async_session_context() as session:
+                if restart:
+                    await session.execute(text(
+                        "DELETE FROM synergo_sync.sync_partitions WHERE table_name = :table_name"
+                    ), {'table_name': table_name})
+                    await session.commit()
+
+                plan = await self._get_partitions(session, table_name)
+                state = await self._get_sync_state(session, table_name) or {}
+
+            pending = [p for p in plan if p['status'] != 'COMPLETED']
+            if plan and not pending and state.get('last_sync_status') != 'INITIAL_LOAD':
+                # Chargement déjà terminé et promu: la sync incrémentale a pu avancer depuis
+                logger.info(f"📌 {table_name}: Chargement initial déjà terminé, checkpoint conservé "
+                            f"(ID {state.get('last_sync_id')})")
+                return SyncResult(table_name=table_name, status='NO_CHANGES',
+                                  last_sync_id=state.get('last_sync_id') or 0)
+
+            if plan:
+                logger.info(f"♻️ {table_name}: Reprise du chargement initial "
+                            f"({len(pending)}/{len(plan)} partitions restantes)")
+            else:
+                plan = await self._plan_partitions(config, partitions)
+                if not plan:
+                    logger.info(f"📌 {table_name}: Table HFSQL vide, rien à charger")
+                    return SyncResult(table_name=table_name, status='NO_CHANGES')
+                pending = plan
+
+            results = await asyncio.gather(*(self._load_partition(config, p) for p in pending),
+                                           return_exceptions=True)
+
+            errors = [r for r in results if isinstance(r, Exception)]
+            records_processed = sum(r for r in results if not isinstance(r, Exception))
+            duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            rows_per_second = records_processed / (duration_ms / 1000) if duration_ms > 0 else 0.0
+
+            if errors:
+                error_msg = f"{len(errors)}/{len(pending)} partitions en échec: {errors[0]}"
+                logger.error(f"❌ {table_name}: Chargement initial incomplet - {error_msg}")
+
+                async with get_async_session_context() as session:
+                    await self._update_sync_state(session, table_name, {'error_message': error_msg[:500]})
+                    await session.commit()
+
+                return SyncResult(table_name=table_name, status='ERROR', records_processed=records_processed,
+                                  error_message=error_msg, duration_ms=duration_ms,
+                                  rows_per_second=rows_per_second)
+
+            # Toutes les partitions sont chargées: bascule vers la sync incrémentale
+            final_last_id = max(p['range_end'] for p in plan)
+
+            async with get_async_session_context() as session:
+                result = await session.execute(text("""
+                SELECT COALESCE(SUM(records_loaded), 0)
+                FROM synergo_sync.sync_partitions
+                WHERE table_name = :table_name
+                """), {'table_name': table_name})
+                total_records = result.scalar() or 0
+
+                await self._update_sync_state(session, table_name, {
+                    'last_sync_id': final_last_id,
+                    'last_sync_timestamp': datetime.now(),
+                    'total_records': total_records,
+                    'last_sync_status': 'SUCCESS',
+                    'error_message': None,
+                    'records_processed_last_sync': records_processed,
+                    'last_sync_duration': int(duration_ms / 1000)
+                })
+                await session.commit()
+
+            logger.info(f"✅ {table_name}: Chargement initial terminé - {total_records} enregistrements "
+                        f"en {len(plan)} partitions ({rows_per_second:.0f} lignes/s), reprise incrémentale "
+                        f"depuis ID {final_last_id}")
+
+            return SyncResult(table_name=table_name, status='SUCCESS', records_processed=records_processed,
+                              duration_ms=duration_ms, rows_per_second=rows_per_second,
+                              last_sync_id=final_last_id)
+
+        except Exception as e:
+            logger.error(f"❌ {table_name}: Erreur chargement initial - {e}")
+            return SyncResult(table_name=table_name, status='ERROR', error_message=str(e),
+                              duration_ms=int((datetime.now() - start_time).total_seconds() * 1000))
+
+    async def _plan_partitions(self, config: Dict[str, Any], partitions: int) -> List[Dict[str, Any]]:
+        """Lit MIN/MAX(id) HFSQL, découpe la plage et enregistre les partitions"""
+        table_name = config['table_name']
+
+        async with self.hfsql_pool.acquire() as hfsql_connector:
+            strategy = IdBasedSyncStrategy(config, hfsql_connector)
+            min_id = await strategy.get_hfsql_min_id()
+            max_id = await strategy.get_hfsql_max_id()
+
+        ranges = IdBasedSyncStrategy.split_id_range(min_id, max_id, partitions) if max_id else []
+        if not ranges:
+            return []
+
+        logger.info(f"🧩 {table_name}: IDs {min_id} à {max_id} découpés en {len(ranges)} partitions")
+
+        async with get_async_session_context() as session:
+            for index, (range_start, range_end) in enumerate(ranges):
+                await session.execute(text("""
+                INSERT INTO synergo_sync.sync_partitions
+                (table_name, partition_index, range_start, range_end, last_loaded_id, status)
+                VALUES (:table_name, :partition_index, :range_start, :range_end, :last_loaded_id, 'PENDING')
+                """), {
+                    'table_name': table_name,
+                    'partition_index': index,
+                    'range_start': range_start,
+                    'range_end': range_end,
+                    'last_loaded_id': range_start - 1
+                })
+
+            # Suspend la sync incrémentale de la table jusqu'à la fin du chargement
+            await self._update_sync_state(session, table_name, {'last_sync_status': 'INITIAL_LOAD'})
+            await session.commit()
+
+            return await self._get_partitions(session, table_name)
+
+    async def _load_partition(self, config: Dict[str, Any], partition: Dict[str, Any]) -> int:
+        """Extrait, transforme et charge une partition sur sa propre connexion HFSQL"""
+        table_name = config['table_name']
+        index = partition['partition_index']
+        last_loaded_id = partition['last_loaded_id']
+        records_loaded = partition['records_loaded']
+        records_processed = 0
+
+        try:
+            async with self.hfsql_pool.acquire() as hfsql_connector:
+                transformer = config['transformer']()
+                strategy = IdBasedSyncStrategy(config, hfsql_connector,
+                                               source_fields=transformer.get_source_fields())
+
+                async with get_async_session_context() as session:
+                    await self._update_partition(session, table_name, index, {
+                        'status': 'RUNNING',
+                        'started_at': datetime.now(),
+                        'error_message': None
+                    })
+                    await session.commit()
+
+                logger.debug(f"🚚 {table_name}[{index}]: IDs {last_loaded_id + 1} à {partition['range_end']}")
+
+                pipeline = SyncPipeline(self._get_transform(config, transformer, page_report=True),
+                                        queue_size=config.get('pipeline_depth', settings.SYNC_PIPELINE_DEPTH))
+                pages = pipeline.run(strategy.stream_new_records(last_loaded_id, upper_id=partition['range_end']))
+
+                async with aclosing(pages):
+                    async for new_records, (transformed_records, anomalies, rejected) in pages:
+                        if not transformed_records and not (self.dead_letters is not None and rejected):
+                            await self._log_anomalies(table_name, anomalies, len(new_records))
+                            raise ValueError("Aucun enregistrement valide après transformation "
+                                             f"(après ID {last_loaded_id})")
+
+                        # Page chargée et progression de la partition dans la même transaction
+                        async with get_async_session_context() as session:
+                            inserted_count = await strategy.insert_records(session, transformed_records)
+                            new_last_id = int(max(record[config['id_field']] for record in new_records))
+
+                            records_loaded += inserted_count
+                            await self._save_dead_letters(session, config, strategy, rejected, new_records)
+                            await self._update_partition(session, table_name, index, {
+                                'last_loaded_id': new_last_id,
+                                'records_loaded': records_loaded
+                            })
+                            await session.commit()
+
+                        await self._log_anomalies(table_name, anomalies, len(new_records))
+                        last_loaded_id = new_last_id
+                        records_processed += inserted_count
+
+            async with get_async_session_context() as session:
+                await self._update_partition(session, table_name, index, {
+                    'status': 'COMPLETED',
+                    'completed_at': datetime.now()
+                })
+                await session.commit()
+
+            logger.debug(f"✅ {table_name}[{index}]: {records_processed} enregistrements chargés")
+            return records_processed
+
+        except Exception as e:
+            logger.error(f"❌ {table_name}[{index}]: Erreur partition - {e}")
+            try:
+                async with get_async_session_context() as session:
+                    await self._update_partition(session, table_name, index, {
+                        'status': 'ERROR',
+                        'error_message': str(e)[:500]
+                    })
+                    await session.commit()
+            except Exception as update_error:
+                logger.error(f"❌ Erreur mise à jour partition après échec: {update_error}")
+            raise
+
+    def _get_transform(self, config: Dict[str, Any], transformer, page_report: bool = False):
+        """
+        Transformation de lot (pool de processus pour les gros lots), avec empreintes si la table les suit
+
+        Avec page_report, chaque lot renvoie (enregistrements, anomalies du
+        lot, lignes rejetées du lot): le pipeline transforme les pages
+        suivantes avant le commit de la page courante, anomalies et rejets
+        voyagent donc avec leur page jusqu'à _log_anomalies et
+        _save_dead_letters.
+        """
+        transform = self.transform_executor.get_transform(transformer)
+        if config.get('content_hash'):
+            transform = with_content_hashes(transform, config['id_field'])
+        if not page_report:
+            return transform
+
+        hashed_transform = transform
+
+        async def transform_with_report(records: List[Dict[str, Any]]
+                                        ) -> Tuple[List[Dict[str, Any]], AnomalyCounter, List[Tuple[Dict[str, Any], str]]]:
+            transformed = await hashed_transform(records)
+            # Copie: le compteur du transformateur est remis à zéro au lot suivant
+            anomalies = AnomalyCounter()
+            anomalies.merge(transformer.anomalies)
+            return transformed, anomalies, transformer.rejected
+
+        return transform_with_report
+
+    async def sweep_table_changes(self, table_name: str, max_rows: Optional[int] = None) -> SyncResult:
+        """
+        Balayage des empreintes: détecte les lignes HFSQL modifiées
+
+        Relit au plus max_rows lignes déjà synchronisées à partir du curseur
+        sweep_cursor_id, compare leurs empreintes à content_hash et ne
+        recharge que les lignes différentes (ou absentes de PostgreSQL).
+        Le curseur revient au début une fois last_sync_id atteint. Les IDs
+        balayés (<= last_sync_id) ne chevauchent jamais la sync incrémentale.
+        """
+        start_time = datetime.now()
+
+        config = self.sync_tables_config.get(table_name)
+        if config is None or not config.get('content_hash'):
+            return SyncResult(table_name=table_name, status='ERROR',
+                              error_message=f"Table {table_name} sans empreintes de contenu")
+
+        id_field = config['id_field']
+        max_rows = max_rows or config.get('sweep_rows', settings.SYNC_HASH_SWEEP_ROWS)
+        write_counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        rows_scanned = 0
+
+        try:
+            async with get_async_session_context() as session:
+                sync_state = await self._get_sync_state(session, table_name)
+
+            last_sync_id = int(sync_state['last_sync_id'] or 0) if sync_state else 0
+            if not last_sync_id:
+                return SyncResult(table_name=table_name, status='NO_CHANGES')
+
+            cursor_id = int(sync_state.get('sweep_cursor_id') or 0)
+            if cursor_id >= last_sync_id:
+                cursor_id = 0  # Tour complet: reprise au début de la table
+
+            logger.debug(f"🔎 {table_name}: Balayage des empreintes depuis ID {cursor_id} (max {max_rows} lignes)")
+
+            async with self.hfsql_pool.acquire() as hfsql_connector:
+                transformer = config['transformer']()
+                strategy = IdBasedSyncStrategy(config, hfsql_connector,
+                                               source_fields=transformer.get_source_fields())
+                transform = self._get_transform(config, transformer)
+
+                pages = strategy.stream_new_records(cursor_id, max_rows=max_rows, upper_id=last_sync_id)
+                async with aclosing(pages):
+                    async for records in pages:
+                        page_last_id = int(max(record[id_field] for record in records))
+
+                        # Page rechargée et curseur du balayage dans la même transaction
+                        async with get_async_session_context() as session:
+                            stored_hashes = await strategy.get_content_hashes(
+                                session, [int(record[id_field]) for record in records])
+                            changed_records = select_changed_records(records, stored_hashes, id_field)
+
+                            if changed_records:
+                                page_counts = await strategy.upsert_records(session,
+                                                                            await transform(changed_records))
+                                for key, count in page_counts.items():
+                                    write_counts[key] += count
+
+                            await self._update_sync_state(session, table_name, {'sweep_cursor_id': page_last_id})
+                            await session.commit()
+
+                        rows_scanned += len(records)
+                        cursor_id = page_last_id
+
+            # Fin de table atteinte avant le budget: le prochain balayage repart du début
+            if rows_scanned < max_rows:
+                async with get_async_session_context() as session:
+                    await self._update_sync_state(session, table_name, {'sweep_cursor_id': 0})
+                    await session.commit()
+
+            duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            rows_per_second = rows_scanned / (duration_ms / 1000) if duration_ms > 0 else 0.0
+            changed_count = write_counts['inserted'] + write_counts['updated']
+
+            logger.info(f"🔎 {table_name}: {rows_scanned} lignes balayées ({rows_per_second:.0f} lignes/s), "
+                        f"{write_counts['updated']} modifiées, {write_counts['inserted']} manquantes réinsérées")
+
+            return SyncResult(
+                table_name=table_name,
+                status='SUCCESS' if changed_count else 'NO_CHANGES',
+                records_processed=changed_count,
+                duration_ms=duration_ms,
+                rows_per_second=rows_per_second,
+                last_sync_id=cursor_id,
+                rows_scanned=rows_scanned,
+                **write_counts
+            )
+
+        except Exception as e:
+            logger.error(f"❌ {table_name}: Erreur balayage des empreintes - {e}")
+            return SyncResult(table_name=table_name, status='ERROR', error_message=str(e),
+                              duration_ms=int((datetime.now() - start_time).total_seconds() * 1000),
+                              rows_scanned=rows_scanned, **write_counts)
+
+    async def reconcile_table(self, table_name: str, repair: bool = True) -> Dict[str, Any]:
+        """
+        Audit HFSQL ↔ PostgreSQL par plages d'ID jusqu'à last_sync_id
+
+        Avec repair, recharge les IDs manquants et supprime ceux disparus
+        de HFSQL, dans une seule transaction.
+        """
+        config = self.sync_tables_config.get(table_name)
+        if config is None:
+            return {'status': 'error', 'message': f"Table {table_name} non configurée"}
+
+        start_time = datetime.now()
+
+        async with self.hfsql_pool.acquire() as hfsql_connector:
+            transformer = config['transformer']()
+            strategy = IdBasedSyncStrategy(config, hfsql_connector, source_fields=transformer.get_source_fields())
+
+            async with get_async_session_context() as session:
+                sync_state = await self._get_sync_state(session, table_name)
+                upper_id = int(sync_state['last_sync_id'] or 0) if sync_state else None
+
+                if repair:
+                    report = await strategy.repair_sync_gaps(session, self._get_transform(config, transformer),
+                                                             upper_id=upper_id)
+                    await session.commit()
+                else:
+                    report = await strategy.validate_sync_integrity(session, upper_id)
+
+        # Rapport d'audit: échantillon des IDs, les totaux sont dans missing_count / extra_count
+        for key in ('missing_ids', 'extra_ids'):
+            if key in report:
+                report[key] = report[key][:100]
+
+        report['table_name'] = table_name
+        report['duration_ms'] = int((datetime.now() - start_time).total_seconds() * 1000)
+        return report
+
+    async def get_initial_load_progress(self, table_name: str) -> Dict[str, Any]:
+        """Progression du chargement initial, partition par partition"""
+        async with get_async_session_context() as session:
+            plan = await self._get_partitions(session, table_name)
+
+        total_ids = sum(p['range_end'] - p['range_start'] + 1 for p in plan)
+        loaded_ids = sum(p['last_loaded_id'] - p['range_start'] + 1 for p in plan)
+
+        return {
+            'table_name': table_name,
+            'partitions': plan,
+            'completed_partitions': sum(1 for p in plan if p['status'] == 'COMPLETED'),
+            'records_loaded': sum(p['records_loaded'] for p in plan),
+            'progress_percentage': round(loaded_ids / total_ids * 100, 1) if total_ids else 0
+        }
+
     async def get_sync_statistics(self) -> Dict[str, Any]:
         """
         Statistiques détaillées de synchronisation
@@ -343,7 +987,8 @@ class SynergoSyncManager:
                     last_sync_status,
                     records_processed_last_sync,
                     last_sync_duration,
-                    last_sync_timestamp
+                    last_sync_timestamp,
+                    learned_batch_size
                 FROM synergo_sync.sync_state
                 ORDER BY table_name
                 """
@@ -360,6 +1005,7 @@ class SynergoSyncManager:
                         'records_processed_last_sync': row[4] or 0,
                         'last_sync_duration_seconds': row[5] or 0,
                         'last_sync_timestamp': row[6].isoformat() if row[6] else None,
+                        'learned_batch_size': row[7],
                         'config': self.sync_tables_config.get(row[0], {})
                     }
                     table_stats.append(table_stat)
@@ -386,6 +1032,36 @@ class SynergoSyncManager:
                     'error_count_24h': stats_row[3] or 0
                 }
 
+                # Anomalies de transformation des dernières 24h, par table, type et champ
+                anomalies_query = """
+                SELECT
+                    l.table_name,
+                    a.value->>'kind' as kind,
+                    a.value->>'field' as field,
+                    SUM((a.value->>'count')::int) as count,
+                    (ARRAY_AGG(a.value->'sample_ids' ORDER BY l.created_at DESC))[1] as sample_ids
+                FROM synergo_sync.sync_log l, jsonb_array_elements(l.error_details->'anomalies') a
+                WHERE l.created_at >= NOW() - INTERVAL '24 hours'
+                AND l.operation = 'ANOMALIES'
+                GROUP BY l.table_name, kind, field
+                ORDER BY count DESC
+                LIMIT 50
+                """
+
+                anomalies_result = await session.execute(text(anomalies_query))
+                anomalies_24h = [
+                    {'table_name': row[0], 'kind': row[1], 'field': row[2], 'count': int(row[3] or 0),
+                     'sample_ids': (json.loads(row[4]) if isinstance(row[4], str) else row[4]) or []}
+                    for row in anomalies_result.fetchall()
+                ]
+
+                # Rejets par table (session propre: table absente tant que la migration 005 n'est pas passée)
+                try:
+                    dead_letters = await self.get_dead_letter_counts()
+                except Exception as e:
+                    logger.warning(f"⚠️ File des rejets indisponible: {e}")
+                    dead_letters = {}
+
                 # Calculs dérivés
                 total_records_all_tables = sum(t['total_records'] for t in table_stats)
                 successful_tables = sum(1 for t in table_stats if t['last_sync_status'] == 'SUCCESS')
@@ -393,6 +1069,8 @@ class SynergoSyncManager:
                 return {
                     'table_statistics': table_stats,
                     'global_statistics_24h': global_stats,
+                    'anomalies_24h': anomalies_24h,
+                    'dead_letters': dead_letters,
                     'summary': {
                         'total_tables_configured': len(self.sync_tables_config),
                         'total_records_all_tables': total_records_all_tables,
@@ -400,6 +1078,7 @@ class SynergoSyncManager:
                         'error_tables': len(table_stats) - successful_tables,
                         'sync_health_percentage': (successful_tables / len(table_stats) * 100) if table_stats else 0
                     },
+                    'hfsql_pool': self.hfsql_pool.get_metrics(),
                     'generated_at': datetime.now().isoformat()
                 }
 
@@ -479,7 +1158,8 @@ class SynergoSyncManager:
     async def _get_sync_state(self, session: AsyncSession, table_name: str) -> Optional[Dict]:
         """Récupère l'état de synchronisation d'une table"""
         query = """
-        SELECT last_sync_id, last_sync_timestamp, total_records, last_sync_status
+        SELECT last_sync_id, last_sync_timestamp, total_records, last_sync_status, learned_batch_size,
+               sweep_cursor_id
         FROM synergo_sync.sync_state 
         WHERE table_name = :table_name
         """
@@ -491,10 +1171,56 @@ class SynergoSyncManager:
                 'last_sync_id': row[0],
                 'last_sync_timestamp': row[1],
                 'total_records': row[2],
-                'last_sync_status': row[3]
+                'last_sync_status': row[3],
+                'learned_batch_size': row[4],
+                'sweep_cursor_id': row[5]
             }
         return None
 
+    async def get_last_sync_ids(self) -> Dict[str, int]:
+        """last_sync_id de toutes les tables suivies"""
+        async with get_async_session_context() as session:
+            result = await session.execute(text("SELECT table_name, last_sync_id FROM synergo_sync.sync_state"))
+            return {row[0]: row[1] or 0 for row in result.fetchall()}
+
+    async def _get_partitions(self, session: AsyncSession, table_name: str) -> List[Dict[str, Any]]:
+        """Récupère les partitions de chargement initial d'une table"""
+        query = """
+        SELECT partition_index, range_start, range_end, last_loaded_id, records_loaded,
+               status, error_message
+        FROM synergo_sync.sync_partitions
+        WHERE table_name = :table_name
+        ORDER BY partition_index
+        """
+        result = await session.execute(text(query), {'table_name': table_name})
+
+        return [
+            {
+                'partition_index': row[0],
+                'range_start': row[1],
+                'range_end': row[2],
+                'last_loaded_id': row[3],
+                'records_loaded': row[4] or 0,
+                'status': row[5],
+                'error_message': row[6]
+            }
+            for row in result.fetchall()
+        ]
+
+    async def _update_partition(self, session: AsyncSession, table_name: str, partition_index: int,
+                                updates: Dict):
+        """Met à jour la progression d'une partition"""
+        set_clauses = [f"{field} = :{field}" for field in updates]
+        params = {'table_name': table_name, 'partition_index': partition_index, **updates}
+
+        query = f"""
+        UPDATE synergo_sync.sync_partitions
+        SET {', '.join(set_clauses)}, updated_at = CURRENT_TIMESTAMP
+        WHERE table_name = :table_name AND partition_index = :partition_index
+        """
+
+        await session.execute(text(query), params)
+
     async def get_sync_dashboard_data(self) -> Dict[str, Any]:
         """Données pour le dashboard de monitoring"""
         return await self.get_sync_statistics()
@@ -515,7 +1241,8 @@ class SynergoSyncManager:
                     clean_updates[field] = int(value)
                 else:
                     clean_updates[field] = 0
-            elif field in ['total_records', 'records_processed_last_sync', 'last_sync_duration']:
+            elif field in ['total_records', 'records_processed_last_sync', 'last_sync_duration', 'learned_batch_size',
+                           'sweep_cursor_id']:
                 try:
                     clean_updates[field] = int(value) if value is not None else 0
                 except (ValueError, TypeError):
@@ -538,6 +1265,138 @@ class SynergoSyncManager:
 
         await session.execute(text(query), params)
 
+    async def _save_dead_letters(self, session: AsyncSession, config: Dict[str, Any], strategy,
+                                 rejected: List[Tuple[Dict[str, Any], str]],
+                                 raw_records: List[Dict[str, Any]]) -> int:
+        """
+        Met en file des rejets les lignes rejetées d'une page, avant son checkpoint
+
+        Rejets de transformation: ligne HFSQL brute. Rejets au nettoyage avant
+        insertion: ligne brute retrouvée par son ID dans la page, à défaut
+        l'enregistrement transformé.
+        """
+        transform_rejected = rejected
+        insert_rejected, strategy.rejected = strategy.rejected, []
+        if self.dead_letters is None or not (transform_rejected or insert_rejected):
+            return 0
+
+        table_name, id_field = config['table_name'], config['id_field']
+        if insert_rejected:
+            raw_by_id = {record.get(id_field): record for record in raw_records}
+            insert_rejected = [(raw_by_id.get(record.get('hfsql_id'), record), reason)
+                               for record, reason in insert_rejected]
+
+        count = await self.dead_letters.add(session, table_name, STAGE_TRANSFORM, transform_rejected, id_field)
+        count += await self.dead_letters.add(session, table_name, STAGE_INSERT, insert_rejected, id_field)
+        logger.debug(f"📮 {table_name}: {count} lignes rejetées mises en file des rejets")
+        return count
+
+    async def retry_dead_letters(self, table_name: str, batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Repasse les rejets en attente d'une table dans le transformateur actuel
+
+        Par lots de batch_size lignes (pool de processus pour les gros lots).
+        Une ligne transformée et chargée est marquée résolue; une ligne déjà
+        présente en PostgreSQL (rechargée depuis par un balayage ou une
+        réparation) aussi, sans être réécrite avec l'ancienne version. Les
+        autres restent en attente avec leur nouvelle raison de rejet.
+        """
+        start_time = datetime.now()
+        config = self.sync_tables_config.get(table_name)
+        if config is None:
+            raise ValueError(f"Table {table_name} non configurée")
+        if self.dead_letters is None:
+            return {'table_name': table_name, 'status': 'disabled', 'retried': 0, 'resolved': 0, 'failed': 0}
+
+        batch_size = batch_size or settings.SYNC_DEAD_LETTER_RETRY_BATCH
+        transformer = config['transformer']()
+        # Pas de lecture HFSQL: les lignes brutes viennent de la file des rejets
+        strategy = IdBasedSyncStrategy(config, None)
+        transform = self._get_transform(config, transformer)
+        counts = {'retried': 0, 'resolved': 0, 'failed': 0}
+        after_id = 0
+
+        while True:
+            async with get_async_session_context() as session:
+                letters = await self.dead_letters.fetch_pending(session, table_name, after_id, batch_size)
+            if not letters:
+                break
+            after_id = letters[-1]['id']
+
+            transformed_records = await transform([letter['raw_data'] for letter in letters])
+            reasons = {record.get(config['id_field']): reason for record, reason in transformer.rejected}
+
+            async with get_async_session_context() as session:
+                existing_ids = await strategy.get_existing_ids(
+                    session, [record['hfsql_id'] for record in transformed_records])
+                await strategy.upsert_records(
+                    session, [record for record in transformed_records if record['hfsql_id'] not in existing_ids])
+                for record, reason in strategy.rejected:
+                    reasons[record.get('hfsql_id')] = reason
+                strategy.rejected = []
+
+                loaded_ids = {record['hfsql_id'] for record in transformed_records} - set(reasons)
+                resolved = [letter['id'] for letter in letters if letter['hfsql_id'] in loaded_ids]
+                failed = [(letter['id'], reasons.get(letter['hfsql_id'], 'rejected'))
+                          for letter in letters if letter['hfsql_id'] not in loaded_ids]
+
+                await self.dead_letters.mark_resolved(session, resolved)
+                await self.dead_letters.mark_failed(session, failed)
+                await session.commit()
+
+            counts['retried'] += len(letters)
+            counts['resolved'] += len(resolved)
+            counts['failed'] += len(failed)
+
+        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        if counts['retried']:
+            logger.info(f"📮 {table_name}: {counts['resolved']}/{counts['retried']} rejets résolus "
+                        f"({counts['failed']} toujours rejetés, {duration_ms} ms)")
+
+        return {'table_name': table_name, 'status': 'completed', 'duration_ms': duration_ms, **counts}
+
+    async def retry_all_dead_letters(self) -> Dict[str, Dict[str, Any]]:
+        """Relance les rejets de toutes les tables, dans l'ordre des dépendances FK"""
+        results = {}
+        for table_key in self.get_sync_order():
+            try:
+                results[table_key] = await self.retry_dead_letters(table_key)
+            except Exception as e:
+                logger.error(f"❌ {table_key}: Erreur relance des rejets - {e}")
+                results[table_key] = {'table_name': table_key, 'status': 'error', 'error_message': str(e)}
+        return results
+
+    async def get_dead_letter_counts(self) -> Dict[str, Dict[str, int]]:
+        """Rejets en attente et résolus par table"""
+        if self.dead_letters is None:
+            return {}
+        async with get_async_session_context() as session:
+            return await self.dead_letters.get_counts(session)
+
+    async def _log_anomalies(self, table_name: str, anomalies: AnomalyCounter, records_processed: int):
+        """Résumé des anomalies de transformation d'un lot dans sync_log, puis remise à zéro"""
+        if not anomalies:
+            return
+
+        log_entry = {
+            'table_name': table_name,
+            'operation': 'ANOMALIES',
+            'records_processed': records_processed,
+            'error_details': json.dumps({'total': anomalies.total, 'anomalies': anomalies.summary()}, default=str)
+        }
+        anomalies.clear()
+
+        async with get_async_session_context() as session:
+            try:
+                await session.execute(text("""
+                INSERT INTO synergo_sync.sync_log
+                (table_name, operation, records_processed, error_details)
+                VALUES (:table_name, :operation, :records_processed, :error_details)
+                """), log_entry)
+                await session.commit()
+            except Exception as e:
+                logger.error(f"⚠️ Erreur insertion anomalies {table_name}: {e}")
+
     async def _log_sync_summary(self, results: List[SyncResult], duration_seconds: float):
         """Enregistre un résumé de la synchronisation"""
         async with get_async_session_context() as session:
@@ -578,9 +1437,11 @@ async def test_complete_sync_manager():
     print(f"📊 Configuration ERP Complète:")
     print(f"   Tables configurées: {len(manager.sync_tables_config)}")
 
-    for table_name, config in manager.sync_tables_config.items():
-        print(f"   {config['sync_order']}. {config['table_name']} ← {config['hfsql_table']} "
-              f"({config['transformer'].__name__}, {config['sync_interval_minutes']}min)")
+    for order, table_name in enumerate(manager.get_sync_order(), 1):
+        config = manager.sync_tables_config[table_name]
+        print(f"   {order}. {config['table_name']} ← {config['hfsql_table']} "
+              f"({config['transformer'].__name__}, {config['sync_interval_minutes']}min, "
+              f"après: {', '.join(config['depends_on']) or '-'})")
 
     # Test statistiques
     stats = await manager.get_sync_statistics()
@@ -0,0 +1,136 @@
+# backend/app/sync/transform_executor.py
+"""
+Transformation des gros lots dans un pool de processus
+
+Les transform_batch sont async mais purement CPU: pendant un rattrapage de
+plusieurs centaines de milliers de lignes, ils bloquent la boucle asyncio
+et n'utilisent qu'un cœur. Au-delà de min_rows lignes, le lot est découpé
+en tranches contiguës envoyées à un ProcessPoolExecutor; les résultats sont
+recollés dans l'ordre des tranches, donc dans l'ordre des IDs.
+
+En dessous de min_rows, le coût de sérialisation des lignes vers et depuis
+les processus dépasse le gain: la transformation reste dans le processus
+(point de bascule mesuré par scripts/benchmark_transform_executor.py).
+
+Seule la classe du transformateur est envoyée: chaque processus en garde
+une instance neuve, sans état partagé avec le processus principal. Les
+anomalies et les lignes rejetées de chaque tranche reviennent avec ses
+lignes et sont regroupées dans transformer.anomalies et
+transformer.rejected, comme pour un lot transformé sur place.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import List, Dict, Any, Awaitable, Callable, Optional, Tuple
+from loguru import logger
+from ..core.config import settings
+from .transformers.anomalies import AnomalyCounter
+
+# Transformateurs instanciés une fois par processus de travail
+_worker_transformers: Dict[type, Any] = {}
+
+
+def _run_to_completion(coroutine):
+    """Exécute sans boucle asyncio une coroutine qui ne suspend jamais"""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+    coroutine.close()
+    raise RuntimeError("La transformation a suspendu son exécution hors boucle asyncio")
+
+
+def transform_chunk(transformer_class: type, records: List[Dict[str, Any]]
+                    ) -> Tuple[List[Dict[str, Any]], AnomalyCounter, List[Tuple[Dict[str, Any], str]]]:
+    """Transforme une tranche dans un processus de travail (lignes, anomalies, rejets)"""
+    transformer = _worker_transformers.get(transformer_class)
+    if transformer is None:
+        transformer = _worker_transformers[transformer_class] = transformer_class()
+    transformed = _run_to_completion(transformer.transform_batch(records))
+    return transformed, transformer.anomalies, transformer.rejected
+
+
+def split_chunks(records: List[Dict[str, Any]], max_chunks: int, min_chunk_rows: int) -> List[List[Dict[str, Any]]]:
+    """Tranches contiguës, au plus max_chunks, d'au moins min_chunk_rows lignes (sauf la dernière)"""
+    chunk_count = max(min(max_chunks, len(records) // max(min_chunk_rows, 1)), 1)
+    chunk_size = -(-len(records) // chunk_count)  # Division arrondie au supérieur
+    return [records[offset:offset + chunk_size] for offset in range(0, len(records), chunk_size)]
+
+
+class TransformExecutor:
+    """
+    Exécute transform_batch dans le processus ou dans un pool selon la taille du lot
+
+    Le pool n'est démarré qu'au premier lot assez gros.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, min_rows: Optional[int] = None,
+                 min_chunk_rows: Optional[int] = None, enabled: Optional[bool] = None):
+        max_workers = max_workers if max_workers is not None else settings.SYNC_TRANSFORM_WORKERS
+        self.max_workers = max_workers or max((os.cpu_count() or 2) - 1, 1)
+        self.min_rows = min_rows if min_rows is not None else settings.SYNC_TRANSFORM_PROCESS_MIN_ROWS
+        self.min_chunk_rows = (min_chunk_rows if min_chunk_rows is not None
+                               else settings.SYNC_TRANSFORM_CHUNK_MIN_ROWS)
+        self.enabled = enabled if enabled is not None else settings.SYNC_TRANSFORM_PROCESS_POOL
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.batches_in_pool = 0
+        self.batches_in_process = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            logger.info(f"🧮 Démarrage du pool de transformation ({self.max_workers} processus)")
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    async def transform(self, transformer, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transforme un lot; les gros lots sont répartis entre les processus"""
+        if not self.enabled or len(records) < self.min_rows:
+            self.batches_in_process += 1
+            return await transformer.transform_batch(records)
+
+        chunks = split_chunks(records, self.max_workers, self.min_chunk_rows)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        try:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, transform_chunk, type(transformer), chunk) for chunk in chunks
+            ))
+        except BrokenProcessPool as e:
+            # Processus tué (mémoire, arrêt brutal): pool recréé au prochain gros lot
+            logger.warning(f"⚠️ Pool de transformation interrompu, lot transformé localement: {e}")
+            self._pool = None
+            self.batches_in_process += 1
+            return await transformer.transform_batch(records)
+
+        self.batches_in_pool += 1
+        logger.debug(f"🧮 {len(records)} lignes transformées en {len(chunks)} tranches parallèles")
+
+        transformer.anomalies.clear()
+        for _, chunk_anomalies, _ in results:
+            transformer.anomalies.merge(chunk_anomalies)
+        transformer.rejected = [rejected for _, _, chunk_rejected in results for rejected in chunk_rejected]
+        return [record for chunk_records, _, _ in results for record in chunk_records]
+
+    def get_transform(self, transformer) -> Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]:
+        """Fonction de transformation de lot pour SyncPipeline"""
+        return partial(self.transform, transformer)
+
+    def shutdown(self) -> None:
+        """Arrête les processus de travail"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'max_workers': self.max_workers,
+            'min_rows': self.min_rows,
+            'pool_started': self._pool is not None,
+            'batches_in_pool': self.batches_in_pool,
+            'batches_in_process': self.batches_in_process
+        }
@@ -1,9 +1,12 @@
 # Transformateurs
+from .base_transformer import BaseTransformer
+from .field_spec import FieldSpec, compile_field_specs
+from .anomalies import AnomalyCounter
 from .product_transformer import ProductTransformer
 from .sales_order_transformer import SalesOrderTransformer
 from .sales_detail_transformer import SalesDetailTransformer
 from .purchase_order_transformer import PurchaseOrderTransformer
 from .purchase_detail_transformer import PurchaseDetailTransformer
 
-__all__ = ['ProductTransformer', 'SalesOrderTransformer', 'SalesDetailTransformer',
+__all__ = ['BaseTransformer', 'FieldSpec', 'compile_field_specs', 'AnomalyCounter', 'ProductTransformer', 'SalesOrderTransformer', 'SalesDetailTransformer',
            'PurchaseOrderTransformer', 'PurchaseDetailTransformer']
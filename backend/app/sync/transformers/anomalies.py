@@ -0,0 +1,71 @@
+# backend/app/sync/transformers/anomalies.py
+"""
+Comptage agrégé des anomalies de transformation
+
+Sur des données historiques sales, un log par enregistrement incohérent
+(conversion impossible, valeur bornée, calcul corrigé, ligne rejetée...)
+coûtait plus cher que la transformation elle-même et noyait
+logs/synergo.log. Les transformateurs incrémentent désormais un compteur
+(type, champ) → nombre + quelques IDs d'exemple, résumé en une ligne de
+log par lot et enregistré dans synergo_sync.sync_log par le manager.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+
+SAMPLE_IDS = 5  # IDs d'exemple conservés par anomalie
+
+
+class AnomalyCounter:
+    """Anomalies d'un lot, regroupées par (type, champ)"""
+
+    def __init__(self, max_samples: int = SAMPLE_IDS):
+        self.max_samples = max_samples
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self.samples: Dict[Tuple[str, str], List[Any]] = {}
+
+    def add(self, kind: str, field: str = '', record_id: Any = None, count: int = 1,
+            sample_ids: Optional[Iterable[Any]] = None) -> None:
+        """Compte count occurrences d'une anomalie, avec un ID ou des IDs d'exemple"""
+        key = (kind, field)
+        self.counts[key] = self.counts.get(key, 0) + count
+
+        samples = self.samples.setdefault(key, [])
+        if record_id is not None and len(samples) < self.max_samples:
+            samples.append(record_id)
+        if sample_ids is not None:
+            for sample_id in sample_ids:
+                if len(samples) >= self.max_samples:
+                    break
+                samples.append(sample_id)
+
+    def merge(self, other: 'AnomalyCounter') -> None:
+        """Ajoute les anomalies d'un autre compteur (tranche, lot)"""
+        for key, count in other.counts.items():
+            self.add(*key, count=count, sample_ids=other.samples.get(key))
+
+    def clear(self) -> None:
+        self.counts.clear()
+        self.samples.clear()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Anomalies par fréquence décroissante (format JSON de sync_log)"""
+        return [
+            {'kind': kind, 'field': field, 'count': count, 'sample_ids': self.samples.get((kind, field), [])}
+            for (kind, field), count in sorted(self.counts.items(), key=lambda item: -item[1])
+        ]
+
+    def describe(self) -> str:
+        return ", ".join(f"{kind}{f'[{field}]' if field else ''}={count}"
+                         for (kind, field), count in sorted(self.counts.items(), key=lambda item: -item[1]))
+
+    def log_summary(self, label: str, batch_size: int) -> None:
+        """Une seule ligne de log pour tout le lot"""
+        if self.counts:
+            logger.warning(f"⚠️ {label}: {self.total} anomalies sur {batch_size} lignes: {self.describe()}")
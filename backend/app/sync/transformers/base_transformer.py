@@ -0,0 +1,53 @@
+# backend/app/sync/transformers/base_transformer.py
+from typing import List, Dict, Any, Optional, Tuple
+from .field_spec import FieldSpec, compile_field_specs
+from .string_cache import get_string_cache
+from .anomalies import AnomalyCounter
+
+
+class BaseTransformer:
+    """
+    Socle commun des transformateurs HFSQL → PostgreSQL
+
+    Chaque transformateur déclare ses champs (_get_field_specs) et implémente
+    transform_batch; le socle compile la conversion des champs (les paquets
+    de HFSQLConnector.stream_query sont transformés par SyncPipeline).
+    self.anomalies compte les anomalies du dernier lot transformé,
+    self.rejected garde ses lignes HFSQL rejetées (ligne brute, raison).
+    """
+
+    def __init__(self):
+        field_specs = self._get_field_specs()
+        self.field_mapping = {spec.source: spec.target for spec in field_specs}
+        self.anomalies = AnomalyCounter()
+        self.rejected: List[Tuple[Dict[str, Any], str]] = []
+        # Conversion spécialisée générée une fois par transformateur, chaînes via le cache du cycle
+        self._convert_record = compile_field_specs(field_specs, f"convert_{type(self).__name__}",
+                                                   get_string_cache(), self.anomalies)
+
+    def __reduce__(self):
+        # Sans état: recréé (et recompilé) à l'arrivée, pour les pools de processus
+        return type(self), ()
+
+    def _start_batch(self) -> None:
+        """Remet à zéro anomalies et rejets en début de lot"""
+        self.anomalies.clear()
+        self.rejected = []
+
+    def _reject(self, hfsql_record: Dict[str, Any], reason: str, detail: Any = None) -> None:
+        """Ligne rejetée: comptée dans les anomalies et gardée pour la file des rejets"""
+        self.anomalies.add(reason, '', hfsql_record.get('id'))
+        self.rejected.append((hfsql_record, f"{reason}: {detail}" if detail is not None else reason))
+
+    def _get_field_specs(self) -> List[FieldSpec]:
+        """Champs HFSQL → PostgreSQL du transformateur"""
+        raise NotImplementedError
+
+    async def transform_batch(self, hfsql_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transforme un lot d'enregistrements HFSQL vers le format PostgreSQL"""
+        raise NotImplementedError
+
+    def get_source_fields(self) -> Optional[List[str]]:
+        """Colonnes HFSQL lues par le transformateur (clés du mappage des champs)"""
+        field_mapping = getattr(self, 'field_mapping', None)
+        return list(field_mapping) if field_mapping else None
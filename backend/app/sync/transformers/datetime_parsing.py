@@ -0,0 +1,269 @@
+# backend/app/sync/transformers/datetime_parsing.py
+"""
+Conversion des dates et heures HFSQL, par colonne
+
+Une colonne HFSQL garde le même format d'une ligne à l'autre (YYYYMMDD,
+ISO, JJ/MM/AAAA, objets date du pilote...). Le format est donc détecté sur
+les premières valeurs du lot (sniff_column), puis un seul parseur rapide,
+sans exception ni strptime, est appliqué aux suivantes. Les conversions sont
+mémorisées: une même date revient des milliers de fois dans une journée de
+ventes. Le chemin souple (tous les formats, avec exceptions) ne sert plus
+qu'aux valeurs que le parseur rapide ne reconnaît pas.
+"""
+from datetime import datetime, date, time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from loguru import logger
+
+SNIFF_ROWS = 20  # Valeurs examinées pour détecter le format d'une colonne
+CACHE_SIZE = 10000  # Valeurs distinctes mémorisées par colonne
+
+
+def _text(value: Any) -> str:
+    return (value if value.__class__ is str else str(value)).strip()
+
+
+# Parseurs rapides: None si la valeur n'a pas le format attendu
+
+def _date_native(value: Any) -> Optional[date]:
+    # datetime hérite de date: le tester en premier
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else None
+
+
+def _date_yyyymmdd(value: Any) -> Optional[date]:
+    text = _text(value)
+    if len(text) == 8 and text.isdigit():
+        return date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+    return None
+
+
+def _date_iso(value: Any) -> Optional[date]:
+    text = _text(value)
+    if len(text) >= 10 and text[4] == '-' and text[7] == '-':
+        return date(int(text[:4]), int(text[5:7]), int(text[8:10]))
+    return None
+
+
+def _date_french(value: Any) -> Optional[date]:
+    text = _text(value)
+    if len(text) == 10 and text[2] == '/' and text[5] == '/':
+        return date(int(text[6:10]), int(text[3:5]), int(text[:2]))
+    return None
+
+
+def _time_native(value: Any) -> Optional[time]:
+    if isinstance(value, time):
+        return value
+    return value.time() if isinstance(value, datetime) else None
+
+
+def _time_hhmmss(value: Any) -> Optional[time]:
+    text = _text(value)
+    if len(text) == 6 and text.isdigit():
+        return time(int(text[:2]), int(text[2:4]), int(text[4:6]))
+    return None
+
+
+def _time_colon(value: Any) -> Optional[time]:
+    text = _text(value)
+    if len(text) == 8 and text[2] == ':' and text[5] == ':':
+        return time(int(text[:2]), int(text[3:5]), int(text[6:8]))
+    if len(text) == 5 and text[2] == ':':
+        return time(int(text[:2]), int(text[3:5]))
+    return None
+
+
+DATE_FORMATS: Dict[str, Callable[[Any], Optional[date]]] = {
+    'native': _date_native,
+    'yyyymmdd': _date_yyyymmdd,
+    'iso': _date_iso,
+    'french': _date_french,
+}
+
+TIME_FORMATS: Dict[str, Callable[[Any], Optional[time]]] = {
+    'native': _time_native,
+    'hhmmss': _time_hhmmss,
+    'colon': _time_colon,
+}
+
+
+# Chemin souple: tous les formats connus, une valeur à la fois
+
+def parse_datetime_value(dt_value: Any) -> Optional[datetime]:
+    """Parse une valeur datetime de différents formats"""
+    try:
+        if isinstance(dt_value, datetime):
+            return dt_value
+
+        if isinstance(dt_value, str):
+            dt_str = dt_value.strip()
+
+            # Format ISO avec timezone
+            if '+' in dt_str:
+                dt_str = dt_str.split('+')[0]
+
+            if 'T' in dt_str:
+                return datetime.fromisoformat(dt_str.replace('T', ' '))
+            else:
+                return datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S')
+
+        return None
+
+    except Exception:
+        return None
+
+
+def parse_date_flexible(date_value: Any) -> Optional[date]:
+    """Convertit une date de différents formats vers date Python (None si non reconnue)"""
+    try:
+        if not date_value:
+            return None
+
+        native = _date_native(date_value)
+        if native is not None:
+            return native
+
+        date_str = str(date_value).strip()
+
+        # Format YYYYMMDD (HFSQL)
+        if len(date_str) == 8 and date_str.isdigit():
+            return _date_yyyymmdd(date_str)
+
+        # Format ISO (YYYY-MM-DD)
+        if '-' in date_str and len(date_str) >= 10:
+            return datetime.strptime(date_str[:10], '%Y-%m-%d').date()
+
+        # Format français (DD/MM/YYYY)
+        if '/' in date_str:
+            return datetime.strptime(date_str, '%d/%m/%Y').date()
+
+        logger.warning(f"⚠️ Format de date non reconnu: {date_value}")
+        return None
+
+    except Exception as e:
+        logger.warning(f"⚠️ Erreur conversion date {date_value}: {e}")
+        return None
+
+
+def parse_time_flexible(time_value: Any) -> Optional[time]:
+    """Convertit une heure de différents formats vers time Python (None si non reconnue)"""
+    try:
+        if not time_value:
+            return None
+
+        native = _time_native(time_value)
+        if native is not None:
+            return native
+
+        time_str = str(time_value).strip()
+
+        # Si c'est un timestamp complet, extraire seulement l'heure
+        if '+' in time_str or 'T' in time_str:
+            dt = parse_datetime_value(time_value)
+            if dt:
+                return dt.time()
+
+        # Format HHMMSS (HFSQL)
+        if len(time_str) == 6 and time_str.isdigit():
+            return _time_hhmmss(time_str)
+
+        # Format HH:MM:SS
+        if ':' in time_str:
+            time_parts = time_str.split(':')
+            if len(time_parts) >= 2:
+                second = int(time_parts[2]) if len(time_parts) > 2 else 0
+                return time(int(time_parts[0]), int(time_parts[1]), second)
+
+        logger.warning(f"⚠️ Format d'heure non reconnu: {time_value}")
+        return None
+
+    except Exception as e:
+        logger.warning(f"⚠️ Erreur conversion heure {time_value}: {e}")
+        return None
+
+
+class ColumnParser:
+    """
+    Convertisseur d'une colonne date ou heure
+
+    Appeler sniff_column() en début de lot; sans détection préalable, le
+    format est détecté sur la première valeur reçue. None pour une valeur
+    vide ou non reconnue.
+    """
+
+    def __init__(self, formats: Dict[str, Callable[[Any], Any]], flexible: Callable[[Any], Any],
+                 cache_size: int = CACHE_SIZE):
+        self.formats = formats
+        self.flexible = flexible
+        self.cache_size = cache_size
+        self.format: Optional[str] = None
+        self._fast: Optional[Callable[[Any], Any]] = None
+        self._cache: Dict[Any, Any] = {}
+        self.fallbacks = 0  # Valeurs passées par le chemin souple
+
+    def sniff(self, values: Iterable[Any]) -> Optional[str]:
+        """Retient le format qui reconnaît le plus de valeurs de l'échantillon"""
+        sample = [value for value in values if value]
+        if not sample:
+            return self.format
+
+        best_format, best_count = None, 0
+        for name, parser in self.formats.items():
+            count = 0
+            for value in sample:
+                try:
+                    count += parser(value) is not None
+                except (ValueError, TypeError):
+                    pass
+            if count > best_count:
+                best_format, best_count = name, count
+
+        if best_format is not None and best_format != self.format:
+            self.format = best_format
+            self._fast = self.formats[best_format]
+        return self.format
+
+    def sniff_column(self, records: List[Dict[str, Any]], field: str) -> Optional[str]:
+        """Détecte le format sur les premières lignes d'un lot"""
+        return self.sniff(record.get(field) for record in records[:SNIFF_ROWS])
+
+    def _parse(self, value: Any) -> Any:
+        if self._fast is None:
+            self.sniff([value])
+
+        if self._fast is not None:
+            try:
+                result = self._fast(value)
+                if result is not None:
+                    return result
+            except (ValueError, TypeError):
+                pass
+
+        self.fallbacks += 1
+        return self.flexible(value)
+
+    def __call__(self, value: Any) -> Any:
+        if not value:
+            return None
+
+        try:
+            return self._cache[value]
+        except KeyError:
+            pass
+        except TypeError:  # Valeur non hachable
+            return self._parse(value)
+
+        result = self._parse(value)
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[value] = result
+        return result
+
+
+def date_column_parser() -> ColumnParser:
+    return ColumnParser(DATE_FORMATS, parse_date_flexible)
+
+
+def time_column_parser() -> ColumnParser:
+    return ColumnParser(TIME_FORMATS, parse_time_flexible)
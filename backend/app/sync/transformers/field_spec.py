@@ -0,0 +1,226 @@
+# backend/app/sync/transformers/field_spec.py
+"""
+Spécification déclarative des champs HFSQL → PostgreSQL
+
+Chaque transformateur décrit ses champs (source, cible, type, précision,
+valeur max, obligatoire) au lieu de boucler sur des listes de champs pour
+chaque enregistrement. compile_field_specs() génère une fois, à la création
+du transformateur, une fonction Python spécialisée qui convertit un
+enregistrement en une seule passe: pas de boucle, pas de recherche du
+convertisseur, précision et bornes figées en constantes.
+
+Les convertisseurs partagés remplacent les copies de _convert_to_int,
+_convert_to_decimal et _clean_string de chaque transformateur. Avec un
+AnomalyCounter, les valeurs non convertibles ou bornées sont comptées au
+lieu d'être loguées une par une.
+"""
+import re
+from decimal import Decimal
+from typing import List, Dict, Any, Callable, NamedTuple, Optional
+from loguru import logger
+
+_CONTROL_CHARS = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+_NON_INT_CHARS = re.compile(r'[^\d-]')
+_NON_DECIMAL_CHARS = re.compile(r'[^\d.,-]')
+_TRUE_VALUES = frozenset(['true', '1', 'oui', 'yes', 'o', 'y', 'vrai'])
+
+
+class _Missing:
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()  # Colonne absente de l'enregistrement HFSQL
+
+
+class FieldSpec(NamedTuple):
+    """
+    Description d'un champ
+
+    type: 'int', 'nullable_int' (None/''/0 → NULL), 'decimal', 'str',
+    'bool' ou 'raw' (valeur copiée telle quelle). convert est appliqué après
+    la conversion de type (normalisation métier, dates...). default est
+    utilisé si la colonne est absente; un champ obligatoire absent ou NULL
+    fait rejeter l'enregistrement.
+    """
+    source: str
+    target: str
+    type: str = 'raw'
+    precision: Optional[int] = None
+    max_value: Optional[float] = None
+    required: bool = False
+    max_length: int = 255
+    convert: Optional[Callable[[Any], Any]] = None
+    default: Any = MISSING
+
+
+def _report(anomalies, kind: str, field: str, record: Optional[Dict[str, Any]]) -> None:
+    anomalies.add(kind, field, record.get('id') if record is not None else None)
+
+
+def to_int(value: Any, anomalies=None, field: str = '', record: Optional[Dict[str, Any]] = None) -> int:
+    """Convertit une valeur vers un entier (0 si non convertible)"""
+    try:
+        if value is None or value == '':
+            return 0
+
+        if isinstance(value, int):
+            return value
+
+        if isinstance(value, float):
+            if value != value:  # NaN
+                return 0
+            return int(round(value))
+
+        if isinstance(value, str):
+            # Supprimer tout sauf les chiffres et le signe moins
+            cleaned = _NON_INT_CHARS.sub('', value.strip())
+            if cleaned and cleaned != '-':
+                return int(cleaned)
+            return 0
+
+        return int(float(str(value)))
+
+    except (ValueError, TypeError, OverflowError) as e:
+        if anomalies is not None:
+            _report(anomalies, 'invalid_int', field, record)
+        else:
+            logger.warning(f"⚠️ Erreur conversion entier {value}: {e}, utilisation 0")
+        return 0
+
+
+def to_nullable_int(value: Any, anomalies=None, field: str = '',
+                    record: Optional[Dict[str, Any]] = None) -> Optional[int]:
+    """Clé étrangère facultative: None, '' et 0 deviennent NULL"""
+    if value is None or value == '' or value == 0:
+        return None
+    return to_int(value, anomalies, field, record)
+
+
+def to_decimal(value: Any, precision: Optional[int] = None, max_value: Optional[float] = None,
+               anomalies=None, field: str = '', record: Optional[Dict[str, Any]] = None) -> float:
+    """Convertit une valeur vers un décimal, arrondi et borné si demandé"""
+    try:
+        if value is None or value == '':
+            return 0.0
+
+        if isinstance(value, (int, float, Decimal)):
+            result = float(value)
+        elif isinstance(value, str):
+            cleaned = _NON_DECIMAL_CHARS.sub('', value.strip()).replace(',', '.')
+            result = float(cleaned) if cleaned else 0.0
+        else:
+            result = 0.0
+
+        if precision is not None:
+            result = round(result, precision)
+
+        # Validation de la valeur max (pour les pourcentages)
+        if max_value is not None and result > max_value:
+            if anomalies is not None:
+                _report(anomalies, 'above_max', field, record)
+            else:
+                logger.debug(f"⚠️ Valeur supérieure au max ({max_value}): {result}")
+            result = max_value
+
+        return result
+
+    except Exception as e:
+        if anomalies is not None:
+            _report(anomalies, 'invalid_decimal', field, record)
+        else:
+            logger.warning(f"⚠️ Erreur conversion décimal {value}: {e}")
+        return 0.0
+
+
+def clean_string(value: Any, max_length: int = 255) -> str:
+    """Supprime espaces de bord et caractères de contrôle, tronque à max_length"""
+    if not value:
+        return ""
+
+    cleaned = _CONTROL_CHARS.sub('', str(value).strip())
+    return cleaned[:max_length] if len(cleaned) > max_length else cleaned
+
+
+def to_boolean(value: Any) -> bool:
+    """Convertit une valeur vers un booléen (oui/vrai/1... → True)"""
+    if value is None:
+        return False
+
+    if isinstance(value, str):
+        return value.lower().strip() in _TRUE_VALUES
+
+    return bool(value)
+
+
+def _conversion_expression(spec: FieldSpec, string_cache=None) -> str:
+    """Expression Python de conversion de `value` pour un champ"""
+    # Anomalies comptées sous le nom du champ cible, avec l'ID HFSQL de la ligne
+    context = f"anomalies, {spec.target!r}, record"
+    if spec.type == 'int':
+        # Chemin rapide: entier déjà typé par le pilote
+        return f"value if value.__class__ is int else to_int(value, {context})"
+    if spec.type == 'nullable_int':
+        return f"to_nullable_int(value, {context})"
+    if spec.type == 'decimal':
+        if spec.precision is None and spec.max_value is None:
+            return f"value if value.__class__ is float else to_decimal(value, None, None, {context})"
+        return f"to_decimal(value, {spec.precision!r}, {spec.max_value!r}, {context})"
+    if spec.type == 'str':
+        if string_cache is not None:
+            # Chaînes brutes répétées: nettoyées une fois, résultat interné partagé
+            return (f"clean_cached(value, {spec.max_length!r}) if value.__class__ is str "
+                    f"else clean_string(value, {spec.max_length!r})")
+        return f"clean_string(value, {spec.max_length!r})"
+    if spec.type == 'bool':
+        return "to_boolean(value)"
+    if spec.type == 'raw':
+        return "value"
+    raise ValueError(f"Type de champ inconnu: {spec.type} ({spec.source})")
+
+
+def compile_field_specs(field_specs: List[FieldSpec], name: str = 'convert_record', string_cache=None,
+                        anomalies=None) -> Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Génère la fonction de conversion d'un enregistrement HFSQL
+
+    La fonction renvoie le dictionnaire des champs cibles (seules les colonnes
+    présentes sont copiées, sauf valeur par défaut), ou None si un champ
+    obligatoire manque. Avec un StringCleanCache, les champs 'str' passent
+    par son LRU; avec un AnomalyCounter, les conversions ratées y sont
+    comptées.
+    """
+    namespace = {
+        'MISSING': MISSING, 'to_int': to_int, 'to_nullable_int': to_nullable_int,
+        'to_decimal': to_decimal, 'clean_string': clean_string, 'to_boolean': to_boolean,
+        'clean_cached': string_cache.clean if string_cache is not None else None,
+        'anomalies': anomalies
+    }
+    lines = [f"def {name}(record):",
+             "    get = record.get",
+             "    transformed = {}"]
+
+    for index, spec in enumerate(field_specs):
+        expression = _conversion_expression(spec, string_cache)
+        if spec.convert is not None:
+            namespace[f'convert_{index}'] = spec.convert
+            expression = f"convert_{index}({expression})"
+
+        lines.append(f"    value = get({spec.source!r}, MISSING)")
+        if spec.required:
+            lines.append("    if value is MISSING or value is None:")
+            lines.append("        return None")
+            lines.append(f"    transformed[{spec.target!r}] = {expression}")
+        else:
+            lines.append("    if value is not MISSING:")
+            lines.append(f"        transformed[{spec.target!r}] = {expression}")
+            if spec.default is not MISSING:
+                namespace[f'default_{index}'] = spec.default
+                lines.append("    else:")
+                lines.append(f"        transformed[{spec.target!r}] = default_{index}")
+
+    lines.append("    return transformed")
+
+    source = "\n".join(lines)
+    exec(compile(source, f"<field_spec {name}>", 'exec'), namespace)
+    return namespace[name]
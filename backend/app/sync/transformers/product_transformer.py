@@ -3,35 +3,34 @@ from typing import List, Dict, Any
 from datetime import datetime
 from loguru import logger
 import re
+from .base_transformer import BaseTransformer
+from .field_spec import FieldSpec, to_boolean
 
 
-class ProductTransformer:
+class ProductTransformer(BaseTransformer):
     """
     Transformateur pour les données de produits HFSQL → PostgreSQL
     VERSION CORRIGÉE : Sans prix + avec nouveaux champs essentiels (labo, CNAS, etc.)
     """
 
-    def __init__(self):
-        self.field_mapping = self._get_field_mapping()
-
-    def _get_field_mapping(self) -> Dict[str, str]:
+    def _get_field_specs(self) -> List[FieldSpec]:
         """
-        Mappage des champs HFSQL nomenclature → PostgreSQL products_catalog
+        Champs HFSQL nomenclature → PostgreSQL products_catalog
         VERSION CORRIGÉE SANS PRIX
         """
-        return {
+        return [
             # Champs de base
-            'id': 'hfsql_id',
-            'nom': 'name',
-            'famille': 'family',
-            'quantite_alerte': 'alert_quantity',
+            FieldSpec('id', 'hfsql_id', 'int', required=True),
+            FieldSpec('nom', 'name', convert=self._clean_product_name, required=True),
+            FieldSpec('famille', 'family', 'str'),
+            FieldSpec('quantite_alerte', 'alert_quantity', 'int'),
 
             # NOUVEAUX CHAMPS ESSENTIELS
-            'labo': 'labo',  # Laboratoire
-            'id_cnas': 'id_cnas',  # ID CNAS
-            'de_equiv': 'de_equiv',  # Code produit équivalent
-            'psychotrope': 'psychotrope',  # Médicament psychotrope (Boolean)
-            'code_barre_origine': 'code_barre_origine',  # Code-barres d'origine
+            FieldSpec('labo', 'labo', 'str'),  # Laboratoire
+            FieldSpec('id_cnas', 'id_cnas', 'str'),  # ID CNAS
+            FieldSpec('de_equiv', 'de_equiv', 'str'),  # Code produit équivalent
+            FieldSpec('psychotrope', 'psychotrope', 'bool'),  # Médicament psychotrope (Boolean)
+            FieldSpec('code_barre_origine', 'code_barre_origine', convert=self._clean_barcode),  # Code-barres d'origine
 
             # CHAMPS SUPPRIMÉS (maintenant dans table purchase_details) :
             # 'prix_achat' -> SUPPRIMÉ
@@ -40,13 +39,14 @@ class ProductTransformer:
             # 'stock_actuel' -> SUPPRIMÉ
             # 'fournisseur' -> SUPPRIMÉ
             # 'code_barre' -> Remplacé par code_barre_origine
-        }
+        ]
 
     async def transform_batch(self, hfsql_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Transforme un lot d'enregistrements HFSQL vers le format PostgreSQL
         """
         transformed_records = []
+        self._start_batch()
 
         for record in hfsql_records:
             try:
@@ -55,9 +55,11 @@ class ProductTransformer:
                     transformed_records.append(transformed)
             except Exception as e:
                 logger.error(f"❌ Erreur transformation produit ID {record.get('id', 'inconnu')}: {e}")
+                self._reject(record, 'transform_error', e)
                 continue
 
         logger.debug(f"✅ {len(transformed_records)}/{len(hfsql_records)} produits transformés")
+        self.anomalies.log_summary("produits", len(hfsql_records))
         return transformed_records
 
     async def transform_single_record(self, hfsql_record: Dict[str, Any]) -> Dict[str, Any]:
@@ -65,53 +67,22 @@ class ProductTransformer:
         Transforme un enregistrement de produit individuel - VERSION CORRIGÉE
         """
         try:
-            transformed = {}
-
-            # 1. Mappage des champs simples
-            for hfsql_field, pg_field in self.field_mapping.items():
-                if hfsql_field in hfsql_record:
-                    transformed[pg_field] = hfsql_record[hfsql_field]
-
-            # 2. Conversion critique de l'ID
-            if 'hfsql_id' in transformed:
-                transformed['hfsql_id'] = self._convert_to_int(transformed['hfsql_id'])
-
-            # 3. Transformations spécifiques
-
-            # Nettoyage du nom de produit
-            if 'name' in transformed:
-                transformed['name'] = self._clean_product_name(transformed['name'])
-
-            # Nettoyage du code-barres d'origine
-            if 'code_barre_origine' in transformed:
-                transformed['code_barre_origine'] = self._clean_barcode(transformed['code_barre_origine'])
-
-            # Nettoyage des chaînes
-            string_fields = ['family', 'labo', 'id_cnas', 'de_equiv']
-            for field in string_fields:
-                if field in transformed:
-                    transformed[field] = self._clean_string(transformed[field])
-
-            # Conversion du champ psychotrope en booléen
-            if 'psychotrope' in transformed:
-                transformed['psychotrope'] = self._convert_to_boolean(transformed['psychotrope'])
-
-            # Conversion des quantités
-            qty_fields = ['alert_quantity']
-            for field in qty_fields:
-                if field in transformed:
-                    transformed[field] = self._convert_to_int(transformed[field])
+            # 1. Conversion des champs (ID, nom, code-barres, chaînes, booléen, quantités)
+            transformed = self._convert_record(hfsql_record)
+            if transformed is None:
+                self._reject(hfsql_record, 'rejected_missing_required')
+                return None
 
-            # 4. Ajout des métadonnées de synchronisation
+            # 2. Ajout des métadonnées de synchronisation
             transformed.update({
                 'sync_version': 1,
                 'last_synced_at': datetime.now(),
                 'created_at': datetime.now()
             })
 
-            # 5. Validation finale
+            # 3. Validation finale
             if not self._validate_transformed_record(transformed):
-                logger.warning(f"⚠️ Produit invalide, ignoré: {hfsql_record.get('id', 'inconnu')}")
+                self._reject(hfsql_record, 'rejected_invalid')
                 return None
 
             return transformed
@@ -163,91 +134,6 @@ class ProductTransformer:
 
         return cleaned
 
-    def _clean_string(self, value: Any) -> str:
-        """
-        Nettoie une chaîne de caractères générique
-        """
-        if not value:
-            return ""
-
-        cleaned = str(value).strip()
-
-        # Suppression des caractères de contrôle
-        cleaned = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned)
-
-        # Limitation de longueur appropriée selon le champ
-        max_length = 255  # Par défaut
-        if len(cleaned) > max_length:
-            cleaned = cleaned[:max_length]
-
-        return cleaned
-
-    def _convert_to_boolean(self, value: Any) -> bool:
-        """
-        Convertit une valeur vers un booléen
-        """
-        try:
-            if value is None:
-                return False
-
-            if isinstance(value, bool):
-                return value
-
-            if isinstance(value, (int, float)):
-                return bool(value)
-
-            if isinstance(value, str):
-                value_lower = value.lower().strip()
-                # Valeurs considérées comme True
-                true_values = ['true', '1', 'oui', 'yes', 'o', 'y', 'vrai']
-                return value_lower in true_values
-
-            return bool(value)
-
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur conversion booléen {value}: {e}")
-            return False
-
-    def _convert_to_int(self, value: Any) -> int:
-        """
-        Convertit une valeur vers un entier - VERSION RENFORCÉE
-        """
-        try:
-            if value is None or value == '':
-                return 0
-
-            # Si c'est déjà un entier
-            if isinstance(value, int):
-                return value
-
-            # Si c'est un float, arrondir
-            if isinstance(value, float):
-                if value != value:  # NaN check
-                    return 0
-                return int(round(value))
-
-            # Si c'est une chaîne, nettoyer et convertir
-            if isinstance(value, str):
-                # Supprimer les espaces
-                cleaned = value.strip()
-
-                # Vide après nettoyage
-                if not cleaned:
-                    return 0
-
-                # Supprimer tout sauf les chiffres et le signe moins
-                cleaned = re.sub(r'[^\d-]', '', cleaned)
-
-                if cleaned and cleaned != '-':
-                    return int(cleaned)
-
-            # Essayer une conversion directe
-            return int(float(str(value)))
-
-        except (ValueError, TypeError, OverflowError) as e:
-            logger.warning(f"⚠️ Erreur conversion entier {value}: {e}, utilisation 0")
-            return 0
-
     def _validate_transformed_record(self, record: Dict[str, Any]) -> bool:
         """
         Valide qu'un enregistrement transformé est correct - VERSION CORRIGÉE FINALE
@@ -258,7 +144,7 @@ class ProductTransformer:
 
             for field in required_fields:
                 if field not in record or record[field] is None:
-                    logger.warning(f"⚠️ Champ obligatoire manquant: {field}")
+                    self.anomalies.add('missing_required', field, record.get('hfsql_id'))
                     return False
 
             # Vérification que hfsql_id est un entier positif - CORRECTION ICI
@@ -270,18 +156,18 @@ class ProductTransformer:
                     hfsql_id = int(hfsql_id)
                     record['hfsql_id'] = hfsql_id  # Mettre à jour dans le record
                 except ValueError:
-                    logger.warning(f"⚠️ hfsql_id non numérique: {record['hfsql_id']}")
+                    self.anomalies.add('invalid_id', 'hfsql_id', record['hfsql_id'])
                     return False
 
             # Vérifier que c'est un entier positif
             if not isinstance(hfsql_id, int) or hfsql_id <= 0:
-                logger.warning(f"⚠️ hfsql_id invalide: {hfsql_id} (type: {type(hfsql_id)})")
+                self.anomalies.add('invalid_id', 'hfsql_id', hfsql_id)
                 return False
 
             # Vérification que le nom n'est pas vide
             name = record.get('name', '').strip()
             if not name:
-                logger.warning(f"⚠️ Nom de produit vide pour ID {hfsql_id}")
+                self.anomalies.add('empty_value', 'name', hfsql_id)
                 return False
 
             # Mettre à jour le nom nettoyé
@@ -289,9 +175,9 @@ class ProductTransformer:
 
             # Vérification du champ psychotrope (doit être booléen)
             if 'psychotrope' in record and not isinstance(record['psychotrope'], bool):
-                logger.warning(f"⚠️ Champ psychotrope doit être booléen: {record['psychotrope']}")
+                self.anomalies.add('invalid_bool', 'psychotrope', hfsql_id)
                 # Corriger automatiquement
-                record['psychotrope'] = self._convert_to_boolean(record['psychotrope'])
+                record['psychotrope'] = to_boolean(record['psychotrope'])
 
             return True
 
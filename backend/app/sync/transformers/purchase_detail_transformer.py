@@ -2,49 +2,48 @@
 from typing import List, Dict, Any
 from datetime import datetime
 from loguru import logger
-import re
+from .base_transformer import BaseTransformer
+from .field_spec import FieldSpec
 
 
-class PurchaseDetailTransformer:
+class PurchaseDetailTransformer(BaseTransformer):
     """
     Transformateur pour les données de détails d'achat HFSQL → PostgreSQL
 
     Adapte les formats de données de la table entrees_produits vers purchase_details
     """
 
-    def __init__(self):
-        self.field_mapping = self._get_field_mapping()
-
-    def _get_field_mapping(self) -> Dict[str, str]:
+    def _get_field_specs(self) -> List[FieldSpec]:
         """
-        Mappage des champs HFSQL entrees_produits → PostgreSQL purchase_details
+        Champs HFSQL entrees_produits → PostgreSQL purchase_details
         """
-        return {
-            # Identifiants
-            'id': 'hfsql_id',
-            'id_produit': 'product_hfsql_id',
-            'id_entree': 'purchase_order_hfsql_id',  # Peut être NULL
-            'id_fournisseur': 'supplier_hfsql_id',  # Peut être NULL
+        return [
+            # Identifiants (clés étrangères: NULL si vides, 0 ou absentes)
+            FieldSpec('id', 'hfsql_id', 'int', required=True),
+            FieldSpec('id_produit', 'product_hfsql_id', 'nullable_int', default=None),
+            FieldSpec('id_entree', 'purchase_order_hfsql_id', 'nullable_int', default=None),  # Peut être NULL
+            FieldSpec('id_fournisseur', 'supplier_hfsql_id', 'nullable_int', default=None),  # Peut être NULL
 
             # Informations produit
-            'nom_produit': 'product_name',
-            'code_produit': 'product_code',
+            FieldSpec('nom_produit', 'product_name', 'str'),
+            FieldSpec('code_produit', 'product_code', 'str'),
 
             # Prix et marges
-            'prix_achat': 'purchase_price',
-            'prix_vente': 'sale_price',
-            'marge': 'margin_percent',
+            FieldSpec('prix_achat', 'purchase_price', 'decimal'),
+            FieldSpec('prix_vente', 'sale_price', 'decimal'),
+            FieldSpec('marge', 'margin_percent', 'decimal'),
 
             # Stock et type
-            'stock': 'stock_snapshot',
-            'type_entree': 'entry_type'  # 'A', 'M', 'S', etc.
-        }
+            FieldSpec('stock', 'stock_snapshot', 'int'),
+            FieldSpec('type_entree', 'entry_type', 'str', convert=self._normalize_entry_type)  # 'A', 'M', 'S', etc.
+        ]
 
     async def transform_batch(self, hfsql_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Transforme un lot d'enregistrements HFSQL vers le format PostgreSQL
         """
         transformed_records = []
+        self._start_batch()
 
         for record in hfsql_records:
             try:
@@ -53,9 +52,11 @@ class PurchaseDetailTransformer:
                     transformed_records.append(transformed)
             except Exception as e:
                 logger.error(f"❌ Erreur transformation détail achat ID {record.get('id', 'inconnu')}: {e}")
+                self._reject(record, 'transform_error', e)
                 continue
 
         logger.debug(f"✅ {len(transformed_records)}/{len(hfsql_records)} détails d'achat transformés")
+        self.anomalies.log_summary("détails d'achat", len(hfsql_records))
         return transformed_records
 
     async def transform_single_record(self, hfsql_record: Dict[str, Any]) -> Dict[str, Any]:
@@ -63,73 +64,22 @@ class PurchaseDetailTransformer:
         Transforme un enregistrement de détail d'achat individuel
         """
         try:
-            transformed = {}
-
-            # 1. Mappage des champs simples
-            for hfsql_field, pg_field in self.field_mapping.items():
-                if hfsql_field in hfsql_record:
-                    transformed[pg_field] = hfsql_record[hfsql_field]
-
-            # 2. Conversion de l'ID principal (obligatoire)
-            if 'hfsql_id' in transformed:
-                transformed['hfsql_id'] = self._convert_to_int(transformed['hfsql_id'])
-
-            # 3. Gestion des clés étrangères (peuvent être NULL)
-            nullable_foreign_keys = ['product_hfsql_id', 'purchase_order_hfsql_id', 'supplier_hfsql_id']
-
-            for field in nullable_foreign_keys:
-                if field in transformed:
-                    value = transformed[field]
-                    if value is None or value == '' or value == 0:
-                        transformed[field] = None  # Explicitement NULL
-                    else:
-                        transformed[field] = self._convert_to_int(value)
-                else:
-                    transformed[field] = None  # Défaut à NULL si absent
-
-            # 4. Nettoyage des chaînes de caractères
-            string_fields = ['product_name', 'product_code', 'entry_type']
-            for field in string_fields:
-                if field in transformed:
-                    transformed[field] = self._clean_string(transformed[field])
-
-            # 5. Conversion des prix et marges
-            price_fields = ['purchase_price', 'sale_price', 'margin_percent']
-            for field in price_fields:
-                if field in transformed:
-                    transformed[field] = self._convert_to_decimal(transformed[field])
-
-            # 6. Conversion des quantités entières
-            int_fields = ['stock_snapshot']
-            for field in int_fields:
-                if field in transformed:
-                    transformed[field] = self._convert_to_int(transformed[field])
-
-            # 7. Nettoyage du type d'entrée
-            if 'entry_type' in transformed:
-                entry_type = str(transformed['entry_type']).strip().upper()
-                # Normaliser les types connus
-                if entry_type in ['A', 'ACHAT', 'AJOUT']:
-                    transformed['entry_type'] = 'A'
-                elif entry_type in ['M', 'MODIFICATION', 'MODIF']:
-                    transformed['entry_type'] = 'M'
-                elif entry_type in ['S', 'SORTIE', 'SUPPR']:
-                    transformed['entry_type'] = 'S'
-                elif entry_type in ['R', 'RETOUR']:
-                    transformed['entry_type'] = 'R'
-                else:
-                    transformed['entry_type'] = entry_type[:10] if entry_type else 'A'
-
-            # 8. Ajout des métadonnées de synchronisation
+            # 1. Conversion des champs (IDs, clés étrangères NULL, chaînes, prix, type d'entrée)
+            transformed = self._convert_record(hfsql_record)
+            if transformed is None:
+                self._reject(hfsql_record, 'rejected_missing_required')
+                return None
+
+            # 2. Ajout des métadonnées de synchronisation
             transformed.update({
                 'sync_version': 1,
                 'last_synced_at': datetime.now(),
                 'created_at': datetime.now()
             })
 
-            # 9. Validation finale
+            # 3. Validation finale
             if not self._validate_transformed_record(transformed):
-                logger.warning(f"⚠️ Détail d'achat invalide, ignoré: {hfsql_record.get('id', 'inconnu')}")
+                self._reject(hfsql_record, 'rejected_invalid')
                 return None
 
             return transformed
@@ -138,75 +88,19 @@ class PurchaseDetailTransformer:
             logger.error(f"❌ Erreur transformation détail d'achat: {e}")
             raise
 
-    def _clean_string(self, value: Any) -> str:
-        """
-        Nettoie une chaîne de caractères
-        """
-        if not value:
-            return ""
-
-        cleaned = str(value).strip()
-
-        # Suppression des caractères de contrôle
-        cleaned = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned)
-
-        # Limitation de longueur selon le champ
-        if len(cleaned) > 255:
-            cleaned = cleaned[:255]
-
-        return cleaned
-
-    def _convert_to_decimal(self, value: Any) -> float:
-        """
-        Convertit une valeur vers un décimal (float)
-        """
-        try:
-            if value is None or value == '':
-                return 0.0
-
-            if isinstance(value, (int, float)):
-                return float(value)
-
-            if isinstance(value, str):
-                # Suppression des espaces et caractères non numériques
-                cleaned = re.sub(r'[^\d.,-]', '', value.strip())
-
-                # Gestion des virgules comme séparateurs décimaux
-                cleaned = cleaned.replace(',', '.')
-
-                if cleaned:
-                    return float(cleaned)
-
-            return 0.0
-
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur conversion décimal {value}: {e}")
-            return 0.0
-
-    def _convert_to_int(self, value: Any) -> int:
-        """
-        Convertit une valeur vers un entier
-        """
-        try:
-            if value is None or value == '':
-                return 0
-
-            if isinstance(value, int):
-                return value
-
-            if isinstance(value, float):
-                return int(round(value))
-
-            if isinstance(value, str):
-                cleaned = re.sub(r'[^\d-]', '', value.strip())
-                if cleaned and cleaned != '-':
-                    return int(cleaned)
-
-            return 0
-
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur conversion entier {value}: {e}")
-            return 0
+    def _normalize_entry_type(self, entry_type: str) -> str:
+        """Normalise le type d'entrée vers les codes connus"""
+        entry_type = entry_type.upper()
+        if entry_type in ['A', 'ACHAT', 'AJOUT']:
+            return 'A'
+        elif entry_type in ['M', 'MODIFICATION', 'MODIF']:
+            return 'M'
+        elif entry_type in ['S', 'SORTIE', 'SUPPR']:
+            return 'S'
+        elif entry_type in ['R', 'RETOUR']:
+            return 'R'
+        else:
+            return entry_type[:10] if entry_type else 'A'
 
     def _validate_transformed_record(self, record: Dict[str, Any]) -> bool:
         """
@@ -218,13 +112,13 @@ class PurchaseDetailTransformer:
 
             for field in required_fields:
                 if field not in record or record[field] is None:
-                    logger.warning(f"⚠️ Champ obligatoire manquant: {field}")
+                    self.anomalies.add('missing_required', field, record.get('hfsql_id'))
                     return False
 
             # Vérification que hfsql_id est un entier positif
             hfsql_id = record.get('hfsql_id')
             if not isinstance(hfsql_id, int) or hfsql_id <= 0:
-                logger.warning(f"⚠️ hfsql_id invalide: {hfsql_id}")
+                self.anomalies.add('invalid_id', 'hfsql_id', hfsql_id)
                 return False
 
             # Vérification des clés étrangères (peuvent être NULL mais si présentes, doivent être valides)
@@ -232,7 +126,7 @@ class PurchaseDetailTransformer:
             for field in foreign_key_fields:
                 if field in record and record[field] is not None:
                     if not isinstance(record[field], int) or record[field] <= 0:
-                        logger.debug(f"💡 Clé étrangère invalide mise à NULL: {field} = {record[field]}")
+                        self.anomalies.add('invalid_foreign_key', field, hfsql_id)
                         record[field] = None  # Corriger au lieu de rejeter
 
             # Vérification des prix (doivent être >= 0 si présents)
@@ -240,7 +134,7 @@ class PurchaseDetailTransformer:
             for field in price_fields:
                 if field in record and isinstance(record[field], (int, float)):
                     if record[field] < 0:
-                        logger.debug(f"💰 Prix négatif détecté: {field} = {record[field]}")
+                        self.anomalies.add('negative_value', field, hfsql_id)
 
             return True
 
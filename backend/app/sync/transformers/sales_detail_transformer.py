@@ -1,147 +1,122 @@
 # backend/app/sync/transformers/sales_detail_transformer.py - VERSION CORRIGÉE
 from typing import List, Dict, Any
 from datetime import datetime, date, time  # CORRECTION: Ajout de 'date' et 'time'
+from decimal import Decimal, ROUND_HALF_UP
 from loguru import logger
-import re
+import numpy as np
+from .base_transformer import BaseTransformer
+from .field_spec import FieldSpec
+from .anomalies import SAMPLE_IDS
 
+# Colonnes recalculées et leur échelle DECIMAL PostgreSQL
+_CALCULATED_SCALES = {
+    'line_total': Decimal('0.01'),  # DECIMAL(12,2)
+    'unit_profit': Decimal('0.0001'),  # DECIMAL(10,4)
+    'line_profit': Decimal('0.01'),  # DECIMAL(12,2)
+    'margin_percent': Decimal('0.01'),  # DECIMAL(5,2)
+}
 
-class SalesDetailTransformer:
+
+class SalesDetailTransformer(BaseTransformer):
     """
     Transformateur pour les détails de ventes HFSQL → PostgreSQL
     Table source: ventes_produits → sales_details
     CRUCIAL pour calcul précis des marges par ligne de vente
     """
 
-    def __init__(self):
-        self.field_mapping = self._get_field_mapping()
-
-    def _get_field_mapping(self) -> Dict[str, str]:
+    def _get_field_specs(self) -> List[FieldSpec]:
         """
-        Mappage des champs HFSQL ventes_produits → PostgreSQL sales_details
+        Champs HFSQL ventes_produits → PostgreSQL sales_details
         """
-        return {
+        return [
             # Champs de base
-            'id': 'hfsql_id',
-            'id_sortie': 'sales_order_hfsql_id',  # Référence vers sorties.id
+            FieldSpec('id', 'hfsql_id', 'int', required=True),
+            FieldSpec('id_sortie', 'sales_order_hfsql_id', 'int', required=True),  # Référence vers sorties.id
 
             # CORRECTION: id_produit = ID lot, id_nom = ID nomenclature
-            'id_produit': 'lot_hfsql_id',  # ID du lot
-            'id_nom': 'product_hfsql_id',  # ID de la nomenclature
+            FieldSpec('id_produit', 'lot_hfsql_id', 'int', required=True),  # ID du lot
+            FieldSpec('id_nom', 'product_hfsql_id', 'int', required=True),  # ID de la nomenclature
 
             # Informations produit vendu
-            'nom_produit': 'product_name',  # Nom produit (dénormalisé)
-            'numero_lot': 'lot_number',  # Numéro de lot vendu
+            FieldSpec('nom_produit', 'product_name', 'str'),  # Nom produit (dénormalisé)
+            FieldSpec('numero_lot', 'lot_number', 'str'),  # Numéro de lot vendu
 
-            # Prix et quantités
-            'prix_vente': 'sale_price',  # Prix de vente unitaire
-            'quantite': 'quantity_sold',  # Quantité vendue
-            'total_ligne': 'line_total',  # Total ligne (prix × quantité)
+            # Prix et quantités - PRECISION IMPORTANTE pour calcul marge
+            FieldSpec('prix_vente', 'sale_price', 'decimal', precision=4),  # Prix de vente unitaire
+            FieldSpec('quantite', 'quantity_sold', 'int'),  # Quantité vendue
+            FieldSpec('total_ligne', 'line_total', 'decimal', precision=2),  # Total ligne (prix × quantité)
 
             # Calcul de marge - CRUCIAL
-            'prix_achat': 'purchase_price',  # Prix d'achat correspondant
-            'benefice_unitaire': 'unit_profit',  # Bénéfice unitaire
-            'benefice_ligne': 'line_profit',  # Bénéfice ligne
-            'marge_pourcent': 'margin_percent',  # Marge en %
+            FieldSpec('prix_achat', 'purchase_price', 'decimal', precision=4),  # Prix d'achat correspondant
+            FieldSpec('benefice_unitaire', 'unit_profit', 'decimal', precision=4),  # Bénéfice unitaire
+            FieldSpec('benefice_ligne', 'line_profit', 'decimal', precision=2),  # Bénéfice ligne
+            FieldSpec('marge_pourcent', 'margin_percent', 'decimal', precision=2, max_value=100.0),  # Marge en %
 
             # Remises
-            'remise_pourcent': 'discount_percent',  # % remise ligne
-            'remise_montant': 'discount_amount',  # Montant remise
+            FieldSpec('remise_pourcent', 'discount_percent', 'decimal', precision=2, max_value=100.0),  # % remise ligne
+            FieldSpec('remise_montant', 'discount_amount', 'decimal', precision=2),  # Montant remise
 
             # Type de vente et assurance
-            'type_vente': 'sale_type',  # CHIFA, LIBRE
-            'taux_couverture': 'insurance_coverage',  # % couverture assurance
-            'part_patient': 'patient_portion',  # Part patient
-            'part_assurance': 'insurance_portion',  # Part assurance
+            FieldSpec('type_vente', 'sale_type', 'str', convert=self._normalize_sale_type),  # CHIFA, LIBRE
+            FieldSpec('taux_couverture', 'insurance_coverage', 'decimal',
+                      precision=2, max_value=100.0),  # % couverture assurance
+            FieldSpec('part_patient', 'patient_portion', 'decimal', precision=2),  # Part patient
+            FieldSpec('part_assurance', 'insurance_portion', 'decimal', precision=2),  # Part assurance
 
             # Stock après vente
-            'stock_apres': 'stock_after_sale',  # Stock restant après vente
-        }
+            FieldSpec('stock_apres', 'stock_after_sale', 'int'),  # Stock restant après vente
+        ]
 
     async def transform_batch(self, hfsql_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Transforme un lot d'enregistrements HFSQL vers le format PostgreSQL
         """
         transformed_records = []
+        self._start_batch()
 
         for record in hfsql_records:
             try:
-                transformed = await self.transform_single_record(record)
+                transformed = await self.transform_single_record(record, fix_calculations=False)
                 if transformed:
                     transformed_records.append(transformed)
             except Exception as e:
                 logger.error(f"❌ Erreur transformation détail vente ID {record.get('id', 'inconnu')}: {e}")
+                self._reject(record, 'transform_error', e)
                 continue
 
+        # Calculs de marge sur tout le lot
+        self._fix_calculations_batch(transformed_records)
+
         logger.debug(f"✅ {len(transformed_records)}/{len(hfsql_records)} détails ventes transformés")
+        self.anomalies.log_summary("détails ventes", len(hfsql_records))
         return transformed_records
 
-    async def transform_single_record(self, hfsql_record: Dict[str, Any]) -> Dict[str, Any]:
+    async def transform_single_record(self, hfsql_record: Dict[str, Any],
+                                      fix_calculations: bool = True) -> Dict[str, Any]:
         """
         Transforme un enregistrement de détail de vente individuel
         """
         try:
-            transformed = {}
-
-            # 1. Mappage des champs simples
-            for hfsql_field, pg_field in self.field_mapping.items():
-                if hfsql_field in hfsql_record:
-                    transformed[pg_field] = hfsql_record[hfsql_field]
-
-            # 2. Transformations spécifiques
-
-            # Conversion des IDs
-            id_fields = ['hfsql_id', 'sales_order_hfsql_id', 'lot_hfsql_id', 'product_hfsql_id']
-            for field in id_fields:
-                if field in transformed:
-                    transformed[field] = self._convert_to_int(transformed[field])
-
-            # Nettoyage des chaînes
-            string_fields = ['product_name', 'lot_number', 'sale_type']
-            for field in string_fields:
-                if field in transformed:
-                    transformed[field] = self._clean_string(transformed[field])
-
-            # Normalisation du type de vente
-            if 'sale_type' in transformed:
-                transformed['sale_type'] = self._normalize_sale_type(transformed['sale_type'])
-
-            # Conversion des prix - PRECISION IMPORTANTE pour calcul marge
-            price_fields = ['sale_price', 'purchase_price', 'unit_profit']
-            for field in price_fields:
-                if field in transformed:
-                    transformed[field] = self._convert_to_decimal(transformed[field], precision=4)
-
-            # Conversion des montants totaux
-            money_fields = ['line_total', 'line_profit', 'discount_amount', 'patient_portion', 'insurance_portion']
-            for field in money_fields:
-                if field in transformed:
-                    transformed[field] = self._convert_to_decimal(transformed[field], precision=2)
-
-            # Conversion des pourcentages
-            percent_fields = ['margin_percent', 'discount_percent', 'insurance_coverage']
-            for field in percent_fields:
-                if field in transformed:
-                    transformed[field] = self._convert_to_decimal(transformed[field], precision=2, max_value=100.0)
-
-            # Conversion des quantités et stock
-            qty_fields = ['quantity_sold', 'stock_after_sale']
-            for field in qty_fields:
-                if field in transformed:
-                    transformed[field] = self._convert_to_int(transformed[field])
-
-            # 3. Calculs et validations de cohérence
-            self._validate_and_fix_calculations(transformed)
-
-            # 4. Ajout des métadonnées de synchronisation
+            # 1. Conversion des champs (IDs, chaînes, type de vente, prix, montants, %, quantités)
+            transformed = self._convert_record(hfsql_record)
+            if transformed is None:
+                self._reject(hfsql_record, 'rejected_missing_required')
+                return None
+
+            # 2. Calculs et validations de cohérence (faits par lot dans transform_batch)
+            if fix_calculations:
+                self._fix_calculations_batch([transformed])
+
+            # 3. Ajout des métadonnées de synchronisation
             transformed.update({
                 'sync_version': 1,
                 'last_synced_at': datetime.now(),
                 'created_at': datetime.now()
             })
 
-            # 5. Validation finale
+            # 4. Validation finale
             if not self._validate_transformed_record(transformed):
-                logger.warning(f"⚠️ Détail vente invalide, ignoré: {hfsql_record.get('id', 'inconnu')}")
+                self._reject(hfsql_record, 'rejected_invalid')
                 return None
 
             return transformed
@@ -150,59 +125,64 @@ class SalesDetailTransformer:
             logger.error(f"❌ Erreur transformation détail vente: {e}")
             raise
 
-    def _validate_and_fix_calculations(self, record: Dict[str, Any]):
+    def _fix_calculations_batch(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
         """
-        Valide et corrige les calculs de marge si nécessaire
+        Valide et corrige les calculs de marge d'un lot, en vectoriel
+
+        Colonnes numériques → tableaux NumPy (NaN = champ absent). Une valeur
+        absente est calculée, une valeur incohérente est remplacée; les
+        résultats sont arrondis exactement (Decimal, ROUND_HALF_UP) à
+        l'échelle des colonnes PostgreSQL. Les incohérences sont comptées
+        dans self.anomalies; renvoie leur nombre par colonne.
         """
-        try:
-            # Vérifier cohérence prix × quantité = total
-            if all(field in record for field in ['sale_price', 'quantity_sold']):
-                calculated_total = record['sale_price'] * record['quantity_sold']
-
-                if 'line_total' in record:
-                    if abs(calculated_total - record['line_total']) > 0.01:
-                        logger.debug(f"⚠️ Incohérence total ligne: {calculated_total} vs {record['line_total']}")
-                        record['line_total'] = calculated_total
-                else:
-                    record['line_total'] = calculated_total
-
-            # Calculer le bénéfice unitaire si manquant
-            if all(field in record for field in ['sale_price', 'purchase_price']):
-                calculated_unit_profit = record['sale_price'] - record['purchase_price']
-
-                if 'unit_profit' in record:
-                    if abs(calculated_unit_profit - record['unit_profit']) > 0.0001:
-                        logger.debug(
-                            f"⚠️ Incohérence bénéfice unitaire: {calculated_unit_profit} vs {record['unit_profit']}")
-                        record['unit_profit'] = calculated_unit_profit
-                else:
-                    record['unit_profit'] = calculated_unit_profit
-
-            # Calculer le bénéfice ligne si manquant
-            if all(field in record for field in ['unit_profit', 'quantity_sold']):
-                calculated_line_profit = record['unit_profit'] * record['quantity_sold']
-
-                if 'line_profit' in record:
-                    if abs(calculated_line_profit - record['line_profit']) > 0.01:
-                        logger.debug(
-                            f"⚠️ Incohérence bénéfice ligne: {calculated_line_profit} vs {record['line_profit']}")
-                        record['line_profit'] = calculated_line_profit
-                else:
-                    record['line_profit'] = calculated_line_profit
-
-            # Calculer la marge % si manquante
-            if all(field in record for field in ['sale_price', 'purchase_price']) and record['sale_price'] > 0:
-                calculated_margin = ((record['sale_price'] - record['purchase_price']) / record['sale_price']) * 100
-
-                if 'margin_percent' in record:
-                    if abs(calculated_margin - record['margin_percent']) > 0.1:
-                        logger.debug(f"⚠️ Incohérence marge %: {calculated_margin:.2f} vs {record['margin_percent']}")
-                        record['margin_percent'] = calculated_margin
-                else:
-                    record['margin_percent'] = calculated_margin
+        mismatches = {field: 0 for field in _CALCULATED_SCALES}
+        if not records:
+            return mismatches
 
-        except Exception as e:
-            logger.debug(f"⚠️ Erreur validation calculs: {e}")
+        columns = {
+            field: np.array([record.get(field, np.nan) for record in records], dtype=np.float64)
+            for field in ('sale_price', 'purchase_price', 'quantity_sold', *_CALCULATED_SCALES)
+        }
+        sale_price = columns['sale_price']
+        purchase_price = columns['purchase_price']
+        quantity_sold = columns['quantity_sold']
+
+        def reconcile(field: str, applicable, calculated, tolerance: float):
+            current = columns[field]
+            present = ~np.isnan(current)
+            mismatch = applicable & present & (np.abs(calculated - current) > tolerance)
+            mismatches[field] = int(mismatch.sum())
+            if mismatches[field]:
+                self.anomalies.add('calculation_mismatch', field, count=mismatches[field], sample_ids=[
+                    records[index].get('hfsql_id') for index in np.flatnonzero(mismatch)[:SAMPLE_IDS]])
+            columns[field] = np.where(applicable & (mismatch | ~present), calculated, current)
+
+        has_prices = ~np.isnan(sale_price) & ~np.isnan(purchase_price)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Total ligne = prix × quantité
+            reconcile('line_total', ~np.isnan(sale_price) & ~np.isnan(quantity_sold),
+                      sale_price * quantity_sold, 0.01)
+
+            # Bénéfice unitaire = prix de vente - prix d'achat
+            reconcile('unit_profit', has_prices, sale_price - purchase_price, 0.0001)
+
+            # Bénéfice ligne = bénéfice unitaire × quantité
+            unit_profit = columns['unit_profit']
+            reconcile('line_profit', ~np.isnan(unit_profit) & ~np.isnan(quantity_sold),
+                      unit_profit * quantity_sold, 0.01)
+
+            # Marge % = bénéfice unitaire / prix de vente × 100
+            reconcile('margin_percent', has_prices & (sale_price > 0),
+                      (sale_price - purchase_price) / sale_price * 100, 0.1)
+
+        # Arrondi exact à l'échelle DECIMAL des colonnes
+        for field, scale in _CALCULATED_SCALES.items():
+            for record, value in zip(records, columns[field].tolist()):
+                if value == value:  # NaN = champ absent et non calculable
+                    record[field] = Decimal(repr(value)).quantize(scale, rounding=ROUND_HALF_UP)
+
+        return mismatches
 
     def _normalize_sale_type(self, sale_type: str) -> str:
         """Normalise le type de vente"""
@@ -222,72 +202,6 @@ class SalesDetailTransformer:
         else:
             return sale_type_upper
 
-    def _clean_string(self, value: Any) -> str:
-        """Nettoie une chaîne de caractères"""
-        if not value:
-            return ""
-
-        cleaned = str(value).strip()
-        cleaned = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned)
-
-        # Limitation selon le type de champ
-        max_length = 255
-        if len(cleaned) > max_length:
-            cleaned = cleaned[:max_length]
-
-        return cleaned
-
-    def _convert_to_decimal(self, value: Any, precision: int = 2, max_value: float = None) -> float:
-        """
-        Convertit une valeur vers un décimal avec précision spécifiée
-        """
-        try:
-            if value is None or value == '':
-                return 0.0
-
-            if isinstance(value, (int, float)):
-                result = round(float(value), precision)
-            elif isinstance(value, str):
-                cleaned = re.sub(r'[^\d.,-]', '', value.strip())
-                cleaned = cleaned.replace(',', '.')
-                result = round(float(cleaned), precision) if cleaned else 0.0
-            else:
-                result = 0.0
-
-            # Validation de la valeur max (pour les pourcentages)
-            if max_value is not None and result > max_value:
-                logger.debug(f"⚠️ Valeur supérieure au max ({max_value}): {result}")
-                result = max_value
-
-            return result
-
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur conversion décimal {value}: {e}")
-            return 0.0
-
-    def _convert_to_int(self, value: Any) -> int:
-        """Convertit une valeur vers un entier"""
-        try:
-            if value is None or value == '':
-                return 0
-
-            if isinstance(value, int):
-                return value
-
-            if isinstance(value, float):
-                return int(round(value))
-
-            if isinstance(value, str):
-                cleaned = re.sub(r'[^\d-]', '', value.strip())
-                if cleaned and cleaned != '-':
-                    return int(cleaned)
-
-            return 0
-
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur conversion entier {value}: {e}")
-            return 0
-
     def _validate_transformed_record(self, record: Dict[str, Any]) -> bool:
         """
         Valide qu'un enregistrement de détail de vente transformé est correct
@@ -298,32 +212,31 @@ class SalesDetailTransformer:
 
             for field in required_fields:
                 if field not in record or record[field] is None:
-                    logger.warning(f"⚠️ Champ obligatoire manquant: {field}")
+                    self.anomalies.add('missing_required', field, record.get('hfsql_id'))
                     return False
 
             # Vérification que les IDs sont des entiers positifs
             for field in required_fields:
                 if not isinstance(record[field], int) or record[field] <= 0:
-                    logger.warning(f"⚠️ {field} invalide: {record[field]}")
+                    self.anomalies.add('invalid_id', field, record['hfsql_id'])
                     return False
 
             # Vérification que la quantité vendue est positive
             if 'quantity_sold' in record:
                 if not isinstance(record['quantity_sold'], int) or record['quantity_sold'] <= 0:
-                    logger.warning(f"⚠️ Quantité vendue invalide: {record['quantity_sold']}")
+                    self.anomalies.add('invalid_quantity', 'quantity_sold', record['hfsql_id'])
                     return False
 
             # Vérification que le prix de vente est positif
             if 'sale_price' in record:
                 if not isinstance(record['sale_price'], (int, float)) or record['sale_price'] <= 0:
-                    logger.warning(f"⚠️ Prix de vente invalide: {record['sale_price']}")
+                    self.anomalies.add('invalid_price', 'sale_price', record['hfsql_id'])
                     return False
 
             # Vérifications de cohérence (warnings seulement)
             if all(field in record for field in ['sale_price', 'purchase_price']):
                 if record['purchase_price'] > record['sale_price']:
-                    logger.debug(
-                        f"⚠️ Prix d'achat > prix de vente: {record['purchase_price']} > {record['sale_price']}")
+                    self.anomalies.add('purchase_above_sale', 'purchase_price', record['hfsql_id'])
 
             return True
 
@@ -0,0 +1,62 @@
+# backend/app/sync/transformers/string_cache.py
+"""
+Cache des chaînes nettoyées, partagé entre transformateurs
+
+Les valeurs dénormalisées (nom et lot du produit vendu, type de vente,
+fournisseur, caissier, caisse...) se répètent massivement d'une ligne à
+l'autre. Le nettoyage (regex des caractères de contrôle + troncature) n'est
+fait qu'une fois par valeur brute distincte, et le résultat est interné:
+toutes les lignes d'un lot partagent le même objet chaîne au lieu d'en
+garder une copie chacune.
+
+Un cache neuf et borné (LRU) est créé à chaque cycle de sync; les
+transformateurs créés pendant le cycle s'y rattachent.
+"""
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from ...core.config import settings
+from .field_spec import clean_string
+
+
+class StringCleanCache:
+    """LRU borné valeur brute → chaîne nettoyée et internée"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.clean = lru_cache(maxsize=max_size)(self._clean_and_intern)
+
+    @staticmethod
+    def _clean_and_intern(value: str, max_length: int = 255) -> str:
+        return sys.intern(clean_string(value, max_length))
+
+    def get_status(self) -> Dict[str, Any]:
+        info = self.clean.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'max_size': self.max_size,
+            'size': info.currsize,
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0
+        }
+
+
+_current_cache: Optional[StringCleanCache] = None
+_initialized = False
+
+
+def reset_string_cache(max_size: Optional[int] = None) -> Optional[StringCleanCache]:
+    """Nouveau cache pour un cycle de sync (None si max_size vaut 0)"""
+    global _current_cache, _initialized
+    max_size = max_size if max_size is not None else settings.SYNC_STRING_CACHE_SIZE
+    _current_cache = StringCleanCache(max_size) if max_size > 0 else None
+    _initialized = True
+    return _current_cache
+
+
+def get_string_cache() -> Optional[StringCleanCache]:
+    """Cache du cycle en cours (créé au premier appel hors cycle)"""
+    if not _initialized:
+        return reset_string_cache()
+    return _current_cache
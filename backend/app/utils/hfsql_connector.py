@@ -1,12 +1,14 @@
 # backend/app/utils/hfsql_connector.py - VERSION ULTRA-ROBUSTE
 import win32com.client
-import pythoncom
+import asyncio
 import time
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Union, Callable
 from loguru import logger
-from contextlib import contextmanager
 from ..core.config import settings
+from .recordset_reader import iter_row_chunks, clean_field_value, GETROWS_CHUNK_SIZE
+from .hfsql_executor import BlockingIOExecutor, create_com_executor
+from .hfsql_pool import HFSQLConnectionPool, is_connection_error
 
 
 class HFSQLConnector:
@@ -22,6 +24,7 @@ class HFSQLConnector:
         self.provider_oledb_hfsql = self._build_provider_string()
         self.connection_attempts = 0
         self.max_retries = 3
+        self._executor: Optional[BlockingIOExecutor] = None
 
     def _build_provider_string(self) -> str:
         """Chaîne Provider OLE DB optimisée"""
@@ -34,22 +37,11 @@ class HFSQLConnector:
             f' Extended Properties="Password=*:{settings.HFSQL_PASSWORD};"'
         )
 
-    @contextmanager
-    def com_context(self):
-        """Context manager pour COM avec gestion d'erreurs"""
-        com_initialized = False
-        try:
-            pythoncom.CoInitialize()
-            com_initialized = True
-            yield
-        except Exception as e:
-            logger.debug(f"COM context error: {e}")
-        finally:
-            if com_initialized:
-                try:
-                    pythoncom.CoUninitialize()
-                except:
-                    pass
+    def _get_executor(self) -> BlockingIOExecutor:
+        """Thread STA dédié à cette connexion (créé à la demande)"""
+        if self._executor is None:
+            self._executor = create_com_executor()
+        return self._executor
 
     async def connect(self) -> bool:
         """Connexion robuste avec retry automatique"""
@@ -57,52 +49,58 @@ class HFSQLConnector:
 
         if self.connection_attempts > self.max_retries:
             logger.error(f"❌ Limite de tentatives atteinte ({self.max_retries})")
+            self.connection_attempts = 0
             return False
 
         retry_delay = min(2 ** (self.connection_attempts - 1), 10)  # Backoff exponentiel
 
         try:
-            with self.com_context():
-                logger.info(f"🔌 Tentative connexion HFSQL #{self.connection_attempts}")
-
-                # Nettoyage préventif
-                self._force_cleanup()
-
-                # Créer nouvelle connexion avec timeouts
-                self.connection_oledb_hfsql = win32com.client.Dispatch("ADODB.Connection")
-                self.connection_oledb_hfsql.ConnectionTimeout = 30
-                self.connection_oledb_hfsql.CommandTimeout = 120
+            logger.info(f"🔌 Tentative connexion HFSQL #{self.connection_attempts}")
 
-                # Définir la chaîne et ouvrir
-                self.connection_oledb_hfsql.ConnectionString = self.provider_oledb_hfsql
-                self.connection_oledb_hfsql.Open()
+            # Ouverture COM sur le thread dédié
+            connection_state = await self._get_executor().run(self._open_connection_sync)
+            logger.debug(f"État connexion: {connection_state}")
 
-                # Vérification état
-                connection_state = self.connection_oledb_hfsql.State
-                logger.debug(f"État connexion: {connection_state}")
-
-                if connection_state == 1:  # adStateOpen
-                    logger.info("✅ Connexion HFSQL établie avec succès")
-                    self.is_connected = True
-                    self.connection_attempts = 0  # Reset compteur
-                    return True
-                else:
-                    logger.error(f"❌ État connexion incorrect: {connection_state}")
-                    return False
+            if connection_state == 1:  # adStateOpen
+                logger.info("✅ Connexion HFSQL établie avec succès")
+                self.is_connected = True
+                self.connection_attempts = 0  # Reset compteur
+                return True
+            else:
+                logger.error(f"❌ État connexion incorrect: {connection_state}")
+                self.connection_attempts = 0
+                return False
 
         except Exception as e:
             logger.warning(f"⚠️ Échec tentative #{self.connection_attempts}: {e}")
-            self._force_cleanup()
+            await self._get_executor().run(self._force_cleanup)
 
-            # Retry automatique avec délai
+            # Retry automatique avec délai (sans bloquer la boucle asyncio)
             if self.connection_attempts < self.max_retries:
                 logger.info(f"⏳ Retry dans {retry_delay}s...")
-                time.sleep(retry_delay)
+                await asyncio.sleep(retry_delay)
                 return await self.connect()
             else:
                 logger.error("❌ Toutes les tentatives de connexion ont échoué")
+                self.connection_attempts = 0  # Une prochaine connexion repart de zéro
                 return False
 
+    def _open_connection_sync(self) -> int:
+        """Ouverture de la connexion ADODB (thread COM dédié)"""
+        # Nettoyage préventif
+        self._force_cleanup()
+
+        # Créer nouvelle connexion avec timeouts
+        self.connection_oledb_hfsql = win32com.client.Dispatch("ADODB.Connection")
+        self.connection_oledb_hfsql.ConnectionTimeout = 30
+        self.connection_oledb_hfsql.CommandTimeout = 120
+
+        # Définir la chaîne et ouvrir
+        self.connection_oledb_hfsql.ConnectionString = self.provider_oledb_hfsql
+        self.connection_oledb_hfsql.Open()
+
+        return self.connection_oledb_hfsql.State
+
     def _force_cleanup(self):
         """Nettoyage forcé et agressif"""
         try:
@@ -137,107 +135,121 @@ class HFSQLConnector:
             if not await self.connect():
                 raise Exception("Impossible de se connecter à HFSQL")
 
-        query_recordset = None
         try:
-            with self.com_context():
-                logger.debug(f"🔍 Exécution: {query[:100]}...")
-
-                # Créer recordset dédié pour cette requête
-                query_recordset = win32com.client.Dispatch("ADODB.Recordset")
-                query_recordset.CursorType = 1  # adOpenKeyset
-                query_recordset.LockType = 1  # adLockReadOnly
-
-                # Ouvrir avec timeout
-                start_time = time.time()
-                query_recordset.Open(query, self.connection_oledb_hfsql)
-
-                results = []
-                record_count = 0
-
-                # Protection contre les requêtes infinies
-                while not query_recordset.EOF and record_count < max_records:
-                    # Timeout protection
-                    if time.time() - start_time > 300:  # 5 minutes max
-                        logger.warning("⚠️ Timeout requête (5min), arrêt forcé")
-                        break
-
-                    row = {}
-
-                    # Lecture sécurisée des champs
-                    try:
-                        for i in range(query_recordset.Fields.Count):
-                            field = query_recordset.Fields[i]
-                            field_name = str(field.Name)
-                            field_value = field.Value
-
-                            # Nettoyage et conversion
-                            row[field_name] = self._clean_field_value(field_value)
-
-                    except Exception as field_error:
-                        logger.warning(f"⚠️ Erreur lecture champ: {field_error}")
-                        continue
-
-                    if row:  # Seulement si on a des données
-                        results.append(row)
-                        record_count += 1
-
-                    # Avancement sécurisé
-                    try:
-                        query_recordset.MoveNext()
-                    except Exception as move_error:
-                        logger.warning(f"⚠️ Erreur MoveNext: {move_error}")
-                        break
-
-                # Fermeture immédiate
-                query_recordset.Close()
-
-                execution_time = time.time() - start_time
-                logger.debug(f"✅ {record_count} enregistrements en {execution_time:.2f}s")
-
-                return results
+            logger.debug(f"🔍 Exécution: {query[:100]}...")
+            return await self._get_executor().run(self._execute_query_sync, query, max_records)
 
         except Exception as e:
             logger.error(f"❌ Erreur exécution requête: {e}")
 
-            # Nettoyage en cas d'erreur
-            try:
-                if query_recordset and query_recordset.State == 1:
-                    query_recordset.Close()
-            except:
-                pass
-
             # Déconnecter si erreur de connexion
-            if any(keyword in str(e).lower() for keyword in ['connection', 'provider', 'timeout']):
+            if is_connection_error(e):
                 logger.warning("🔌 Erreur de connexion détectée, reset nécessaire")
                 self.is_connected = False
 
             raise
 
-    def _clean_field_value(self, value: Any) -> Any:
-        """Nettoyage des valeurs de champs HFSQL"""
+    def _open_recordset_sync(self, query: str, cursor_type: int):
+        """Ouvre un recordset en lecture seule (thread COM dédié)"""
+        query_recordset = win32com.client.Dispatch("ADODB.Recordset")
+        query_recordset.CursorType = cursor_type
+        query_recordset.LockType = 1  # adLockReadOnly
+        query_recordset.Open(query, self.connection_oledb_hfsql)
+        return query_recordset
+
+    def _close_recordset_sync(self, query_recordset):
+        """Ferme un recordset sans propager d'erreur (thread COM dédié)"""
+        try:
+            if query_recordset and query_recordset.State == 1:
+                query_recordset.Close()
+        except:
+            pass
+
+    def _execute_query_sync(self, query: str, max_records: int) -> List[Dict[str, Any]]:
+        """Exécution bloquante de la requête (thread COM dédié)"""
+        query_recordset = None
+        try:
+            # Ouvrir avec timeout
+            start_time = time.time()
+            query_recordset = self._open_recordset_sync(query, 1)  # adOpenKeyset
+
+            results = []
+
+            # Lecture en bloc via GetRows: un appel COM par paquet de lignes
+            for rows in iter_row_chunks(query_recordset, max_records=max_records):
+                results.extend(rows)
+
+                # Timeout protection
+                if time.time() - start_time > 300:  # 5 minutes max
+                    logger.warning("⚠️ Timeout requête (5min), arrêt forcé")
+                    break
+
+            record_count = len(results)
+
+            execution_time = time.time() - start_time
+            logger.debug(f"✅ {record_count} enregistrements en {execution_time:.2f}s")
+
+            return results
+
+        finally:
+            # Fermeture immédiate, y compris en cas d'erreur
+            self._close_recordset_sync(query_recordset)
+
+    async def stream_query(self, query: str, chunk_size: Union[int, Callable[[], int]] = GETROWS_CHUNK_SIZE
+                           ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Exécution en flux: produit des paquets d'au plus chunk_size lignes
+
+        chunk_size peut être une fonction réévaluée à chaque paquet (taille adaptative).
+
+        Contrairement à execute_query, le résultat n'est jamais matérialisé en
+        entier: la mémoire reste bornée à un paquet quel que soit le volume.
+        Chaque paquet est lu sur le thread COM dédié.
+        """
+        if not self.is_connected:
+            if not await self.connect():
+                raise Exception("Impossible de se connecter à HFSQL")
+
+        executor = self._get_executor()
+        query_recordset = None
         try:
-            if value is None:
-                return None
+            logger.debug(f"🔍 Exécution en flux: {query[:100]}...")
 
-            # String: nettoyage et trim
-            if isinstance(value, str):
-                cleaned = value.strip()
-                return cleaned if cleaned else None
+            # Curseur en avant seulement: suffisant pour une lecture séquentielle
+            start_time = time.time()
+            query_recordset = await executor.run(self._open_recordset_sync, query, 0)  # adOpenForwardOnly
 
-            # Nombres: vérification validité
-            if isinstance(value, (int, float)):
-                if isinstance(value, float):
-                    # Check NaN/Infinity
-                    if value != value or abs(value) == float('inf'):
-                        return None
-                return value
+            chunks = iter_row_chunks(query_recordset, chunk_size=chunk_size)
+            record_count = 0
+            while True:
+                rows = await executor.run(next, chunks, None)
+                if rows is None:
+                    break
 
-            # Autres types: conversion string safe
-            return str(value) if value is not None else None
+                record_count += len(rows)
+                yield rows
+
+            execution_time = time.time() - start_time
+            logger.debug(f"✅ {record_count} enregistrements en flux en {execution_time:.2f}s")
 
         except Exception as e:
-            logger.debug(f"Erreur nettoyage valeur {value}: {e}")
-            return None
+            logger.error(f"❌ Erreur exécution requête en flux: {e}")
+
+            # Déconnecter si erreur de connexion
+            if is_connection_error(e):
+                logger.warning("🔌 Erreur de connexion détectée, reset nécessaire")
+                self.is_connected = False
+
+            raise
+
+        finally:
+            # Fermeture y compris si le consommateur s'arrête avant la fin
+            if query_recordset is not None:
+                await executor.run(self._close_recordset_sync, query_recordset)
+
+    def _clean_field_value(self, value: Any) -> Any:
+        """Nettoyage des valeurs de champs HFSQL"""
+        return clean_field_value(value)
 
     async def test_connection_step_by_step(self) -> Dict[str, Any]:
         """Test de connexion détaillé avec diagnostic"""
@@ -255,11 +267,9 @@ class HFSQLConnector:
             test_results["steps"].append({"step": "COM Objects", "status": "testing"})
 
             try:
-                with self.com_context():
-                    test_conn = win32com.client.Dispatch("ADODB.Connection")
-                    test_rs = win32com.client.Dispatch("ADODB.Recordset")
-                    test_results["steps"][-1]["status"] = "success"
-                    test_results["steps"][-1]["message"] = "Objets COM disponibles"
+                await self._get_executor().run(self._check_com_objects_sync)
+                test_results["steps"][-1]["status"] = "success"
+                test_results["steps"][-1]["message"] = "Objets COM disponibles"
             except Exception as e:
                 test_results["steps"][-1]["status"] = "error"
                 test_results["steps"][-1]["message"] = str(e)
@@ -340,11 +350,23 @@ class HFSQLConnector:
 
         return test_results
 
+    def _check_com_objects_sync(self):
+        """Vérifie la disponibilité des objets ADODB (thread COM dédié)"""
+        win32com.client.Dispatch("ADODB.Connection")
+        win32com.client.Dispatch("ADODB.Recordset")
+
     def close(self):
         """Fermeture propre avec nettoyage complet"""
         try:
             logger.debug("🔌 Fermeture connexion HFSQL...")
-            self._force_cleanup()
+            if self._executor is not None:
+                # Les objets COM doivent être libérés sur leur thread STA
+                self._executor.submit(self._force_cleanup)
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            else:
+                self._force_cleanup()
+            self.is_connected = False
             logger.debug("✅ Connexion fermée proprement")
         except Exception as e:
             logger.warning(f"⚠️ Erreur fermeture: {e}")
@@ -416,6 +438,24 @@ class HFSQLConnector:
             }
 
 
+_hfsql_pool: Optional[HFSQLConnectionPool] = None
+
+
+def get_hfsql_pool() -> HFSQLConnectionPool:
+    """Pool de connexions OLE DB partagé (synchronisation et diagnostics API)"""
+    global _hfsql_pool
+    if _hfsql_pool is None:
+        _hfsql_pool = HFSQLConnectionPool(
+            HFSQLConnector,
+            min_size=settings.HFSQL_POOL_MIN_SIZE,
+            max_size=settings.HFSQL_POOL_MAX_SIZE,
+            idle_timeout=settings.HFSQL_POOL_IDLE_TIMEOUT,
+            ping_query=settings.HFSQL_POOL_PING_QUERY,
+            ping_interval=settings.HFSQL_POOL_PING_INTERVAL
+        )
+    return _hfsql_pool
+
+
 # Fonction utilitaire pour tests rapides
 async def quick_hfsql_test():
     """Test rapide du connecteur"""
@@ -444,4 +484,4 @@ async def quick_hfsql_test():
 if __name__ == "__main__":
     import asyncio
 
-    asyncio.run(quick_hfsql_test())
\ No newline at end of file
+    asyncio.run(quick_hfsql_test())
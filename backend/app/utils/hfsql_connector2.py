@@ -1,14 +1,22 @@
 # backend/app/utils/hfsql_connector.py
 import pyodbc
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Union, Callable
 from loguru import logger
 from ..core.config import settings
+from .hfsql_executor import get_odbc_executor
+from .recordset_reader import build_odbc_converters, rows_to_dicts
+from .hfsql_pool import is_connection_error
 
 class HFSQLConnector:
     def __init__(self):
         self.connection_string = self._build_connection_string()
         self.connection: Optional[pyodbc.Connection] = None
 
+    @property
+    def is_connected(self) -> bool:
+        """Interface commune avec le connecteur OLE DB (utilisée par le pool)"""
+        return self.connection is not None
+
     def _build_connection_string(self) -> str:
         """Format HFSQL standard - Version 1"""
         return (
@@ -27,7 +35,7 @@ class HFSQLConnector:
             # Adaptation de votre code template.php
             connection_string = self._build_connection_string()
             print(connection_string)
-            self.connection = pyodbc.connect(connection_string,autocommit=True)
+            self.connection = await get_odbc_executor().run(pyodbc.connect, connection_string, autocommit=True)
             logger.info("✅ Connexion HFSQL établie")
             return True
         except Exception as e:
@@ -40,26 +48,71 @@ class HFSQLConnector:
             await self.connect()
         
         try:
-            cursor = self.connection.cursor()
+            results = await get_odbc_executor().run(self._execute_query_sync, query)
+            logger.debug(f"✅ Requête exécutée: {len(results)} résultats")
+            return results
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur exécution requête: {e}")
+            if is_connection_error(e):
+                self.close()
+            raise
+
+    def _execute_query_sync(self, query: str) -> List[Dict[str, Any]]:
+        """Exécution bloquante de la requête (thread ODBC dédié)"""
+        cursor = self.connection.cursor()
+        try:
             cursor.execute(query)
             
-            # Récupérer les noms de colonnes
+            # Récupérer les noms de colonnes et un convertisseur par type de colonne
             columns = [desc[0] for desc in cursor.description]
+            converters = build_odbc_converters(cursor.description)
             
             # Récupérer les données et les transformer en dictionnaires
-            results = []
-            for row in cursor.fetchall():
-                row_dict = dict(zip(columns, row))
-                results.append(row_dict)
-            
+            return rows_to_dicts(cursor.fetchall(), columns, converters)
+
+        finally:
             cursor.close()
-            logger.debug(f"✅ Requête exécutée: {len(results)} résultats")
-            return results
-            
+    
+    async def stream_query(self, query: str,
+                           chunk_size: Union[int, Callable[[], int]] = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Exécuter une requête et produire les résultats par paquets de chunk_size lignes (int ou fonction)"""
+        if not self.connection:
+            await self.connect()
+
+        executor = get_odbc_executor()
+        cursor = self.connection.cursor()
+        connection_lost = False
+        try:
+            await executor.run(cursor.execute, query)
+
+            # Récupérer les noms de colonnes et un convertisseur par type de colonne
+            columns = [desc[0] for desc in cursor.description]
+            converters = build_odbc_converters(cursor.description)
+
+            record_count = 0
+            while True:
+                size = chunk_size() if callable(chunk_size) else chunk_size
+                rows = await executor.run(cursor.fetchmany, size)
+                if not rows:
+                    break
+
+                record_count += len(rows)
+                yield rows_to_dicts(rows, columns, converters)
+
+            logger.debug(f"✅ Requête en flux exécutée: {record_count} résultats")
+
         except Exception as e:
-            logger.error(f"❌ Erreur exécution requête: {e}")
+            logger.error(f"❌ Erreur exécution requête en flux: {e}")
+            connection_lost = is_connection_error(e)
             raise
-    
+
+        finally:
+            await executor.run(cursor.close)
+            # Connexion marquée cassée (is_connected) pour que le pool l'évince
+            if connection_lost:
+                self.close()
+
     async def get_last_id(self, table: str, id_field: str = 'id') -> int:
         """Récupérer le dernier ID d'une table"""
         query = f"SELECT MAX({id_field}) as max_id FROM {table}"
@@ -99,6 +152,9 @@ class HFSQLConnector:
     def close(self):
         """Fermer la connexion"""
         if self.connection:
-            self.connection.close()
+            try:
+                self.connection.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Erreur fermeture: {e}")
             self.connection = None
             logger.info("🔌 Connexion HFSQL fermée")
\ No newline at end of file
@@ -0,0 +1,89 @@
+# backend/app/utils/hfsql_executor.py
+"""
+Exécuteurs dédiés aux appels bloquants des pilotes HFSQL
+
+Les appels COM (ADODB) et ODBC sont synchrones: exécutés directement dans une
+coroutine, ils gèlent la boucle asyncio et donc toute l'API FastAPI. Ces
+exécuteurs les déportent sur des threads dédiés derrière une façade awaitable.
+
+- COM: un thread STA unique par connexion, CoInitialize fait une seule fois
+  au démarrage du thread; tous les objets COM de la connexion y vivent.
+- pyodbc: un petit pool de threads partagé.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from loguru import logger
+from ..core.config import settings
+
+
+class BlockingIOExecutor:
+    """Façade awaitable vers un pool de threads réservé aux appels bloquants"""
+
+    def __init__(self, max_workers: int = 1, thread_name_prefix: str = 'hfsql',
+                 initializer: Optional[Callable[[], None]] = None,
+                 finalizer: Optional[Callable[[], None]] = None):
+        self.max_workers = max_workers
+        self._finalizer = finalizer
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=thread_name_prefix,
+            initializer=initializer
+        )
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Exécute func(*args, **kwargs) sur un thread dédié sans bloquer la boucle"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs):
+        """Soumission sans attente (nettoyage depuis du code synchrone)"""
+        return self._executor.submit(func, *args, **kwargs)
+
+    def shutdown(self, wait: bool = False):
+        """Arrête les threads une fois les tâches en file terminées"""
+        if self._finalizer is not None and self.max_workers == 1:
+            # Le thread unique exécute le finaliseur après les tâches en attente
+            self._executor.submit(self._finalizer)
+        self._executor.shutdown(wait=wait)
+
+
+def _com_thread_initializer():
+    """Initialise COM (STA) une seule fois pour le thread dédié"""
+    import pythoncom
+    pythoncom.CoInitialize()
+    logger.debug("🧵 Thread COM HFSQL initialisé")
+
+
+def _com_thread_finalizer():
+    """Libère COM à l'arrêt du thread dédié"""
+    try:
+        import pythoncom
+        pythoncom.CoUninitialize()
+    except Exception as e:
+        logger.debug(f"Erreur CoUninitialize (ignorée): {e}")
+
+
+def create_com_executor(thread_name_prefix: str = 'hfsql-com') -> BlockingIOExecutor:
+    """Thread STA unique pour une connexion OLE DB HFSQL"""
+    return BlockingIOExecutor(
+        max_workers=1,
+        thread_name_prefix=thread_name_prefix,
+        initializer=_com_thread_initializer,
+        finalizer=_com_thread_finalizer
+    )
+
+
+_odbc_executor: Optional[BlockingIOExecutor] = None
+
+
+def get_odbc_executor() -> BlockingIOExecutor:
+    """Pool de threads partagé pour les appels pyodbc"""
+    global _odbc_executor
+    if _odbc_executor is None:
+        _odbc_executor = BlockingIOExecutor(
+            max_workers=settings.HFSQL_ODBC_WORKERS,
+            thread_name_prefix='hfsql-odbc'
+        )
+    return _odbc_executor
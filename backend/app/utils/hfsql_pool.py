@@ -0,0 +1,235 @@
+# backend/app/utils/hfsql_pool.py
+"""
+Pool de connexions HFSQL
+
+Réutilise des connecteurs déjà ouverts (OLE DB ou pyodbc) au lieu de payer une
+reconnexion par table ou par diagnostic API:
+- taille min/max, fermeture des connexions inactives au-delà du minimum
+- ping par requête légère avant réutilisation d'une connexion restée inactive
+- éviction des connexions cassées: le connecteur classe ses propres erreurs
+  (mêmes mots-clés) et se marque déconnecté, le pool ne regarde que is_connected
+- métriques: checkouts, temps d'attente, évictions
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, AsyncIterator
+from loguru import logger
+
+# Mots-clés d'erreur indiquant une connexion HFSQL inutilisable
+CONNECTION_ERROR_KEYWORDS = ('connection', 'provider', 'timeout')
+
+
+def is_connection_error(error: Exception) -> bool:
+    """Détecte une erreur de connexion HFSQL à partir de son message"""
+    message = str(error).lower()
+    return any(keyword in message for keyword in CONNECTION_ERROR_KEYWORDS)
+
+
+class HFSQLConnectionPool:
+    """
+    Pool de connecteurs HFSQL partagé entre extraction et diagnostics
+
+    Le pool est indépendant de l'implémentation: connector_factory doit
+    produire un objet exposant connect(), execute_query(), close() et
+    is_connected (utils/hfsql_connector.py et utils/hfsql_connector2.py).
+    """
+
+    def __init__(self, connector_factory: Callable[[], Any], min_size: int = 1, max_size: int = 4,
+                 idle_timeout: float = 300, ping_query: str = "SELECT TOP 1 id FROM nomenclature",
+                 ping_interval: float = 30):
+        self.connector_factory = connector_factory
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.idle_timeout = idle_timeout
+        self.ping_query = ping_query
+        self.ping_interval = ping_interval
+
+        self._idle = deque()  # (connecteur, instant de dernière utilisation)
+        self._size = 0  # Connexions ouvertes: inactives + empruntées
+        self._condition = asyncio.Condition()
+
+        self.metrics = {
+            'checkouts': 0,
+            'created': 0,
+            'evictions': 0,
+            'idle_closed': 0,
+            'ping_failures': 0,
+            'waits': 0,
+            'wait_time_ms_total': 0.0,
+            'wait_time_ms_max': 0.0
+        }
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """
+        Emprunte un connecteur prêt à l'emploi et le rend au pool à la sortie
+
+        Le bloc emprunteur fait aussi d'autres appels (PostgreSQL...): une
+        exception n'évince la connexion que si le connecteur s'est lui-même
+        marqué déconnecté. Un message « connection was closed » d'asyncpg ne
+        concerne pas HFSQL.
+        """
+        connector = await self._checkout()
+        try:
+            yield connector
+        except Exception as e:
+            if not connector.is_connected:
+                logger.warning(f"🔌 Connexion HFSQL évincée du pool: {e}")
+                await self._discard(connector)
+                connector = None
+            raise
+        finally:
+            if connector is not None:
+                await self._release(connector)
+
+    async def _checkout(self) -> Any:
+        """Récupère une connexion inactive, en crée une ou attend une libération"""
+        wait_start = time.monotonic()
+        waited = False
+
+        while True:
+            connector = None
+            last_used = 0.0
+
+            async with self._condition:
+                self._close_expired_idle()
+
+                if self._idle:
+                    # LIFO: la connexion la plus récemment utilisée est la plus sûre
+                    connector, last_used = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    waited = True
+                    await self._condition.wait()
+                    continue
+
+            if connector is None:
+                connector = await self._create()
+            elif time.monotonic() - last_used >= self.ping_interval and not await self._ping(connector):
+                await self._discard(connector)
+                continue
+
+            wait_ms = (time.monotonic() - wait_start) * 1000
+            self.metrics['checkouts'] += 1
+            self.metrics['wait_time_ms_total'] += wait_ms
+            self.metrics['wait_time_ms_max'] = max(self.metrics['wait_time_ms_max'], wait_ms)
+            if waited:
+                self.metrics['waits'] += 1
+
+            return connector
+
+    async def _create(self) -> Any:
+        """Ouvre une nouvelle connexion (la place est déjà réservée dans _size)"""
+        try:
+            connector = self.connector_factory()
+            if not await connector.connect():
+                raise Exception("Impossible de se connecter à HFSQL")
+        except BaseException:
+            # Y compris une annulation pendant connect(): sinon la place reste réservée
+            async with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        self.metrics['created'] += 1
+        logger.debug(f"🔌 Nouvelle connexion HFSQL dans le pool ({self._size}/{self.max_size})")
+        return connector
+
+    async def _ping(self, connector: Any) -> bool:
+        """Vérifie une connexion restée inactive par une requête légère"""
+        if not connector.is_connected:
+            self.metrics['ping_failures'] += 1
+            return False
+
+        try:
+            await connector.execute_query(self.ping_query)
+            return True
+        except Exception as e:
+            logger.debug(f"Ping HFSQL échoué: {e}")
+            self.metrics['ping_failures'] += 1
+            return False
+
+    async def _release(self, connector: Any):
+        """Rend une connexion au pool, ou l'évince si elle est cassée"""
+        if not connector.is_connected:
+            await self._discard(connector)
+            return
+
+        async with self._condition:
+            self._idle.append((connector, time.monotonic()))
+            self._condition.notify()
+
+    async def _discard(self, connector: Any):
+        """Ferme une connexion cassée et libère sa place"""
+        self._close_connector(connector)
+        self.metrics['evictions'] += 1
+
+        async with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _close_expired_idle(self):
+        """Ferme les connexions inactives depuis trop longtemps (au-delà du minimum)"""
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            connector, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+
+            self._idle.popleft()
+            self._size -= 1
+            self.metrics['idle_closed'] += 1
+            self._close_connector(connector)
+
+    def _close_connector(self, connector: Any):
+        try:
+            connector.close()
+        except Exception as e:
+            logger.debug(f"Erreur fermeture connexion pool (ignorée): {e}")
+
+    async def warm_up(self):
+        """Ouvre les connexions minimales à l'avance"""
+        connectors = []
+        try:
+            for _ in range(self.min_size - self._size):
+                connectors.append(await self._checkout())
+        finally:
+            for connector in connectors:
+                await self._release(connector)
+
+    async def close_all(self):
+        """Ferme toutes les connexions inactives"""
+        async with self._condition:
+            while self._idle:
+                connector, _ = self._idle.popleft()
+                self._size -= 1
+                self._close_connector(connector)
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Diagnostic rapide sur une connexion du pool (sans reconnexion)"""
+        start = time.monotonic()
+        try:
+            async with self.acquire() as connector:
+                await connector.execute_query(self.ping_query)
+            return {
+                'status': 'ok',
+                'ping_ms': round((time.monotonic() - start) * 1000, 1),
+                'pool': self.get_metrics()
+            }
+        except Exception as e:
+            return {'status': 'error', 'error': str(e), 'pool': self.get_metrics()}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Métriques du pool pour le monitoring"""
+        checkouts = self.metrics['checkouts']
+        return {
+            **self.metrics,
+            'size': self._size,
+            'idle': len(self._idle),
+            'in_use': self._size - len(self._idle),
+            'max_size': self.max_size,
+            'avg_wait_time_ms': self.metrics['wait_time_ms_total'] / checkouts if checkouts else 0.0
+        }
@@ -0,0 +1,243 @@
+# backend/app/utils/recordset_reader.py
+"""
+Lecture des recordsets ADO HFSQL
+
+Le parcours ligne par ligne (MoveNext + Fields[i].Name/.Value) coûte plusieurs
+appels COM par cellule. La lecture en bloc utilise Recordset.GetRows(n): un seul
+appel COM par paquet de lignes, noms de champs résolus une seule fois, et
+nettoyage appliqué colonne par colonne.
+
+Le type de chaque champ (Field.Type ADO ou cursor.description ODBC) est lu une
+seule fois par requête pour choisir un convertisseur par colonne: plus de
+chaîne d'isinstance par cellule.
+
+Ce module n'importe pas win32com: il fonctionne avec tout objet exposant
+la même surface (GetRows / Fields / EOF / MoveNext), ce qui permet de le
+tester sous Linux avec un faux recordset.
+"""
+import datetime as dt
+from decimal import Decimal
+from typing import List, Dict, Any, Iterator, Optional, Union, Callable, Sequence
+from loguru import logger
+
+# Taille des paquets GetRows par défaut
+GETROWS_CHUNK_SIZE = 500
+
+# Codes DataTypeEnum ADO regroupés par convertisseur
+ADO_STRING_TYPES = {8, 129, 130, 200, 201, 202, 203}  # BSTR, Char, WChar, VarChar, LongVarChar...
+ADO_INTEGER_TYPES = {2, 3, 11, 16, 17, 18, 19, 20, 21}  # SmallInt, Integer, Boolean, TinyInt, BigInt...
+ADO_NUMBER_TYPES = {4, 5, 6, 14, 131, 139}  # Single, Double, Currency, Decimal, Numeric, VarNumeric
+ADO_DATETIME_TYPES = {7, 135}  # Date (OLE), DBTimeStamp
+ADO_DATE_TYPES = {133}  # DBDate
+ADO_TIME_TYPES = {134}  # DBTime
+
+_INFINITIES = (float('inf'), float('-inf'))
+
+
+def clean_field_value(value: Any) -> Any:
+    """Nettoyage des valeurs de champs HFSQL"""
+    try:
+        if value is None:
+            return None
+
+        # String: nettoyage et trim
+        if isinstance(value, str):
+            cleaned = value.strip()
+            return cleaned if cleaned else None
+
+        # Nombres: vérification validité
+        if isinstance(value, (int, float)):
+            if isinstance(value, float):
+                # Check NaN/Infinity
+                if value != value or abs(value) == float('inf'):
+                    return None
+            return value
+
+        # Autres types: conversion string safe
+        return str(value) if value is not None else None
+
+    except Exception as e:
+        logger.debug(f"Erreur nettoyage valeur {value}: {e}")
+        return None
+
+
+def clean_string(value: Any) -> Any:
+    """Colonne texte: trim, chaîne vide → None"""
+    if value is None:
+        return None
+    cleaned = (value if isinstance(value, str) else str(value)).strip()
+    return cleaned if cleaned else None
+
+
+def clean_number(value: Any) -> Any:
+    """Colonne numérique: NaN/Infinity → None, Decimal → int ou float"""
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            return None
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if value != value or value in _INFINITIES:
+        return None
+    return value
+
+
+def clean_datetime(value: Any) -> Any:
+    """Colonne date/heure: pywintypes.datetime (avec fuseau) → datetime naïf"""
+    if value is None:
+        return None
+    if isinstance(value, dt.datetime):
+        return dt.datetime(value.year, value.month, value.day,
+                           value.hour, value.minute, value.second, value.microsecond)
+    return clean_field_value(value)
+
+
+def clean_date(value: Any) -> Any:
+    """Colonne date seule"""
+    if isinstance(value, dt.datetime):
+        return value.date()
+    return value if value is None or isinstance(value, dt.date) else clean_field_value(value)
+
+
+def clean_time(value: Any) -> Any:
+    """Colonne heure seule"""
+    if isinstance(value, dt.datetime):
+        return value.time()
+    return value if value is None or isinstance(value, dt.time) else clean_field_value(value)
+
+
+# Convertisseur None: valeurs transmises telles quelles (entiers, booléens)
+ColumnConverter = Optional[Callable[[Any], Any]]
+
+
+def build_ado_converters(field_types: Sequence[Optional[int]]) -> List[ColumnConverter]:
+    """Un convertisseur par colonne à partir des codes Field.Type ADO"""
+    converters = []
+    for field_type in field_types:
+        if field_type in ADO_STRING_TYPES:
+            converters.append(clean_string)
+        elif field_type in ADO_INTEGER_TYPES:
+            converters.append(None)
+        elif field_type in ADO_NUMBER_TYPES:
+            converters.append(clean_number)
+        elif field_type in ADO_DATETIME_TYPES:
+            converters.append(clean_datetime)
+        elif field_type in ADO_DATE_TYPES:
+            converters.append(clean_date)
+        elif field_type in ADO_TIME_TYPES:
+            converters.append(clean_time)
+        else:
+            converters.append(clean_field_value)  # Type inconnu: nettoyage générique
+    return converters
+
+
+def build_odbc_converters(description: Sequence[Sequence[Any]]) -> List[ColumnConverter]:
+    """Un convertisseur par colonne à partir de cursor.description (type Python)"""
+    converters = []
+    for column in description:
+        type_code = column[1]
+        if type_code is str:
+            converters.append(clean_string)
+        elif type_code in (int, bool):
+            converters.append(None)
+        elif type_code in (float, Decimal):
+            converters.append(clean_number)
+        elif type_code is dt.datetime:
+            converters.append(clean_datetime)
+        elif type_code is dt.date:
+            converters.append(clean_date)
+        elif type_code is dt.time:
+            converters.append(clean_time)
+        else:
+            converters.append(clean_field_value)
+    return converters
+
+
+def convert_columns(columns: Sequence[Sequence[Any]], converters: Sequence[ColumnConverter]) -> List[Sequence[Any]]:
+    """Applique les convertisseurs colonne par colonne (tableau [champ][ligne])"""
+    return [column if converter is None else list(map(converter, column))
+            for converter, column in zip(converters, columns)]
+
+
+def rows_to_dicts(rows: Sequence[Sequence[Any]], field_names: List[str],
+                  converters: Sequence[ColumnConverter]) -> List[Dict[str, Any]]:
+    """Lignes ODBC (tuples) → dictionnaires nettoyés, conversion par colonne"""
+    if not rows:
+        return []
+    columns = convert_columns(list(zip(*rows)), converters)
+    return [dict(zip(field_names, values)) for values in zip(*columns)]
+
+
+def get_field_types(recordset: Any) -> List[Optional[int]]:
+    """Résout les types ADO des champs une seule fois par recordset"""
+    fields = recordset.Fields
+    return [getattr(fields[i], 'Type', None) for i in range(fields.Count)]
+
+
+def get_field_names(recordset: Any) -> List[str]:
+    """Résout les noms de champs une seule fois par recordset"""
+    fields = recordset.Fields
+    return [str(fields[i].Name) for i in range(fields.Count)]
+
+
+def iter_row_chunks(recordset: Any, chunk_size: Union[int, Callable[[], int]] = GETROWS_CHUNK_SIZE,
+                    max_records: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Itère sur un recordset ouvert par paquets de lignes via GetRows
+
+    GetRows renvoie un tableau indexé [champ][ligne]: le convertisseur de
+    chaque colonne, choisi d'après son type ADO, est appliqué colonne par
+    colonne avant de reconstituer les dictionnaires.
+    chunk_size peut être une fonction, réévaluée à chaque paquet (taille adaptative).
+    """
+    field_names = get_field_names(recordset)
+    converters = build_ado_converters(get_field_types(recordset))
+    remaining = max_records
+
+    while not recordset.EOF:
+        size = chunk_size() if callable(chunk_size) else chunk_size
+        rows_wanted = size if remaining is None else min(size, remaining)
+        if rows_wanted <= 0:
+            break
+
+        columns = recordset.GetRows(rows_wanted)
+        if not columns or not columns[0]:
+            break
+
+        cleaned_columns = convert_columns(columns, converters)
+        rows = [dict(zip(field_names, values)) for values in zip(*cleaned_columns)]
+
+        if remaining is not None:
+            remaining -= len(rows)
+
+        yield rows
+
+
+def fetch_rows_bulk(recordset: Any, max_records: Optional[int] = None,
+                    chunk_size: int = GETROWS_CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """Lit tout le recordset (dans la limite max_records) via GetRows"""
+    results = []
+    for rows in iter_row_chunks(recordset, chunk_size=chunk_size, max_records=max_records):
+        results.extend(rows)
+    return results
+
+
+def fetch_rows_by_row(recordset: Any, max_records: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Lecture historique ligne par ligne (MoveNext + Fields[i] par cellule)
+    Conservée comme référence pour les benchmarks et le diagnostic
+    """
+    results = []
+
+    while not recordset.EOF and (max_records is None or len(results) < max_records):
+        row = {}
+        for i in range(recordset.Fields.Count):
+            field = recordset.Fields[i]
+            row[str(field.Name)] = clean_field_value(field.Value)
+
+        if row:
+            results.append(row)
+
+        recordset.MoveNext()
+
+    return results
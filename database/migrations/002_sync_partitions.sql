@@ -0,0 +1,18 @@
+-- Progression du chargement initial parallèle par plages d'ID
+CREATE TABLE synergo_sync.sync_partitions (
+    id SERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    partition_index INTEGER NOT NULL,
+    range_start BIGINT NOT NULL,
+    range_end BIGINT NOT NULL,
+    last_loaded_id BIGINT NOT NULL,
+    records_loaded BIGINT DEFAULT 0,
+    status VARCHAR(20) DEFAULT 'PENDING',
+    error_message TEXT,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (table_name, partition_index)
+);
+
+CREATE INDEX idx_sync_partitions_table_status ON synergo_sync.sync_partitions(table_name, status);
@@ -0,0 +1,2 @@
+-- Taille de lot apprise par le réglage adaptatif (reprise après redémarrage)
+ALTER TABLE synergo_sync.sync_state ADD COLUMN IF NOT EXISTS learned_batch_size INTEGER;
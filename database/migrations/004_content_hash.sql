@@ -0,0 +1,9 @@
+-- Empreinte du contenu HFSQL de chaque ligne (détection des modifications par balayage)
+ALTER TABLE synergo_core.products_catalog ADD COLUMN IF NOT EXISTS content_hash BIGINT;
+ALTER TABLE synergo_core.purchase_orders ADD COLUMN IF NOT EXISTS content_hash BIGINT;
+ALTER TABLE synergo_core.purchase_details ADD COLUMN IF NOT EXISTS content_hash BIGINT;
+ALTER TABLE synergo_core.sales_orders ADD COLUMN IF NOT EXISTS content_hash BIGINT;
+ALTER TABLE synergo_core.sales_details ADD COLUMN IF NOT EXISTS content_hash BIGINT;
+
+-- Curseur du balayage des empreintes (reprise après redémarrage)
+ALTER TABLE synergo_sync.sync_state ADD COLUMN IF NOT EXISTS sweep_cursor_id BIGINT;
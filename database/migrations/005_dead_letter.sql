@@ -0,0 +1,18 @@
+-- File des rejets: lignes HFSQL rejetées à la transformation ou au chargement, rejouables
+CREATE TABLE synergo_sync.dead_letter (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    hfsql_id BIGINT,
+    stage VARCHAR(20) NOT NULL,
+    reason TEXT,
+    raw_data JSONB NOT NULL,
+    status VARCHAR(20) DEFAULT 'PENDING',
+    retry_count INTEGER DEFAULT 0,
+    first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_attempt_at TIMESTAMP,
+    resolved_at TIMESTAMP,
+    UNIQUE (table_name, hfsql_id)
+);
+
+CREATE INDEX idx_dead_letter_table_status ON synergo_sync.dead_letter(table_name, status, id);
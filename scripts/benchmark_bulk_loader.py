@@ -0,0 +1,129 @@
+# scripts/benchmark_bulk_loader.py
+"""
+Benchmark chargement PostgreSQL: INSERT ... ON CONFLICT (executemany) vs COPY + fusion
+
+Charge des lignes synthétiques au format sales_details dans une table de
+test synergo_sync.benchmark_bulk_load via IdBasedSyncStrategy.insert_records,
+page par page comme la synchronisation, avec les deux chargeurs. Chaque taille
+est mesurée en insertion (table vide) puis en mise à jour (mêmes hfsql_id).
+
+Nécessite la base PostgreSQL configurée dans .env (ASYNC_DATABASE_URL).
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from sqlalchemy import text
+from app.core.database import get_async_session_context
+from app.sync.strategies.id_based_sync import IdBasedSyncStrategy
+
+BENCHMARK_TABLE = "benchmark_bulk_load"
+
+
+async def create_benchmark_table():
+    async with get_async_session_context() as session:
+        await session.execute(text(f"DROP TABLE IF EXISTS synergo_sync.{BENCHMARK_TABLE}"))
+        await session.execute(text(f"""
+        CREATE TABLE synergo_sync.{BENCHMARK_TABLE} (
+            id SERIAL PRIMARY KEY,
+            hfsql_id BIGINT UNIQUE NOT NULL,
+            sales_order_hfsql_id BIGINT,
+            product_hfsql_id BIGINT,
+            product_name VARCHAR(255),
+            quantity INTEGER,
+            unit_price DECIMAL(10,2),
+            total_amount DECIMAL(12,2),
+            margin DECIMAL(10,2),
+            sync_version INTEGER DEFAULT 1,
+            last_synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """))
+        await session.commit()
+
+
+async def truncate_benchmark_table():
+    async with get_async_session_context() as session:
+        await session.execute(text(f"TRUNCATE synergo_sync.{BENCHMARK_TABLE}"))
+        await session.commit()
+
+
+def make_page(start_id, count, version):
+    now = datetime.now()
+    return [
+        {
+            'hfsql_id': hfsql_id,
+            'sales_order_hfsql_id': hfsql_id // 4,
+            'product_hfsql_id': hfsql_id % 5000,
+            'product_name': f'PRODUIT {hfsql_id % 5000}',
+            'quantity': hfsql_id % 7 + 1,
+            'unit_price': 120.5 + version,
+            'total_amount': (120.5 + version) * (hfsql_id % 7 + 1),
+            'margin': 18.25,
+            'sync_version': version,
+            'last_synced_at': now,
+            'created_at': now
+        }
+        for hfsql_id in range(start_id, start_id + count)
+    ]
+
+
+async def load(loader, rows, page_size, version):
+    strategy = IdBasedSyncStrategy({
+        'table_name': BENCHMARK_TABLE,
+        'hfsql_table': BENCHMARK_TABLE,
+        'schema': 'synergo_sync',
+        'bulk_loader': loader
+    }, hfsql_connector=None)
+
+    start = time.perf_counter()
+    for start_id in range(1, rows + 1, page_size):
+        page = make_page(start_id, min(page_size, rows - start_id + 1), version)
+        async with get_async_session_context() as session:
+            await strategy.insert_records(session, page)
+            await session.commit()
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark chargement PostgreSQL")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--page-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    print("⚡ BENCHMARK CHARGEMENT POSTGRESQL")
+    print("=" * 40)
+    print(f"📊 Pages de {args.page_size} lignes")
+
+    await create_benchmark_table()
+
+    try:
+        for rows in args.rows:
+            print(f"\n📦 {rows} lignes")
+            timings = {}
+            for loader in ('insert', 'copy'):
+                await truncate_benchmark_table()
+                inserted = await load(loader, rows, args.page_size, version=1)
+                updated = await load(loader, rows, args.page_size, version=2)
+                timings[loader] = inserted + updated
+
+                print(f"   {loader:<7} insertion {inserted:8.2f}s ({rows / inserted:9.0f} lignes/s)  "
+                      f"mise à jour {updated:8.2f}s ({rows / updated:9.0f} lignes/s)")
+
+            print(f"   🚀 Accélération COPY: x{timings['insert'] / timings['copy']:.1f}")
+
+    finally:
+        async with get_async_session_context() as session:
+            await session.execute(text(f"DROP TABLE IF EXISTS synergo_sync.{BENCHMARK_TABLE}"))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
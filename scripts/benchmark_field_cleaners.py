@@ -0,0 +1,77 @@
+# scripts/benchmark_field_cleaners.py
+"""
+Benchmark nettoyage des cellules HFSQL: générique vs convertisseurs par colonne
+
+Compare clean_field_value appliqué à chaque cellule (chaîne d'isinstance,
+contrôle NaN, repli str()) aux convertisseurs choisis une fois par colonne
+d'après le type ADO, sur un résultat synthétique au format GetRows [champ][ligne].
+"""
+
+import argparse
+import datetime as dt
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Ajouter backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.utils.recordset_reader import clean_field_value, build_ado_converters, convert_columns
+
+# Mélange de colonnes typique d'une table de ventes HFSQL (type ADO, générateur de valeur)
+COLUMN_KINDS = [
+    (3, lambda r: r),  # adInteger
+    (202, lambda r: f' PRODUIT {r % 997} '),  # adVarWChar
+    (5, lambda r: r * 1.25),  # adDouble
+    (6, lambda r: Decimal(r % 500) / 4),  # adCurrency
+    (7, lambda r: dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(minutes=r)),  # adDate
+    (11, lambda r: r % 2 == 0),  # adBoolean
+]
+
+
+def build_columns(rows, columns):
+    field_types = []
+    data = []
+    for c in range(columns):
+        field_type, make_value = COLUMN_KINDS[c % len(COLUMN_KINDS)]
+        field_types.append(field_type)
+        data.append(tuple(make_value(r) if r % 11 else None for r in range(rows)))
+    return field_types, data
+
+
+def clean_generic(columns):
+    return [list(map(clean_field_value, column)) for column in columns]
+
+
+def run(label, clean, columns, cells):
+    start = time.perf_counter()
+    clean(columns)
+    elapsed = time.perf_counter() - start
+
+    print(f"   {label:<24} {elapsed:8.3f}s  {elapsed / cells * 1e9:8.1f} ns/cellule")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark nettoyage des cellules HFSQL")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=30)
+    args = parser.parse_args()
+
+    print("⚡ BENCHMARK NETTOYAGE CELLULES")
+    print("=" * 40)
+    print(f"📊 {args.rows} lignes × {args.columns} colonnes")
+
+    field_types, columns = build_columns(args.rows, args.columns)
+    cells = args.rows * args.columns
+    converters = build_ado_converters(field_types)
+
+    generic = run("Générique par cellule", clean_generic, columns, cells)
+    typed = run("Convertisseurs typés", lambda data: convert_columns(data, converters), columns, cells)
+
+    print(f"\n🚀 Réduction du coût par cellule: x{generic / typed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# scripts/benchmark_recordset_fetch.py
+"""
+Benchmark lecture recordset HFSQL: ligne par ligne vs GetRows
+
+Utilise un faux recordset qui simule le coût d'un appel COM inter-appartements
+(--com-call-us) afin de comparer les deux chemins sans serveur HFSQL.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ajouter backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.utils.recordset_reader import fetch_rows_bulk, fetch_rows_by_row
+
+
+class SimulatedComRecordset:
+    """Faux ADODB.Recordset comptant (et facturant) chaque appel COM"""
+
+    def __init__(self, rows, columns, com_call_us):
+        self.field_names = [f'champ_{i}' for i in range(columns)]
+        self.rows = [tuple(f' valeur {r}-{c} ' if c % 2 else r * 1.5 for c in range(columns)) for r in range(rows)]
+        self.position = 0
+        self.com_calls = 0
+        self.com_call_seconds = com_call_us / 1_000_000
+
+    def _com_call(self):
+        self.com_calls += 1
+        if self.com_call_seconds:
+            deadline = time.perf_counter() + self.com_call_seconds
+            while time.perf_counter() < deadline:
+                pass
+
+    @property
+    def EOF(self):
+        self._com_call()
+        return self.position >= len(self.rows)
+
+    @property
+    def Fields(self):
+        self._com_call()
+        return _SimulatedFields(self)
+
+    def MoveNext(self):
+        self._com_call()
+        self.position += 1
+
+    def GetRows(self, rows=-1):
+        self._com_call()
+        end = len(self.rows) if rows < 0 else min(self.position + rows, len(self.rows))
+        chunk = self.rows[self.position:end]
+        self.position = end
+        return tuple(tuple(row[i] for row in chunk) for i in range(len(self.field_names)))
+
+
+class _SimulatedFields:
+    def __init__(self, recordset):
+        self._recordset = recordset
+
+    @property
+    def Count(self):
+        self._recordset._com_call()
+        return len(self._recordset.field_names)
+
+    def __getitem__(self, index):
+        self._recordset._com_call()
+        return _SimulatedField(self._recordset, index)
+
+
+class _SimulatedField:
+    def __init__(self, recordset, index):
+        self._recordset = recordset
+        self._index = index
+
+    @property
+    def Name(self):
+        self._recordset._com_call()
+        return self._recordset.field_names[self._index]
+
+    @property
+    def Value(self):
+        self._recordset._com_call()
+        return self._recordset.rows[self._recordset.position][self._index]
+
+
+def run(label, fetch, rows, columns, com_call_us):
+    recordset = SimulatedComRecordset(rows, columns, com_call_us)
+    start = time.perf_counter()
+    result = fetch(recordset)
+    elapsed = time.perf_counter() - start
+
+    print(f"   {label:<16} {elapsed:8.3f}s  {len(result) / elapsed:10.0f} lignes/s  "
+          f"{recordset.com_calls:>9} appels COM")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lecture recordset HFSQL")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--columns', type=int, default=20)
+    parser.add_argument('--com-call-us', type=float, default=5.0,
+                        help="Coût simulé d'un appel COM en microsecondes")
+    args = parser.parse_args()
+
+    print("⚡ BENCHMARK LECTURE RECORDSET")
+    print("=" * 40)
+    print(f"📊 {args.rows} lignes × {args.columns} colonnes, {args.com_call_us}µs par appel COM")
+
+    by_row = run("Ligne par ligne", fetch_rows_by_row, args.rows, args.columns, args.com_call_us)
+    bulk = run("GetRows", fetch_rows_bulk, args.rows, args.columns, args.com_call_us)
+
+    print(f"\n🚀 Accélération GetRows: x{by_row / bulk:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# scripts/benchmark_string_cache.py
+"""
+Benchmark du cache de chaînes sur une journée de ventes
+
+Génère une journée réaliste (tickets et lignes de vente, quelques centaines
+de produits, quelques caissiers et caisses) dont chaque valeur texte est un
+nouvel objet chaîne, comme celles renvoyées par le pilote HFSQL. Compare,
+sans puis avec le cache, le débit de transform_batch et la mémoire retenue
+par les enregistrements transformés (tracemalloc).
+"""
+
+import argparse
+import asyncio
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ajouter backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from loguru import logger
+
+from app.sync.transformers import SalesOrderTransformer, SalesDetailTransformer
+from app.sync.transformers.string_cache import reset_string_cache
+
+CASHIERS = ['Marie', 'Karim', 'Nadia', 'Yacine']
+REGISTERS = ['CAISSE_1', 'CAISSE_2', 'CAISSE_3']
+SALE_TYPES = ['CHIFA', 'LIBRE', 'CASNOS']
+
+
+def sales_day(tickets, products, seed=42):
+    """Tickets et lignes d'une journée; chaînes HFSQL complétées d'espaces"""
+    rng = random.Random(seed)
+    catalog = [(f'PRODUIT {index} CPR {index % 40 * 50} MG', f'LOT{index * 7 % 9973:05d}')
+               for index in range(products)]
+    orders, details = [], []
+    detail_id = 0
+
+    for ticket_id in range(1, tickets + 1):
+        sale_type = rng.choice(SALE_TYPES)
+        orders.append({
+            'id': ticket_id, 'date': '20241210', 'heure': f'{8 + ticket_id * 12 // tickets:02d}3022',
+            'caissier': f'{rng.choice(CASHIERS)} ', 'nom_caisse': f'{rng.choice(REGISTERS)} ',
+            'client': f'CLIENT {rng.randrange(400)} ', 'type_vente': f'{sale_type} ',
+            'type_client': f'{"ASSURE"} ', 'sous_total': '45.50', 'total_a_payer': '45.50',
+            'encaisse': 50.0, 'taux_couverture': '80.0', 'nombre_article': '3', 'statut': f'{"TERMINEE"} '
+        })
+        for _ in range(rng.randint(1, 5)):
+            detail_id += 1
+            # Les produits courants reviennent bien plus souvent que les autres
+            name, lot = catalog[min(int(rng.paretovariate(1.2)) - 1, products - 1)]
+            quantity = rng.randint(1, 3)
+            details.append({
+                'id': detail_id, 'id_sortie': ticket_id, 'id_produit': rng.randrange(8000) + 1,
+                'id_nom': rng.randrange(5000) + 1,
+                'nom_produit': f'{name} ', 'numero_lot': f'{lot} ', 'prix_vente': '3.8500',
+                'quantite': str(quantity), 'total_ligne': f'{3.85 * quantity:.2f}', 'prix_achat': 2.5,
+                'type_vente': f'{sale_type} ', 'taux_couverture': '80.0'
+            })
+
+    return orders, details
+
+
+async def transform_day(orders, details, batch_size):
+    transformed = []
+    for transformer, records in ((SalesOrderTransformer(), orders), (SalesDetailTransformer(), details)):
+        for offset in range(0, len(records), batch_size):
+            transformed.extend(await transformer.transform_batch(records[offset:offset + batch_size]))
+    return transformed
+
+
+async def run(label, cache_size, orders, details, batch_size, repeat):
+    # Débit: meilleur de plusieurs passes, cache neuf à chaque passe comme un cycle de sync
+    best = None
+    for _ in range(repeat):
+        reset_string_cache(cache_size)
+        start = time.perf_counter()
+        await transform_day(orders, details, batch_size)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Mémoire retenue par les enregistrements transformés
+    reset_string_cache(cache_size)
+    gc.collect()
+    tracemalloc.start()
+    transformed = await transform_day(orders, details, batch_size)
+    reset_string_cache(0)  # Ne compter que ce que les enregistrements gardent
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = len(orders) + len(details)
+    print(f"   {label:<12} {rows / best:>10,.0f} lignes/s  {retained / 1024 / 1024:7.2f} Mo retenus "
+          f"({len(transformed)} enregistrements)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark du cache de chaînes (journée de ventes)")
+    parser.add_argument('--tickets', type=int, default=3000)
+    parser.add_argument('--products', type=int, default=800)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # Les logs DEBUG par lot fausseraient la mesure
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    orders, details = sales_day(args.tickets, args.products)
+    print("⚡ BENCHMARK CACHE DE CHAÎNES")
+    print("=" * 40)
+    print(f"📊 {len(orders)} tickets, {len(details)} lignes, {args.products} produits")
+
+    await run('sans cache', 0, orders, details, args.batch_size, args.repeat)
+    await run('avec cache', 50000, orders, details, args.batch_size, args.repeat)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
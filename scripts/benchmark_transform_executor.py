@@ -0,0 +1,80 @@
+# scripts/benchmark_transform_executor.py
+"""
+Benchmark transformation dans le processus vs pool de processus
+
+Pour chaque taille de lot, compare transform_batch exécuté dans le
+processus à TransformExecutor (tranches réparties dans un pool déjà
+démarré). Le point de bascule est la plus petite taille de lot à partir de
+laquelle le pool est plus rapide: c'est la valeur à reporter dans
+SYNC_TRANSFORM_PROCESS_MIN_ROWS.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Ajouter backend et scripts au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+
+from loguru import logger
+
+from app.sync.transform_executor import TransformExecutor
+from benchmark_transformers import TRANSFORMERS
+
+
+async def measure(transform, records, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await transform(records)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pool de processus de transformation")
+    parser.add_argument('--table', default='sales_details', choices=[label for label, _, _ in TRANSFORMERS])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 5000, 10000, 20000, 50000])
+    parser.add_argument('--workers', type=int, default=0, help="0 = nombre de cœurs - 1")
+    parser.add_argument('--chunk-rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    _, transformer_class, make_row = next(entry for entry in TRANSFORMERS if entry[0] == args.table)
+    transformer = transformer_class()
+    executor = TransformExecutor(max_workers=args.workers, min_rows=0, min_chunk_rows=args.chunk_rows, enabled=True)
+
+    print("⚡ BENCHMARK POOL DE TRANSFORMATION")
+    print("=" * 40)
+    print(f"📊 {args.table}, {executor.max_workers} processus, tranches >= {args.chunk_rows} lignes")
+
+    # Démarrage des processus et import des transformateurs hors mesure
+    await executor.transform(transformer, [make_row(r) for r in range(1, args.chunk_rows * executor.max_workers + 1)])
+
+    crossover = None
+    try:
+        for size in args.sizes:
+            records = [make_row(r) for r in range(1, size + 1)]
+            local = await measure(transformer.transform_batch, records, args.repeat)
+            pooled = await measure(lambda batch: executor.transform(transformer, batch), records, args.repeat)
+
+            if pooled < local and crossover is None:
+                crossover = size
+            print(f"   {size:>7} lignes  local {local * 1000:8.1f} ms  pool {pooled * 1000:8.1f} ms  x{local / pooled:.2f}")
+    finally:
+        executor.shutdown()
+
+    if crossover:
+        print(f"\n🎯 Point de bascule: {crossover} lignes (SYNC_TRANSFORM_PROCESS_MIN_ROWS)")
+    else:
+        print("\n⚠️ Le pool n'est jamais plus rapide ici (cœurs insuffisants?): garder le traitement local")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+# scripts/benchmark_transformers.py
+"""
+Benchmark des transformateurs HFSQL → PostgreSQL
+
+Mesure le débit (enregistrements/s) de transform_batch pour chacun des cinq
+transformateurs, sur des lignes synthétiques au format HFSQL (chaînes à
+nettoyer, montants en texte, dates YYYYMMDD). Lancer le script avant et
+après une modification des transformateurs pour comparer les débits.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Ajouter backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from loguru import logger
+
+from app.sync.transformers import (ProductTransformer, PurchaseOrderTransformer, PurchaseDetailTransformer,
+                                   SalesOrderTransformer, SalesDetailTransformer)
+
+
+def product_row(r):
+    return {'id': r, 'nom': f' DOLIPRANE {r % 997} MG CPR ', 'famille': 'ANTALGIQUES', 'quantite_alerte': str(r % 20),
+            'labo': 'SANOFI', 'id_cnas': f'CN{r}', 'de_equiv': f'DCI{r % 300}', 'psychotrope': '0',
+            'code_barre_origine': f'3400-930{r:06d}'}
+
+
+def purchase_order_row(r):
+    return {'id': r, 'date_commande': '20241210', 'heure_commande': '143000', 'fournisseur': ' CERP ROUEN ',
+            'reference': f'CMD-{r}', 'type': 'AV' if r % 10 == 0 else 'A', 'num_av': '', 'motif': '',
+            'sous_total_ht': '1050.50', 'tva': '199.60', 'remise': '0', 'total_ttc': '1250.10',
+            'montant_total': '1250,10', 'date_livraison': '2024-12-12', 'numero_facture': f'FACT-{r}',
+            'statut': 'LIVREE', 'utilisateur': 'admin', 'notes': ''}
+
+
+def purchase_detail_row(r):
+    return {'id': r, 'id_produit': r % 5000 + 1, 'id_entree': r // 10 + 1, 'id_fournisseur': '' if r % 3 else 7,
+            'nom_produit': f'PRODUIT {r % 997}', 'code_produit': f'P{r % 997}', 'prix_achat': '2.50',
+            'prix_vente': 3.85, 'marge': '35.0', 'stock': str(r % 50), 'type_entree': 'ACHAT'}
+
+
+def sales_order_row(r):
+    return {'id': r, 'date': '20241210', 'heure': '143022', 'caissier': 'Marie', 'nom_caisse': 'CAISSE_1',
+            'client': f'CLIENT {r % 400}', 'type_vente': 'CHIFA' if r % 2 else 'LIBRE', 'type_client': 'ASSURE',
+            'remise': '0', 'no_facture_chifa': f'CH{r}', 'majoration': 0.0, 'reglement_ult': '0',
+            'sous_total': '45.50', 'tva': '0', 'total_a_payer': '45.50', 'encaisse': 50.0, 'monnaie': '4.50',
+            'numero_assurance': '123456789', 'taux_couverture': '80.0', 'reste_a_charge': '9.10',
+            'nombre_article': '3', 'benefice': '12.30', 'statut': 'TERMINEE', 'notes': ''}
+
+
+def sales_detail_row(r):
+    return {'id': r, 'id_sortie': r // 3 + 1, 'id_produit': r % 8000 + 1, 'id_nom': r % 5000 + 1,
+            'nom_produit': f'DOLIPRANE {r % 997}', 'numero_lot': f'LOT{r % 3000}', 'prix_vente': '3.8500',
+            'quantite': str(r % 4 + 1), 'total_ligne': '7.70', 'prix_achat': 2.5, 'benefice_unitaire': '1.3500',
+            'benefice_ligne': '2.70', 'marge_pourcent': '35.06', 'remise_pourcent': '0', 'remise_montant': '0',
+            'type_vente': 'CHIFA', 'taux_couverture': '80.0', 'part_patient': '1.54', 'part_assurance': '6.16',
+            'stock_apres': '46'}
+
+
+TRANSFORMERS = [
+    ('products_catalog', ProductTransformer, product_row),
+    ('purchase_orders', PurchaseOrderTransformer, purchase_order_row),
+    ('purchase_details', PurchaseDetailTransformer, purchase_detail_row),
+    ('sales_orders', SalesOrderTransformer, sales_order_row),
+    ('sales_details', SalesDetailTransformer, sales_detail_row),
+]
+
+
+async def run(label, transformer_class, make_row, rows, batch_size):
+    transformer = transformer_class()
+    records = [make_row(r) for r in range(1, rows + 1)]
+
+    start = time.perf_counter()
+    transformed = 0
+    for offset in range(0, rows, batch_size):
+        transformed += len(await transformer.transform_batch(records[offset:offset + batch_size]))
+    elapsed = time.perf_counter() - start
+
+    print(f"   {label:<18} {transformed:>8} lignes  {elapsed:7.3f}s  {rows / elapsed:>10,.0f} lignes/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark des transformateurs HFSQL → PostgreSQL")
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    # Les logs DEBUG par lot fausseraient la mesure
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    print("⚡ BENCHMARK TRANSFORMATEURS")
+    print("=" * 40)
+    print(f"📊 {args.rows} lignes par table, lots de {args.batch_size}")
+
+    for label, transformer_class, make_row in TRANSFORMERS:
+        await run(label, transformer_class, make_row, args.rows, args.batch_size)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
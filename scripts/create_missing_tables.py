@@ -52,6 +52,7 @@ async def create_core_tables():
 
             -- Métadonnées sync
             sync_version INTEGER DEFAULT 1,
+            content_hash BIGINT,
             last_synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -92,6 +93,7 @@ async def create_core_tables():
 
             -- Métadonnées sync
             sync_version INTEGER DEFAULT 1,
+            content_hash BIGINT,
             last_synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -135,6 +137,7 @@ async def create_core_tables():
 
             -- Métadonnées sync
             sync_version INTEGER DEFAULT 1,
+            content_hash BIGINT,
             last_synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -185,6 +188,7 @@ async def create_core_tables():
 
             -- Métadonnées sync
             sync_version INTEGER DEFAULT 1,
+            content_hash BIGINT,
             last_synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -231,6 +235,7 @@ async def create_core_tables():
 
             -- Métadonnées sync
             sync_version INTEGER DEFAULT 1,
+            content_hash BIGINT,
             last_synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -251,6 +256,16 @@ async def create_core_tables():
             except Exception as e:
                 print(f"❌ Erreur table {table_name}: {e}")
 
+        # Colonnes ajoutées après la création initiale
+        for table_name, sql in tables:
+            try:
+                await session.execute(text(
+                    f"ALTER TABLE synergo_core.{table_name} ADD COLUMN IF NOT EXISTS content_hash BIGINT"
+                ))
+                print(f"✅ Colonne synergo_core.{table_name}.content_hash créée/vérifiée")
+            except Exception as e:
+                print(f"❌ Erreur colonne {table_name}.content_hash: {e}")
+
         await session.commit()
 
 
@@ -285,6 +300,8 @@ async def create_sync_tables():
             last_sync_status VARCHAR(20) DEFAULT 'PENDING',
             error_message TEXT,
             records_processed_last_sync INTEGER DEFAULT 0,
+            learned_batch_size INTEGER,
+            sweep_cursor_id BIGINT,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """
@@ -303,10 +320,48 @@ async def create_sync_tables():
         )
         """
 
+        sync_partitions_sql = """
+        CREATE TABLE IF NOT EXISTS synergo_sync.sync_partitions (
+            id SERIAL PRIMARY KEY,
+            table_name VARCHAR(100) NOT NULL,
+            partition_index INTEGER NOT NULL,
+            range_start BIGINT NOT NULL,
+            range_end BIGINT NOT NULL,
+            last_loaded_id BIGINT NOT NULL,
+            records_loaded BIGINT DEFAULT 0,
+            status VARCHAR(20) DEFAULT 'PENDING',
+            error_message TEXT,
+            started_at TIMESTAMP,
+            completed_at TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (table_name, partition_index)
+        )
+        """
+
+        dead_letter_sql = """
+        CREATE TABLE IF NOT EXISTS synergo_sync.dead_letter (
+            id BIGSERIAL PRIMARY KEY,
+            table_name VARCHAR(100) NOT NULL,
+            hfsql_id BIGINT,
+            stage VARCHAR(20) NOT NULL,
+            reason TEXT,
+            raw_data JSONB NOT NULL,
+            status VARCHAR(20) DEFAULT 'PENDING',
+            retry_count INTEGER DEFAULT 0,
+            first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_attempt_at TIMESTAMP,
+            resolved_at TIMESTAMP,
+            UNIQUE (table_name, hfsql_id)
+        )
+        """
+
         sync_tables = [
             ("sync_tables", sync_tables_sql),
             ("sync_state", sync_state_sql),
-            ("sync_log", sync_log_sql)
+            ("sync_log", sync_log_sql),
+            ("sync_partitions", sync_partitions_sql),
+            ("dead_letter", dead_letter_sql)
         ]
 
         for table_name, sql in sync_tables:
@@ -316,6 +371,21 @@ async def create_sync_tables():
             except Exception as e:
                 print(f"❌ Erreur table sync {table_name}: {e}")
 
+        # Colonnes ajoutées après la création initiale
+        sync_columns = [
+            ("sync_state.learned_batch_size",
+             "ALTER TABLE synergo_sync.sync_state ADD COLUMN IF NOT EXISTS learned_batch_size INTEGER"),
+            ("sync_state.sweep_cursor_id",
+             "ALTER TABLE synergo_sync.sync_state ADD COLUMN IF NOT EXISTS sweep_cursor_id BIGINT")
+        ]
+
+        for column_name, sql in sync_columns:
+            try:
+                await session.execute(text(sql))
+                print(f"✅ Colonne synergo_sync.{column_name} créée/vérifiée")
+            except Exception as e:
+                print(f"❌ Erreur colonne sync {column_name}: {e}")
+
         await session.commit()
 
 
@@ -349,7 +419,9 @@ async def create_indexes():
 
             # Index sync
             "CREATE INDEX IF NOT EXISTS idx_sync_log_table_created ON synergo_sync.sync_log(table_name, created_at)",
-            "CREATE INDEX IF NOT EXISTS idx_sync_state_table ON synergo_sync.sync_state(table_name)"
+            "CREATE INDEX IF NOT EXISTS idx_sync_state_table ON synergo_sync.sync_state(table_name)",
+            "CREATE INDEX IF NOT EXISTS idx_sync_partitions_table_status ON synergo_sync.sync_partitions(table_name, status)",
+            "CREATE INDEX IF NOT EXISTS idx_dead_letter_table_status ON synergo_sync.dead_letter(table_name, status, id)"
         ]
 
         for index_sql in indexes:
@@ -31,19 +31,15 @@ async def test_manual_sync():
         sync_manager = SynergoSyncManager()
 
         print("📊 Configuration ERP des tables:")
-        # Afficher dans l'ordre de synchronisation
-        sorted_configs = sorted(
-            sync_manager.sync_tables_config.items(),
-            key=lambda x: x[1].get('sync_order', 999)
-        )
-
-        for table_key, config in sorted_configs:
-            order = config.get('sync_order', '?')
+        # Afficher dans l'ordre de synchronisation (dépendances FK)
+        for order, table_key in enumerate(sync_manager.get_sync_order(), 1):
+            config = sync_manager.sync_tables_config[table_key]
             interval = config.get('sync_interval_minutes', 30)
             transformer = config.get('transformer', None)
             transformer_name = transformer.__name__ if transformer else 'N/A'
 
             print(f"   {order}. {config['table_name']} ← {config['hfsql_table']}")
+            print(f"      ⛓️ après: {', '.join(config.get('depends_on', [])) or '-'}")
             print(f"      🔄 {interval}min | 🔧 {transformer_name}")
         print()
 
@@ -0,0 +1,163 @@
+# tests/conftest.py
+"""
+Doublures communes des tests de synchronisation (session, pool HFSQL, table HFSQL en mémoire)
+"""
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync import sync_manager as sync_manager_module
+from app.sync.sync_manager import SynergoSyncManager
+from app.sync.strategies.id_based_sync import IdBasedSyncStrategy
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def scalar(self):
+        return self.rows[0][0]
+
+
+class FakeSession:
+    """Requêtes enregistrées, écritures (pending) appliquées seulement au commit"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+        self.pending = []
+
+    async def execute(self, query, params=None):
+        self.executed.append((str(query), params))
+        return FakeResult(self.rows)
+
+    async def commit(self):
+        for apply in self.pending:
+            apply()
+        self.pending = []
+
+
+class FakePool:
+    """Pool HFSQL factice: compte les emprunts, sans connecteur"""
+
+    def __init__(self, max_size=1):
+        self.max_size = max_size
+        self.checkouts = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.checkouts += 1
+        yield None
+
+
+class FakeSessions:
+    """Fabrique de sessions factices (remplaçable) derrière un contexte asynchrone"""
+
+    def __init__(self):
+        self.factory = FakeSession
+
+    @asynccontextmanager
+    async def context(self):
+        yield self.factory()
+
+
+def product_rows(first_id, last_id):
+    """Lignes HFSQL nomenclature valides"""
+    return [{'id': i, 'nom': f'PRODUIT {i}'} for i in range(first_id, last_id + 1)]
+
+
+@pytest.fixture
+def fake_sessions(monkeypatch):
+    """get_async_session_context du manager ouvre des sessions de sessions.factory"""
+    sessions = FakeSessions()
+    monkeypatch.setattr(sync_manager_module, 'get_async_session_context', sessions.context)
+    return sessions
+
+
+@pytest.fixture
+def in_memory_hfsql(monkeypatch):
+    """
+    Branche un manager sur une table HFSQL en mémoire
+
+    La stratégie ID lit manager.hfsql_rows, charge les hfsql_id dans
+    manager.loaded au commit et échoue une fois sur les pages contenant
+    un ID de manager.fail_ids.
+    """
+    def attach(manager, hfsql_rows=(), pool_size=1):
+        manager.spool = None
+        manager.dead_letters = None
+        manager.hfsql_pool = FakePool(pool_size)
+        manager.hfsql_rows = list(hfsql_rows)
+        manager.fail_ids = set()
+        manager.loaded = []
+        manager.max_id_queries = 0
+
+        async def noop(*args):
+            pass
+
+        async def stream_new_records(self, last_sync_id=0, max_rows=None, upper_id=None):
+            rows = [row for row in manager.hfsql_rows
+                    if last_sync_id < row['id'] <= (upper_id or row['id'])][:max_rows]
+            for offset in range(0, len(rows), self.batch_size):
+                yield rows[offset:offset + self.batch_size]
+
+        async def upsert_records(self, session, records):
+            hfsql_ids = [record['hfsql_id'] for record in records]
+            failing = manager.fail_ids.intersection(hfsql_ids)
+            if failing:
+                manager.fail_ids -= failing  # Erreur ponctuelle: réussit à la reprise
+                raise Exception("Erreur PostgreSQL simulée")
+            session.pending.append(lambda: manager.loaded.extend(hfsql_ids))
+            return {'inserted': len(records), 'updated': 0, 'unchanged': 0}
+
+        async def get_hfsql_min_id(self):
+            return min(row['id'] for row in manager.hfsql_rows)
+
+        async def get_hfsql_max_id(self):
+            manager.max_id_queries += 1
+            return max(row['id'] for row in manager.hfsql_rows)
+
+        monkeypatch.setattr(manager, '_log_anomalies', noop)
+        monkeypatch.setattr(IdBasedSyncStrategy, 'stream_new_records', stream_new_records)
+        monkeypatch.setattr(IdBasedSyncStrategy, 'upsert_records', upsert_records)
+        monkeypatch.setattr(IdBasedSyncStrategy, 'get_hfsql_min_id', get_hfsql_min_id)
+        monkeypatch.setattr(IdBasedSyncStrategy, 'get_hfsql_max_id', get_hfsql_max_id)
+        return manager
+
+    return attach
+
+
+@pytest.fixture
+def make_table_sync(monkeypatch, fake_sessions, in_memory_hfsql):
+    """Fabrique de managers synchronisant products_catalog, sync_state en mémoire"""
+
+    def make(hfsql_rows=(), **config):
+        manager = in_memory_hfsql(SynergoSyncManager(), hfsql_rows)
+        manager.state = {'last_sync_id': 0, 'total_records': 0, 'last_sync_status': 'SUCCESS',
+                         'learned_batch_size': None}
+
+        async def get_sync_state(session, table_name):
+            return dict(manager.state)
+
+        async def update_sync_state(session, table_name, updates):
+            session.pending.append(lambda: manager.state.update(updates))
+
+        monkeypatch.setattr(manager, '_get_sync_state', get_sync_state)
+        monkeypatch.setattr(manager, '_update_sync_state', update_sync_state)
+
+        manager.table_config = {**manager.sync_tables_config['products_catalog'], 'adaptive_batch': False,
+                                **config}
+        return manager
+
+    return make
@@ -0,0 +1,111 @@
+# tests/test_anomalies.py
+"""
+Tests du comptage agrégé des anomalies de transformation
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.transformers import AnomalyCounter, SalesDetailTransformer, PurchaseOrderTransformer
+from app.sync.transformers.field_spec import to_decimal
+
+
+class TestAnomalyCounter:
+
+    def test_counts_and_bounded_samples(self):
+        anomalies = AnomalyCounter(max_samples=2)
+
+        for record_id in range(1, 6):
+            anomalies.add('above_max', 'margin_percent', record_id)
+        anomalies.add('rejected_invalid', record_id=9)
+
+        assert anomalies.total == 6
+        assert anomalies.summary()[0] == {'kind': 'above_max', 'field': 'margin_percent', 'count': 5,
+                                          'sample_ids': [1, 2]}
+
+    def test_merge(self):
+        first, second = AnomalyCounter(), AnomalyCounter()
+        first.add('invalid_int', 'quantity_sold', 1)
+        second.add('invalid_int', 'quantity_sold', count=3, sample_ids=[2, 3])
+
+        first.merge(second)
+
+        assert first.counts == {('invalid_int', 'quantity_sold'): 4}
+        assert first.samples[('invalid_int', 'quantity_sold')] == [1, 2, 3]
+
+    def test_converter_counts_instead_of_logging(self):
+        anomalies = AnomalyCounter()
+
+        assert to_decimal('150', 2, 100.0, anomalies, 'discount_percent', {'id': 7}) == 100.0
+        assert anomalies.summary() == [{'kind': 'above_max', 'field': 'discount_percent', 'count': 1,
+                                        'sample_ids': [7]}]
+
+
+class TestTransformerAnomalies:
+
+    @pytest.mark.asyncio
+    async def test_sales_detail_batch(self):
+        transformer = SalesDetailTransformer()
+        rows = [
+            {'id': 1, 'id_sortie': 1, 'id_produit': 2, 'id_nom': 3, 'prix_vente': '3.85', 'quantite': '2',
+             'total_ligne': '9.99', 'marge_pourcent': '135'},
+            {'id': 2, 'id_sortie': 1, 'id_produit': 2, 'id_nom': 3, 'prix_vente': '3.85', 'quantite': '0'},
+            {'id': 3, 'id_sortie': 1, 'id_produit': 2},
+        ]
+
+        transformed = await transformer.transform_batch(rows)
+
+        assert [record['hfsql_id'] for record in transformed] == [1]
+        assert transformer.anomalies.counts == {
+            ('above_max', 'margin_percent'): 1,
+            ('invalid_quantity', 'quantity_sold'): 1,
+            ('rejected_invalid', ''): 1,
+            ('rejected_missing_required', ''): 1,
+            ('calculation_mismatch', 'line_total'): 1,
+        }
+        assert transformer.anomalies.samples[('calculation_mismatch', 'line_total')] == [1]
+
+    @pytest.mark.asyncio
+    async def test_counter_is_reset_per_batch(self):
+        transformer = PurchaseOrderTransformer()
+
+        await transformer.transform_batch([{'id': 1, 'type': 'X'}])
+        assert transformer.anomalies.counts == {('invalid_order_type', 'order_type'): 1}
+
+        await transformer.transform_batch([{'id': 2, 'type': 'A'}])
+        assert not transformer.anomalies
+
+
+class TestPageAnomalies:
+
+    @pytest.mark.asyncio
+    async def test_pages_transformed_ahead_keep_their_own_anomalies(self):
+        from app.sync.pipeline import SyncPipeline
+        from app.sync.sync_manager import SynergoSyncManager
+
+        manager = SynergoSyncManager()
+        config = manager.sync_tables_config['purchase_orders']
+        transformer = config['transformer']()
+        pipeline = SyncPipeline(manager._get_transform(config, transformer, page_report=True), queue_size=2)
+
+        async def source():
+            yield [{'id': 1, 'type': 'X'}]
+            yield [{'id': 2, 'type': 'Y'}, {'id': 3, 'type': 'Z'}]
+            yield [{'id': 4, 'type': 'A'}]
+
+        reports = []
+        async for records, (transformed, anomalies, rejected) in pipeline.run(source()):
+            # Laisser le pipeline transformer les pages suivantes avant de « commiter » celle-ci
+            await asyncio.sleep(0.01)
+            reports.append((len(records), anomalies.counts))
+
+        assert reports == [
+            (1, {('invalid_order_type', 'order_type'): 1}),
+            (2, {('invalid_order_type', 'order_type'): 2}),
+            (1, {}),
+        ]
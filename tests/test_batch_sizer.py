@@ -0,0 +1,46 @@
+# tests/test_batch_sizer.py
+"""
+Tests du réglage adaptatif de la taille de lot
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.batch_sizer import AdaptiveBatchSizer
+
+
+class TestAdaptiveBatchSizer:
+
+    def test_grows_when_batches_are_faster_than_target(self):
+        sizer = AdaptiveBatchSizer(initial_size=500, target_seconds=2.0, max_size=100000)
+
+        # 0.1 ms par ligne: la cible de 2s correspond à 20000 lignes
+        for _ in range(10):
+            sizer.record(sizer.batch_size, sizer.batch_size * 0.0001)
+
+        assert sizer.batch_size == 20000
+
+    def test_shrinks_when_batches_are_slower_than_target(self):
+        sizer = AdaptiveBatchSizer(initial_size=5000, target_seconds=1.0)
+
+        # 2 ms par ligne: la cible de 1s correspond à 500 lignes
+        for _ in range(10):
+            sizer.record(sizer.batch_size, sizer.batch_size * 0.002)
+
+        assert sizer.batch_size == 500
+
+    def test_step_and_bounds_are_limited(self):
+        sizer = AdaptiveBatchSizer(initial_size=1000, min_size=200, max_size=3000, max_step_factor=2.0)
+
+        assert sizer.record(1000, 0.001) == 2000  # Pas maximum x2
+        assert sizer.record(2000, 0.001) == 3000  # Borne max
+        assert AdaptiveBatchSizer(initial_size=50, min_size=200).batch_size == 200
+
+    def test_ignores_empty_measurements(self):
+        sizer = AdaptiveBatchSizer(initial_size=1000)
+
+        assert sizer.record(0, 1.0) == 1000
+        assert sizer.record(100, 0) == 1000
+        assert sizer.batches_measured == 0
@@ -0,0 +1,165 @@
+# tests/test_bulk_loader.py
+"""
+Tests de la fusion PostgreSQL (requêtes générées, comptes par lot)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.core.config import settings
+from app.sync import bulk_loader
+from app.sync.bulk_loader import build_merge_query, copy_upsert, dedupe_records, values_upsert
+from app.sync.strategies import id_based_sync
+from app.sync.strategies.id_based_sync import IdBasedSyncStrategy
+from conftest import FakeSession
+
+
+class FakeAsyncpgConnection:
+    """Connexion asyncpg factice: enregistre les COPY"""
+
+    def __init__(self):
+        self.copies = []
+
+    async def copy_records_to_table(self, table_name, records, columns):
+        self.copies.append((table_name, list(records), list(columns)))
+
+
+class TestMergeQuery:
+
+    def test_update_is_guarded_by_changed_content(self):
+        query = build_merge_query('synergo_core', 'sales_details', ['hfsql_id', 'quantity', 'last_synced_at'],
+                                  ['quantity'], "VALUES (:hfsql_id_0, :quantity_0, :last_synced_at_0)")
+
+        assert "WHERE ROW(target.quantity) IS DISTINCT FROM ROW(EXCLUDED.quantity)" in query
+        assert "RETURNING (xmax = 0) AS inserted" in query
+
+    def test_dedupe_keeps_last_occurrence(self):
+        records = [{'hfsql_id': 1, 'quantity': 1}, {'hfsql_id': 2, 'quantity': 5}, {'hfsql_id': 1, 'quantity': 3}]
+
+        assert dedupe_records(records) == [{'hfsql_id': 1, 'quantity': 3}, {'hfsql_id': 2, 'quantity': 5}]
+
+
+class TestValuesUpsert:
+
+    @pytest.mark.asyncio
+    async def test_counts_unchanged_rows(self):
+        session = FakeSession([(2, 1)])
+        records = [{'hfsql_id': i, 'quantity': i} for i in range(1, 6)]
+
+        counts = await values_upsert(session, 'synergo_core', 'sales_details', records,
+                                     ['hfsql_id', 'quantity'], ['quantity'])
+
+        assert counts == {'inserted': 2, 'updated': 1, 'unchanged': 2}
+
+    @pytest.mark.asyncio
+    async def test_splits_under_parameter_limit(self, monkeypatch):
+        monkeypatch.setattr(bulk_loader, 'MAX_QUERY_PARAMETERS', 10)
+        session = FakeSession([(5, 0)])
+        records = [{'hfsql_id': i, 'quantity': i} for i in range(1, 13)]
+
+        await values_upsert(session, 'synergo_core', 'sales_details', records,
+                            ['hfsql_id', 'quantity'], ['quantity'])
+
+        assert [len(params) for query, params in session.executed] == [10, 10, 4]
+
+
+class TestCopyUpsert:
+
+    @pytest.mark.asyncio
+    async def test_copy_then_merge_from_staging_table(self, monkeypatch):
+        connection = FakeAsyncpgConnection()
+
+        async def asyncpg_connection(session):
+            return connection
+
+        monkeypatch.setattr(bulk_loader, 'get_asyncpg_connection', asyncpg_connection)
+        session = FakeSession([(3, 1)])
+        columns = ['hfsql_id', 'quantity', 'product_name']
+        records = [{'product_name': f'PRODUIT {i}', 'hfsql_id': i, 'quantity': i * 2} for i in range(1, 6)]
+
+        counts = await copy_upsert(session, 'synergo_core', 'sales_details', records, columns,
+                                   ['quantity', 'product_name'])
+
+        assert counts == {'inserted': 3, 'updated': 1, 'unchanged': 1}
+
+        # Tuples COPY dans l'ordre des colonnes déclarées, quel que soit l'ordre des clés
+        table_name, rows, copied_columns = connection.copies[0]
+        assert table_name == '_staging_sales_details'
+        assert copied_columns == columns
+        assert rows[0] == (1, 2, 'PRODUIT 1')
+
+        # Transit créé avant le COPY, fusion depuis le transit avec les mêmes colonnes
+        statements = [query for query, params in session.executed]
+        assert 'DROP TABLE IF EXISTS pg_temp._staging_sales_details' in statements[0]
+        assert 'CREATE TEMP TABLE _staging_sales_details ON COMMIT DROP' in statements[1]
+        assert 'SELECT hfsql_id, quantity, product_name FROM synergo_core.sales_details' in statements[1]
+        assert statements[2] == build_merge_query(
+            'synergo_core', 'sales_details', columns, ['quantity', 'product_name'],
+            'SELECT hfsql_id, quantity, product_name FROM _staging_sales_details')
+
+    @pytest.mark.asyncio
+    async def test_other_drivers_fall_back(self, monkeypatch):
+        async def no_asyncpg(session):
+            return None
+
+        monkeypatch.setattr(bulk_loader, 'get_asyncpg_connection', no_asyncpg)
+        session = FakeSession()
+
+        assert await copy_upsert(session, 'synergo_core', 'sales_details', [{'hfsql_id': 1}],
+                                 ['hfsql_id'], []) is None
+        assert session.executed == []
+
+
+class TestBulkLoaderSwitch:
+
+    @pytest.fixture
+    def loaders(self, monkeypatch):
+        calls = []
+
+        async def fake_copy_upsert(session, schema, table_name, records, columns, update_columns):
+            calls.append(('copy', len(records)))
+            return None if session == 'no-asyncpg' else {'inserted': len(records), 'updated': 0, 'unchanged': 0}
+
+        async def fake_values_upsert(session, schema, table_name, records, columns, update_columns):
+            calls.append(('values', len(records)))
+            return {'inserted': len(records), 'updated': 0, 'unchanged': 0}
+
+        monkeypatch.setattr(id_based_sync, 'copy_upsert', fake_copy_upsert)
+        monkeypatch.setattr(id_based_sync, 'values_upsert', fake_values_upsert)
+        monkeypatch.setattr(settings, 'SYNC_COPY_MIN_ROWS', 10)
+        return calls
+
+    @staticmethod
+    def strategy(bulk_loader_name):
+        return IdBasedSyncStrategy({'table_name': 'sales_details', 'hfsql_table': 'ventes_produits',
+                                    'schema': 'synergo_core', 'bulk_loader': bulk_loader_name}, None)
+
+    @staticmethod
+    def records(count):
+        return [{'hfsql_id': i, 'quantity': i} for i in range(1, count + 1)]
+
+    @pytest.mark.asyncio
+    async def test_large_batches_use_copy(self, loaders):
+        await self.strategy('copy').upsert_records(None, self.records(10))
+        assert loaders == [('copy', 10)]
+
+    @pytest.mark.asyncio
+    async def test_small_batches_use_values(self, loaders):
+        await self.strategy('copy').upsert_records(None, self.records(9))
+        assert loaders == [('values', 9)]
+
+    @pytest.mark.asyncio
+    async def test_insert_loader_never_copies(self, loaders):
+        await self.strategy('insert').upsert_records(None, self.records(50))
+        assert loaders == [('values', 50)]
+
+    @pytest.mark.asyncio
+    async def test_copy_unavailable_falls_back_to_values(self, loaders):
+        counts = await self.strategy('copy').upsert_records('no-asyncpg', self.records(20))
+
+        assert loaders == [('copy', 20), ('values', 20)]
+        assert counts['inserted'] == 20
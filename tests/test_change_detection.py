@@ -0,0 +1,60 @@
+# tests/test_change_detection.py
+"""
+Tests des empreintes de contenu (détection des lignes HFSQL modifiées)
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.change_detection import (
+    compute_content_hashes, select_changed_records, with_content_hashes
+)
+
+
+def make_rows():
+    return [
+        {'id': 1, 'nom': 'DOLIPRANE 1G', 'prix': 195.0, 'date': datetime(2024, 5, 1, 10, 30)},
+        {'id': 2, 'nom': 'SMECTA', 'prix': 320.5, 'date': None},
+    ]
+
+
+class TestContentHashes:
+
+    def test_hash_is_stable_and_fits_bigint(self):
+        first = compute_content_hashes(make_rows(), 'id')
+        second = compute_content_hashes(make_rows(), 'id')
+
+        assert first == second
+        assert all(-2 ** 63 <= value < 2 ** 63 for value in first.values())
+
+    def test_hash_ignores_column_order(self):
+        rows = make_rows()
+        reordered = [{key: row[key] for key in reversed(list(row))} for row in rows]
+
+        assert compute_content_hashes(rows, 'id') == compute_content_hashes(reordered, 'id')
+
+    def test_only_modified_or_missing_rows_are_selected(self):
+        rows = make_rows() + [{'id': 3, 'nom': 'VOGALENE', 'prix': 150.0, 'date': None}]
+        stored = compute_content_hashes(rows, 'id')
+        del stored[3]  # Jamais chargée en PostgreSQL
+
+        rows[0]['prix'] = 199.0  # Correction de prix dans HFSQL
+
+        changed = select_changed_records(rows, stored, 'id')
+        assert [row['id'] for row in changed] == [1, 3]
+
+    @pytest.mark.asyncio
+    async def test_transform_receives_hashes(self):
+        async def transform(records):
+            return [{'hfsql_id': record['id'], 'name': record['nom']} for record in records if record['id'] != 2]
+
+        rows = make_rows()
+        transformed = await with_content_hashes(transform, 'id')(rows)
+
+        assert transformed == [{'hfsql_id': 1, 'name': 'DOLIPRANE 1G',
+                                'content_hash': compute_content_hashes(rows, 'id')[1]}]
@@ -0,0 +1,85 @@
+# tests/test_change_watcher.py
+"""
+Tests du sondage MAX(id) (anti-rebond, plafond de fréquence)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.change_watcher import ChangeWatcher
+from app.sync.sync_manager import SyncResult
+
+
+class FakeManager:
+    sync_tables_config = {
+        'sales_details': {'hfsql_table': 'ventes_produits', 'id_field': 'id'},
+        'products_catalog': {'hfsql_table': 'nomenclature', 'id_field': 'id'},
+    }
+    persisted_ids = {'sales_details': 100, 'products_catalog': 50}
+
+    async def get_last_sync_ids(self):
+        return dict(self.persisted_ids)
+
+
+async def no_sync(table_names):
+    pass
+
+
+@pytest.fixture
+def watcher():
+    watcher = ChangeWatcher(FakeManager(), on_change=no_sync, poll_seconds=5,
+                            debounce_seconds=3, min_interval_seconds=30)
+    watcher.known_ids = {'sales_details': 100, 'products_catalog': 50}
+    return watcher
+
+
+class TestChangeWatcher:
+
+    def test_unchanged_tables_are_not_triggered(self, watcher):
+        assert watcher.select_changed_tables({'sales_details': 100, 'products_catalog': 50}, now=0) == []
+
+    def test_trigger_waits_for_stable_max_id(self, watcher):
+        assert watcher.select_changed_tables({'sales_details': 110, 'products_catalog': 50}, now=0) == []
+        assert watcher.select_changed_tables({'sales_details': 120, 'products_catalog': 50}, now=5) == []
+        assert watcher.select_changed_tables({'sales_details': 120, 'products_catalog': 50}, now=10) == ['sales_details']
+        assert watcher.known_ids['sales_details'] == 120
+
+    def test_continuous_inserts_trigger_after_min_interval(self, watcher):
+        triggered = []
+        for step in range(8):
+            triggered += watcher.select_changed_tables({'sales_details': 101 + step, 'products_catalog': 50},
+                                                       now=step * 5)
+
+        assert triggered == ['sales_details']  # À 30s malgré le flux continu
+
+    def test_trigger_frequency_is_capped(self, watcher):
+        watcher.select_changed_tables({'sales_details': 110, 'products_catalog': 50}, now=0)
+        assert watcher.select_changed_tables({'sales_details': 110, 'products_catalog': 50}, now=5) == ['sales_details']
+
+        watcher.select_changed_tables({'sales_details': 130, 'products_catalog': 50}, now=10)
+        assert watcher.select_changed_tables({'sales_details': 130, 'products_catalog': 50}, now=15) == []
+        assert watcher.select_changed_tables({'sales_details': 130, 'products_catalog': 50}, now=35) == ['sales_details']
+
+    def test_failed_sync_restores_known_id(self, watcher):
+        watcher.select_changed_tables({'sales_details': 110, 'products_catalog': 50}, now=0)
+        watcher.select_changed_tables({'sales_details': 110, 'products_catalog': 50}, now=5)
+
+        watcher.record_results([SyncResult('sales_details', 'ERROR', last_sync_id=104)])
+
+        assert watcher.known_ids['sales_details'] == 104
+
+    @pytest.mark.asyncio
+    async def test_sync_exception_reloads_persisted_id(self, watcher):
+        watcher.select_changed_tables({'sales_details': 110, 'products_catalog': 50}, now=0)
+        assert watcher.select_changed_tables({'sales_details': 110, 'products_catalog': 50}, now=5) == ['sales_details']
+
+        # Exception dans sync_single_table (timeout HFSQL): aucun checkpoint dans le résultat
+        watcher.record_results([SyncResult('sales_details', 'ERROR', error_message='Timeout expired')])
+        await watcher.refresh_stale_ids()
+
+        assert watcher.known_ids['sales_details'] == 100
+        assert watcher.select_changed_tables({'sales_details': 110, 'products_catalog': 50}, now=40) == ['sales_details']
@@ -0,0 +1,61 @@
+# tests/test_datetime_parsing.py
+"""
+Tests de la conversion des dates et heures HFSQL par colonne
+"""
+import sys
+from datetime import date, datetime, time
+from pathlib import Path
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.transformers.datetime_parsing import date_column_parser, time_column_parser, parse_time_flexible
+from app.sync.transformers import SalesOrderTransformer
+
+
+class TestColumnParser:
+
+    def test_format_is_sniffed_from_first_values(self):
+        parser = date_column_parser()
+
+        assert parser.sniff_column([{'date': '10/12/2024'}, {'date': None}, {'date': '11/12/2024'}], 'date') == 'french'
+        assert parser('25/12/2024') == date(2024, 12, 25)
+        assert parser.fallbacks == 0
+
+    def test_native_values_win_ties(self):
+        parser = date_column_parser()
+
+        assert parser.sniff([date(2024, 1, 2), datetime(2024, 1, 3, 10, 0)]) == 'native'
+        assert parser(datetime(2024, 1, 3, 10, 0)) == date(2024, 1, 3)
+
+    def test_unexpected_format_falls_back_and_is_cached(self):
+        parser = date_column_parser()
+        parser.sniff(['20241210'])
+
+        assert parser('2024-12-11') == date(2024, 12, 11)
+        assert parser('2024-12-11') == date(2024, 12, 11)
+        assert parser.fallbacks == 1
+
+    def test_empty_or_invalid_values(self):
+        parser = date_column_parser()
+
+        assert parser('') is None
+        assert parser('20241340') is None
+
+    def test_times(self):
+        parser = time_column_parser()
+        parser.sniff(['143000'])
+
+        assert parser('090500') == time(9, 5, 0)
+        assert parser('14:30') == time(14, 30)
+        assert parse_time_flexible('2024-12-10T14:30:00') == time(14, 30)
+
+
+class TestSalesOrderDates:
+
+    def test_defaults_for_missing_values(self):
+        transformer = SalesOrderTransformer()
+
+        assert transformer._convert_date_flexible(None) == date.today()
+        assert transformer._convert_time_flexible('nope') == time(0, 0, 0)
+        assert transformer._convert_date_flexible('20241210') == date(2024, 12, 10)
@@ -0,0 +1,158 @@
+# tests/test_dead_letter.py
+"""
+Tests de la file des rejets et de leur relance
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.sync_manager import SynergoSyncManager
+from app.sync.strategies.id_based_sync import IdBasedSyncStrategy
+from app.sync.transformers import ProductTransformer
+from conftest import FakeSession
+
+
+class FakeDeadLetterStore:
+    """File des rejets en mémoire"""
+
+    def __init__(self, pending=None):
+        self.added = []
+        self.pending = pending or []
+        self.resolved = []
+        self.failed = []
+
+    async def add(self, session, table_name, stage, rejected, id_field='id'):
+        rows = [(stage, record.get(id_field), reason) for record, reason in rejected]
+        session.pending.append(lambda: self.added.extend(rows))
+        return len(rejected)
+
+    async def fetch_pending(self, session, table_name, after_id, limit):
+        return [letter for letter in self.pending if letter['id'] > after_id][:limit]
+
+    async def mark_resolved(self, session, letter_ids):
+        self.resolved.extend(letter_ids)
+
+    async def mark_failed(self, session, failures):
+        self.failed.extend(failures)
+
+
+@pytest.fixture
+def table_sync(make_table_sync):
+    """products_catalog avec file des rejets, par pages de 2"""
+    manager = make_table_sync(batch_size=2)
+    manager.dead_letters = FakeDeadLetterStore()
+    return manager
+
+
+class TestTransformerRejects:
+
+    @pytest.mark.asyncio
+    async def test_rejected_rows_are_kept_raw_with_reason(self):
+        transformer = ProductTransformer()
+        rows = [{'id': 1, 'nom': 'DOLIPRANE'}, {'id': 2}, {'id': None, 'nom': 'SANS ID'}]
+
+        transformed = await transformer.transform_batch(rows)
+
+        assert [record['hfsql_id'] for record in transformed] == [1]
+        assert [(record['id'], reason) for record, reason in transformer.rejected] == [
+            (2, 'rejected_missing_required'), (None, 'rejected_missing_required')]
+        assert transformer.rejected[0][0] is rows[1]
+
+        await transformer.transform_batch([{'id': 3, 'nom': 'SPASFON'}])
+        assert transformer.rejected == []
+
+
+class TestSaveDeadLetters:
+
+    @pytest.mark.asyncio
+    async def test_transform_and_insert_rejects(self):
+        manager = SynergoSyncManager()
+        manager.dead_letters = FakeDeadLetterStore()
+        config = manager.sync_tables_config['products_catalog']
+        strategy = IdBasedSyncStrategy(config, None)
+
+        raw_rows = [{'id': 1, 'nom': 'A'}, {'id': 2}, {'id': 3, 'nom': 'C'}]
+        rejected = [(raw_rows[1], 'rejected_missing_required')]
+        strategy.rejected = [({'hfsql_id': 3, 'name': 'C'}, 'insert_invalid')]
+
+        session = FakeSession()
+        count = await manager._save_dead_letters(session, config, strategy, rejected, raw_rows)
+        await session.commit()
+
+        assert count == 2
+        assert manager.dead_letters.added == [('TRANSFORM', 2, 'rejected_missing_required'),
+                                              ('INSERT', 3, 'insert_invalid')]
+        assert strategy.rejected == []
+
+
+class TestFullyRejectedPage:
+
+    @pytest.mark.asyncio
+    async def test_page_is_dead_lettered_and_checkpointed(self, table_sync):
+        table_sync.hfsql_rows = [{'id': 1}, {'id': 2}, {'id': 3, 'nom': 'SPASFON'}]
+
+        result = await table_sync.sync_single_table(table_sync.table_config)
+
+        assert result.status == 'SUCCESS'
+        assert result.dead_letters == 2
+        assert table_sync.state['last_sync_id'] == 3
+        assert table_sync.loaded == [3]
+        assert [hfsql_id for _, hfsql_id, _ in table_sync.dead_letters.added] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_single_bad_row_does_not_stall_the_table(self, table_sync):
+        table_sync.hfsql_rows = [{'id': 1}]
+
+        result = await table_sync.sync_single_table(table_sync.table_config)
+        assert result.status == 'SUCCESS'
+        assert table_sync.state['last_sync_id'] == 1
+
+        table_sync.hfsql_rows.append({'id': 2, 'nom': 'DOLIPRANE'})
+        result = await table_sync.sync_single_table(table_sync.table_config)
+        assert result.status == 'SUCCESS'
+        assert table_sync.loaded == [2]
+
+    @pytest.mark.asyncio
+    async def test_without_dead_letters_the_page_is_an_error(self, table_sync):
+        table_sync.dead_letters = None
+        table_sync.hfsql_rows = [{'id': 1}, {'id': 2}]
+
+        result = await table_sync.sync_single_table(table_sync.table_config)
+
+        assert result.status == 'ERROR'
+        assert table_sync.state['last_sync_id'] == 0
+
+
+class TestRetryDeadLetters:
+
+    @pytest.mark.asyncio
+    async def test_retry_resolves_fixed_and_existing_rows(self, monkeypatch, fake_sessions):
+        manager = SynergoSyncManager()
+        manager.dead_letters = FakeDeadLetterStore(pending=[
+            {'id': 10, 'hfsql_id': 1, 'raw_data': {'id': 1, 'nom': 'DOLIPRANE'}},
+            {'id': 11, 'hfsql_id': 2, 'raw_data': {'id': 2}},
+            {'id': 12, 'hfsql_id': 3, 'raw_data': {'id': 3, 'nom': 'SPASFON'}},
+        ])
+        upserted = []
+
+        async def get_existing_ids(self, session, hfsql_ids):
+            return {3}
+
+        async def upsert_records(self, session, records):
+            upserted.extend(record['hfsql_id'] for record in records)
+            return {'inserted': len(records), 'updated': 0, 'unchanged': 0}
+
+        monkeypatch.setattr(IdBasedSyncStrategy, 'get_existing_ids', get_existing_ids)
+        monkeypatch.setattr(IdBasedSyncStrategy, 'upsert_records', upsert_records)
+
+        result = await manager.retry_dead_letters('products_catalog', batch_size=2)
+
+        assert (result['retried'], result['resolved'], result['failed']) == (3, 2, 1)
+        # La ligne déjà présente en PostgreSQL n'est pas réécrite
+        assert upserted == [1]
+        assert sorted(manager.dead_letters.resolved) == [10, 12]
+        assert manager.dead_letters.failed == [(11, 'rejected_missing_required')]
@@ -0,0 +1,89 @@
+# tests/test_field_spec.py
+"""
+Tests de la spécification déclarative des champs des transformateurs
+"""
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.transformers.field_spec import FieldSpec, compile_field_specs, to_int, to_decimal, clean_string
+from app.sync.transformers import SalesDetailTransformer, PurchaseDetailTransformer
+
+
+class TestConverters:
+
+    def test_to_int(self):
+        assert to_int(' 12 ') == 12
+        assert to_int(3.6) == 4
+        assert to_int(float('nan')) == 0
+        assert to_int(Decimal('7')) == 7
+        assert to_int(None) == 0
+
+    def test_to_decimal_precision_and_max(self):
+        assert to_decimal('3,85674', precision=4) == 3.8567
+        assert to_decimal('120.5', precision=2, max_value=100.0) == 100.0
+        assert to_decimal(Decimal('2.50')) == 2.5
+        assert to_decimal('') == 0.0
+
+    def test_clean_string(self):
+        assert clean_string(' A\x01B ') == 'AB'
+        assert clean_string('x' * 300) == 'x' * 255
+        assert clean_string(None) == ''
+
+
+class TestCompiledSpecs:
+
+    def test_only_present_fields_are_converted(self):
+        convert = compile_field_specs([
+            FieldSpec('id', 'hfsql_id', 'int', required=True),
+            FieldSpec('prix', 'price', 'decimal', precision=2),
+            FieldSpec('nom', 'name', 'str', convert=str.upper),
+            FieldSpec('type', 'kind', default='A'),
+        ])
+
+        assert convert({'id': '5', 'nom': ' doliprane '}) == {'hfsql_id': 5, 'name': 'DOLIPRANE', 'kind': 'A'}
+
+    def test_missing_required_field_rejects_record(self):
+        convert = compile_field_specs([FieldSpec('id', 'hfsql_id', 'int', required=True)])
+
+        assert convert({'nom': 'x'}) is None
+        assert convert({'id': None}) is None
+
+    def test_unknown_type_is_rejected(self):
+        with pytest.raises(ValueError):
+            compile_field_specs([FieldSpec('id', 'hfsql_id', 'uuid')])
+
+
+class TestTransformers:
+
+    @pytest.mark.asyncio
+    async def test_sales_detail_record(self):
+        transformed = await SalesDetailTransformer().transform_single_record({
+            'id': 2001, 'id_sortie': '12345', 'id_produit': 456, 'id_nom': 123, 'prix_vente': '3.85674',
+            'quantite': '2', 'prix_achat': '2.5000', 'type_vente': ' cnac ', 'taux_couverture': '120'
+        })
+
+        assert transformed['sales_order_hfsql_id'] == 12345
+        assert transformed['sale_price'] == 3.8567
+        assert transformed['sale_type'] == 'CHIFA'
+        assert transformed['insurance_coverage'] == 100.0
+        assert transformed['line_total'] == Decimal('7.71')
+
+    @pytest.mark.asyncio
+    async def test_purchase_detail_nullable_foreign_keys(self):
+        transformed = await PurchaseDetailTransformer().transform_single_record({
+            'id': 1, 'id_produit': 123, 'id_entree': '', 'type_entree': 'retour'
+        })
+
+        assert transformed['product_hfsql_id'] == 123
+        assert transformed['purchase_order_hfsql_id'] is None
+        assert transformed['supplier_hfsql_id'] is None
+        assert transformed['entry_type'] == 'R'
+
+    def test_source_fields_follow_specs(self):
+        assert PurchaseDetailTransformer().get_source_fields()[:2] == ['id', 'id_produit']
@@ -0,0 +1,74 @@
+# tests/test_hfsql_executor.py
+"""
+Tests de l'exécuteur dédié aux appels HFSQL bloquants
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.utils.hfsql_executor import BlockingIOExecutor
+
+
+def slow_fake_hfsql_query(duration: float):
+    """Simule un Recordset.Open/GetRows bloquant côté pilote"""
+    time.sleep(duration)
+    return [{'id': 1}]
+
+
+class TestBlockingIOExecutor:
+    """Les appels pilote ne doivent jamais geler la boucle asyncio"""
+
+    @pytest.mark.asyncio
+    async def test_api_latency_stays_low_during_slow_query(self):
+        executor = BlockingIOExecutor(max_workers=1, thread_name_prefix='test-hfsql')
+        app = FastAPI()
+
+        @app.get("/health")
+        async def health():
+            return {"status": "healthy"}
+
+        try:
+            slow_query = asyncio.create_task(executor.run(slow_fake_hfsql_query, 1.0))
+            await asyncio.sleep(0.05)  # La requête lente est en cours
+
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                latencies = []
+                for _ in range(5):
+                    start = time.perf_counter()
+                    response = await client.get("/health")
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200
+
+            assert not slow_query.done(), "La requête lente devrait encore être en cours"
+            assert max(latencies) < 0.2, f"Latence API trop élevée: {max(latencies):.3f}s"
+            assert await slow_query == [{'id': 1}]
+        finally:
+            executor.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_single_worker_runs_every_call_on_one_initialized_thread(self):
+        initialized = []
+        finalized = []
+        executor = BlockingIOExecutor(
+            max_workers=1,
+            thread_name_prefix='test-com',
+            initializer=lambda: initialized.append(threading.get_ident()),
+            finalizer=lambda: finalized.append(threading.get_ident())
+        )
+
+        thread_ids = [await executor.run(threading.get_ident) for _ in range(10)]
+        executor.shutdown(wait=True)
+
+        assert len(set(thread_ids)) == 1
+        assert initialized == [thread_ids[0]]
+        assert finalized == [thread_ids[0]]
+        assert thread_ids[0] != threading.get_ident()
@@ -0,0 +1,145 @@
+# tests/test_hfsql_pool.py
+"""
+Tests du pool de connexions HFSQL
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.utils.hfsql_pool import HFSQLConnectionPool, is_connection_error
+
+
+class FakeConnector:
+    """Connecteur HFSQL factice comptant connexions et requêtes"""
+
+    instances = []
+    connect_delay = 0
+
+    def __init__(self):
+        self.is_connected = False
+        self.queries = []
+        self.closed = False
+        self.fail_ping = False
+        FakeConnector.instances.append(self)
+
+    async def connect(self) -> bool:
+        await asyncio.sleep(self.connect_delay)
+        self.is_connected = True
+        return True
+
+    async def execute_query(self, query):
+        self.queries.append(query)
+        if self.fail_ping or query == 'FAIL':
+            # Comme les vrais connecteurs: erreur de connexion → marqué déconnecté
+            error = Exception("Provider error: connection lost")
+            if is_connection_error(error):
+                self.is_connected = False
+            raise error
+        return [{'id': 1}]
+
+    def close(self):
+        self.closed = True
+        self.is_connected = False
+
+
+@pytest.fixture(autouse=True)
+def reset_instances():
+    FakeConnector.instances = []
+
+
+class TestHFSQLConnectionPool:
+
+    @pytest.mark.asyncio
+    async def test_connection_is_reused_between_checkouts(self):
+        pool = HFSQLConnectionPool(FakeConnector, max_size=2, ping_interval=0)
+
+        for _ in range(5):
+            async with pool.acquire() as connector:
+                await connector.execute_query("SELECT 1")
+
+        metrics = pool.get_metrics()
+        assert len(FakeConnector.instances) == 1
+        assert metrics['created'] == 1
+        assert metrics['checkouts'] == 5
+        # Ping avant chaque réutilisation (ping_interval=0)
+        assert FakeConnector.instances[0].queries.count(pool.ping_query) == 4
+
+    @pytest.mark.asyncio
+    async def test_checkout_waits_when_pool_is_full(self):
+        pool = HFSQLConnectionPool(FakeConnector, max_size=1)
+
+        async def hold():
+            async with pool.acquire():
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(hold(), hold(), hold())
+
+        metrics = pool.get_metrics()
+        assert len(FakeConnector.instances) == 1
+        assert metrics['waits'] == 2
+        assert metrics['wait_time_ms_max'] >= 40
+
+    @pytest.mark.asyncio
+    async def test_connection_error_evicts_connector(self):
+        pool = HFSQLConnectionPool(FakeConnector, max_size=1)
+
+        with pytest.raises(Exception):
+            async with pool.acquire() as connector:
+                await connector.execute_query('FAIL')
+
+        async with pool.acquire() as connector:
+            assert connector is FakeConnector.instances[1]
+
+        assert FakeConnector.instances[0].closed
+        assert pool.get_metrics()['evictions'] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_ping_replaces_connector(self):
+        pool = HFSQLConnectionPool(FakeConnector, max_size=1, ping_interval=0)
+
+        async with pool.acquire() as connector:
+            connector.fail_ping = True
+
+        async with pool.acquire() as connector:
+            assert connector is FakeConnector.instances[1]
+
+        metrics = pool.get_metrics()
+        assert metrics['ping_failures'] == 1
+        assert metrics['evictions'] == 1
+        assert metrics['size'] == 1
+
+    @pytest.mark.asyncio
+    async def test_other_errors_keep_the_connector(self):
+        """Une erreur PostgreSQL dans le bloc emprunteur n'évince pas la connexion HFSQL"""
+        pool = HFSQLConnectionPool(FakeConnector, max_size=1)
+
+        with pytest.raises(Exception):
+            async with pool.acquire():
+                raise Exception("connection was closed in the middle of operation")
+
+        async with pool.acquire() as connector:
+            assert connector is FakeConnector.instances[0]
+
+        assert pool.get_metrics()['evictions'] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_connect_releases_its_slot(self):
+        pool = HFSQLConnectionPool(FakeConnector, max_size=1)
+        FakeConnector.connect_delay = 1
+        try:
+            task = asyncio.create_task(pool.acquire().__aenter__())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            FakeConnector.connect_delay = 0
+
+        assert pool.get_metrics()['size'] == 0
+        async with pool.acquire() as connector:
+            assert connector.is_connected
@@ -0,0 +1,185 @@
+# tests/test_initial_load.py
+"""
+Tests du chargement initial par partitions (planification, reprise, restart)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.sync_manager import SynergoSyncManager
+from conftest import FakeResult, FakeSession, product_rows
+
+TABLE = 'products_catalog'
+
+
+class FakeDatabase:
+    """sync_state et sync_partitions d'une table"""
+
+    def __init__(self):
+        self.state = {'last_sync_id': 0, 'total_records': 0, 'last_sync_status': 'SUCCESS'}
+        self.partitions = {}
+
+    def copy(self):
+        clone = FakeDatabase()
+        clone.state = dict(self.state)
+        clone.partitions = {index: dict(partition) for index, partition in self.partitions.items()}
+        return clone
+
+
+class DatabaseSession(FakeSession):
+    """Transaction: écritures vues par la session, publiées au commit, perdues sinon"""
+
+    def __init__(self, database):
+        super().__init__()
+        self.database = database
+        self.writes = []
+
+    def _view(self):
+        view = self.database.copy()
+        for apply in self.writes:
+            apply(view)
+        return view
+
+    async def execute(self, query, params=None):
+        sql = ' '.join(str(query).split())
+        params = dict(params or {})
+        params.pop('table_name', None)
+
+        if sql.startswith('DELETE FROM synergo_sync.sync_partitions'):
+            self.writes.append(lambda db: db.partitions.clear())
+        elif sql.startswith('INSERT INTO synergo_sync.sync_partitions'):
+            row = {**params, 'records_loaded': 0, 'status': 'PENDING', 'error_message': None}
+            self.writes.append(lambda db: db.partitions.__setitem__(row['partition_index'], dict(row)))
+        elif sql.startswith('UPDATE synergo_sync.sync_partitions'):
+            index = params.pop('partition_index')
+            self.writes.append(lambda db: db.partitions[index].update(params))
+        elif sql.startswith('UPDATE synergo_sync.sync_state'):
+            self.writes.append(lambda db: db.state.update(params))
+        elif 'SUM(records_loaded)' in sql:
+            return FakeResult([(sum(p['records_loaded'] for p in self._view().partitions.values()),)])
+        elif 'FROM synergo_sync.sync_partitions' in sql:
+            partitions = self._view().partitions
+            return FakeResult([
+                (p['partition_index'], p['range_start'], p['range_end'], p['last_loaded_id'],
+                 p['records_loaded'], p['status'], p['error_message'])
+                for _, p in sorted(partitions.items())
+            ])
+        elif 'FROM synergo_sync.sync_state' in sql:
+            state = self._view().state
+            return FakeResult([(state['last_sync_id'], None, state['total_records'], state['last_sync_status'],
+                                None, None)])
+        else:
+            raise AssertionError(f"Requête inattendue: {sql[:80]}")
+        return FakeResult([])
+
+    async def commit(self):
+        for apply in self.writes:
+            apply(self.database)
+        self.writes = []
+        await super().commit()
+
+
+@pytest.fixture
+def loader(fake_sessions, in_memory_hfsql):
+    """Manager chargeant products_catalog depuis 100 lignes HFSQL en mémoire"""
+    manager = in_memory_hfsql(SynergoSyncManager(), product_rows(1, 100), pool_size=4)
+    manager.database = FakeDatabase()
+    manager.config = {**manager.sync_tables_config[TABLE], 'batch_size': 10}
+    manager.sync_tables_config[TABLE] = manager.config
+    fake_sessions.factory = lambda: DatabaseSession(manager.database)
+    return manager
+
+
+class TestInitialLoad:
+
+    @pytest.mark.asyncio
+    async def test_planned_partitions_are_loaded_and_promoted(self, loader):
+        result = await loader.initial_load_table(TABLE, partitions=4)
+
+        partitions = loader.database.partitions
+        assert result.status == 'SUCCESS'
+        assert [(p['range_start'], p['range_end']) for p in partitions.values()] == [
+            (1, 25), (26, 50), (51, 75), (76, 100)]
+        assert all(p['status'] == 'COMPLETED' for p in partitions.values())
+        assert sorted(loader.loaded) == list(range(1, 101))
+        assert loader.database.state['last_sync_id'] == 100
+        assert loader.database.state['last_sync_status'] == 'SUCCESS'
+        assert loader.database.state['total_records'] == 100
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_then_resume(self, loader):
+        loader.fail_ids = {65}
+
+        result = await loader.initial_load_table(TABLE, partitions=4)
+
+        partitions = loader.database.partitions
+        assert result.status == 'ERROR'
+        assert partitions[2]['status'] == 'ERROR'
+        assert partitions[2]['last_loaded_id'] == 60  # Pages commitées de la partition conservées
+        assert [partitions[i]['status'] for i in (0, 1, 3)] == ['COMPLETED'] * 3
+        # Sync incrémentale suspendue tant que le chargement n'est pas terminé
+        assert loader.database.state['last_sync_status'] == 'INITIAL_LOAD'
+        assert loader.database.state['last_sync_id'] == 0
+
+        checkouts = loader.hfsql_pool.checkouts
+        guarded = await loader.sync_single_table(loader.config)
+        assert guarded.status == 'NO_CHANGES'
+        assert loader.hfsql_pool.checkouts == checkouts
+
+        # Lignes arrivées après la planification: laissées à la sync incrémentale
+        loader.hfsql_rows += product_rows(101, 110)
+        loaded_before = len(loader.loaded)
+
+        result = await loader.initial_load_table(TABLE)
+
+        assert result.status == 'SUCCESS'
+        assert sorted(loader.loaded[loaded_before:]) == list(range(61, 76))
+        assert sorted(loader.loaded) == list(range(1, 101))
+        assert loader.database.state['last_sync_id'] == 100
+        assert loader.database.state['last_sync_status'] == 'SUCCESS'
+
+    @pytest.mark.asyncio
+    async def test_restart_replans_from_scratch(self, loader):
+        await loader.initial_load_table(TABLE, partitions=4)
+        loader.hfsql_rows += product_rows(101, 120)
+
+        result = await loader.initial_load_table(TABLE, partitions=2, restart=True)
+
+        partitions = loader.database.partitions
+        assert result.status == 'SUCCESS'
+        assert [(p['range_start'], p['range_end']) for p in partitions.values()] == [(1, 60), (61, 120)]
+        assert loader.loaded.count(1) == 2  # Tout rechargé
+        assert loader.database.state['last_sync_id'] == 120
+
+    @pytest.mark.asyncio
+    async def test_rerun_after_completion_keeps_the_checkpoint(self, loader):
+        await loader.initial_load_table(TABLE, partitions=4)
+
+        # La sync incrémentale a avancé depuis la fin du chargement
+        loader.database.state.update({'last_sync_id': 150, 'total_records': 150})
+        loaded_before = len(loader.loaded)
+
+        result = await loader.initial_load_table(TABLE)
+
+        assert result.status == 'NO_CHANGES'
+        assert result.last_sync_id == 150
+        assert loader.database.state['last_sync_id'] == 150
+        assert loader.database.state['total_records'] == 150
+        assert len(loader.loaded) == loaded_before
+
+    @pytest.mark.asyncio
+    async def test_completed_but_unpromoted_load_is_promoted(self, loader):
+        await loader.initial_load_table(TABLE, partitions=4)
+
+        # Interruption entre la fin des partitions et la bascule vers l'incrémental
+        loader.database.state.update({'last_sync_id': 0, 'last_sync_status': 'INITIAL_LOAD'})
+
+        result = await loader.initial_load_table(TABLE)
+
+        assert result.status == 'SUCCESS'
+        assert loader.database.state['last_sync_id'] == 100
+        assert loader.database.state['last_sync_status'] == 'SUCCESS'
@@ -0,0 +1,106 @@
+# tests/test_reconciliation.py
+"""
+Tests de la réconciliation HFSQL ↔ PostgreSQL par plages d'ID
+"""
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.reconciliation import RangeReconciler, split_range, FINGERPRINT_PRIME
+
+
+def fingerprint(ids):
+    """Mêmes agrégats que les requêtes d'empreinte"""
+    return (len(ids), sum(ids), min(ids, default=0), max(ids, default=0),
+            sum((i % FINGERPRINT_PRIME) ** 2 for i in ids))
+
+
+class FakeHFSQL:
+    """Table HFSQL factice: répond aux requêtes d'empreinte et liste d'IDs par plage"""
+
+    def __init__(self, ids):
+        self.ids = set(ids)
+
+    async def execute_query(self, query):
+        start, end = map(int, re.search(r'>= (\d+) AND id <= (\d+)', query).groups())
+        ids = [i for i in self.ids if start <= i <= end]
+        if 'COUNT(*)' in query:
+            return [dict(zip(('row_count', 'id_sum', 'min_id', 'max_id', 'square_sum'), fingerprint(ids)))]
+        return [{'id': i} for i in ids]
+
+
+class InMemoryReconciler(RangeReconciler):
+    """Côté PostgreSQL remplacé par un ensemble d'IDs"""
+
+    def __init__(self, hfsql_ids, postgres_ids, **kwargs):
+        super().__init__(FakeHFSQL(hfsql_ids), 'ventes_produits', 'id', 'synergo_core', 'sales_details', **kwargs)
+        self.postgres_ids = set(postgres_ids)
+
+    async def summarize_postgres(self, session, ranges):
+        self.postgres_queries += 1
+        return [fingerprint([i for i in self.postgres_ids if start <= i <= end]) for start, end in ranges]
+
+    async def list_postgres_ids(self, session, range_start, range_end):
+        self.postgres_queries += 1
+        return {i for i in self.postgres_ids if range_start <= i <= range_end}
+
+
+class TestSplitRange:
+
+    def test_ranges_cover_interval_without_overlap(self):
+        ranges = split_range(1, 100, 16)
+
+        assert ranges[0][0] == 1 and ranges[-1][1] == 100
+        assert all(previous[1] + 1 == current[0] for previous, current in zip(ranges, ranges[1:]))
+        assert len(ranges) <= 16
+
+
+class TestRangeReconciler:
+
+    @pytest.mark.asyncio
+    async def test_identical_tables_cost_one_query_per_side(self):
+        ids = range(1, 1_000_001)
+        reconciler = InMemoryReconciler(ids, ids)
+
+        result = await reconciler.reconcile(None, 1, 1_000_000)
+
+        assert result['missing_ids'] == [] and result['extra_ids'] == []
+        assert result['hfsql_queries'] == 1
+
+    @pytest.mark.asyncio
+    async def test_holes_and_deletes_are_located(self):
+        hfsql_ids = set(range(1, 200_001)) - {150_000}  # Supprimée dans HFSQL
+        postgres_ids = set(range(1, 200_001)) - {42, 99_999}  # Jamais chargées
+
+        reconciler = InMemoryReconciler(hfsql_ids, postgres_ids, fanout=16, leaf_size=1000)
+        result = await reconciler.reconcile(None, 1, 200_000)
+
+        assert result['missing_ids'] == [42, 99_999]
+        assert result['extra_ids'] == [150_000]
+        assert result['hfsql_count'] - result['postgres_count'] == 1
+        assert result['hfsql_queries'] < 200
+
+    @pytest.mark.asyncio
+    async def test_offsetting_delete_and_hole_are_located(self):
+        """{2, 4} et {1, 5}: même nombre et même somme d'IDs"""
+        reconciler = InMemoryReconciler({2, 4}, {1, 5}, leaf_size=1)
+        result = await reconciler.reconcile(None, 1, 1000)
+
+        assert result['missing_ids'] == [2, 4]
+        assert result['extra_ids'] == [1, 5]
+
+    @pytest.mark.asyncio
+    async def test_collision_with_same_bounds_is_located(self):
+        """Mêmes nombre, somme, MIN et MAX: seule la somme des carrés diffère"""
+        hfsql_ids = {1, 4, 6, 9}
+        postgres_ids = {1, 3, 7, 9}
+        reconciler = InMemoryReconciler(hfsql_ids, postgres_ids, leaf_size=1000)
+        result = await reconciler.reconcile(None, 1, 100)
+
+        assert result['missing_ids'] == [4, 6]
+        assert result['extra_ids'] == [3, 7]
@@ -0,0 +1,138 @@
+# tests/test_recordset_reader.py
+"""
+Tests de la lecture en bloc GetRows contre un faux recordset ADO
+"""
+import datetime as dt
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.utils.recordset_reader import (fetch_rows_bulk, fetch_rows_by_row, iter_row_chunks,
+                                        build_odbc_converters, rows_to_dicts)
+
+
+class FakeField:
+    def __init__(self, recordset, index):
+        self._recordset = recordset
+        self._index = index
+
+    @property
+    def Name(self):
+        return self._recordset.field_names[self._index]
+
+    @property
+    def Value(self):
+        return self._recordset.rows[self._recordset.position][self._index]
+
+    @property
+    def Type(self):
+        if self._recordset.field_types is None:
+            raise AttributeError('Type')
+        return self._recordset.field_types[self._index]
+
+
+class FakeFields:
+    def __init__(self, recordset):
+        self._recordset = recordset
+
+    @property
+    def Count(self):
+        return len(self._recordset.field_names)
+
+    def __getitem__(self, index):
+        return FakeField(self._recordset, index)
+
+
+class FakeRecordset:
+    """Même surface que ADODB.Recordset pour GetRows / Fields / EOF / MoveNext"""
+
+    def __init__(self, field_names, rows, field_types=None):
+        self.field_names = field_names
+        self.rows = rows
+        self.field_types = field_types  # Codes DataTypeEnum ADO (None = inconnus)
+        self.position = 0
+        self.getrows_calls = 0
+        self.Fields = FakeFields(self)
+
+    @property
+    def EOF(self):
+        return self.position >= len(self.rows)
+
+    def MoveNext(self):
+        self.position += 1
+
+    def GetRows(self, rows=-1):
+        self.getrows_calls += 1
+        end = len(self.rows) if rows < 0 else min(self.position + rows, len(self.rows))
+        chunk = self.rows[self.position:end]
+        self.position = end
+        # ADO renvoie un tableau [champ][ligne]
+        return tuple(tuple(row[i] for row in chunk) for i in range(len(self.field_names)))
+
+
+def make_recordset(count):
+    rows = [(i, f' PRODUIT {i} ', float(i) * 1.5, None) for i in range(1, count + 1)]
+    return FakeRecordset(['id', 'nom', 'prix', 'notes'], rows)
+
+
+class TestRecordsetReader:
+    """Lecture GetRows vs lecture ligne par ligne"""
+
+    def test_bulk_matches_row_by_row(self):
+        assert fetch_rows_bulk(make_recordset(1234)) == fetch_rows_by_row(make_recordset(1234))
+
+    def test_bulk_uses_one_getrows_call_per_chunk(self):
+        recordset = make_recordset(1234)
+        rows = fetch_rows_bulk(recordset, chunk_size=500)
+
+        assert len(rows) == 1234
+        assert recordset.getrows_calls == 3
+        assert rows[0] == {'id': 1, 'nom': 'PRODUIT 1', 'prix': 1.5, 'notes': None}
+
+    def test_max_records_is_honoured(self):
+        recordset = make_recordset(1234)
+        chunks = list(iter_row_chunks(recordset, chunk_size=500, max_records=700))
+
+        assert [len(chunk) for chunk in chunks] == [500, 200]
+        assert chunks[-1][-1]['id'] == 700
+
+    def test_empty_recordset(self):
+        recordset = make_recordset(0)
+
+        assert fetch_rows_bulk(recordset) == []
+        assert recordset.getrows_calls == 0
+
+    def test_cleaning_applied_per_column(self):
+        recordset = FakeRecordset(['nom', 'prix'], [('  ', float('nan')), (' A ', 2.0)])
+
+        assert fetch_rows_bulk(recordset) == [{'nom': None, 'prix': None}, {'nom': 'A', 'prix': 2.0}]
+
+    def test_converters_follow_ado_field_types(self):
+        paris = dt.timezone(dt.timedelta(hours=1))
+        recordset = FakeRecordset(
+            ['id', 'nom', 'prix', 'remise', 'date_vente', 'jour'],
+            [(7, ' DOLIPRANE ', Decimal('12.50'), float('inf'), dt.datetime(2024, 3, 1, 10, 30, tzinfo=paris),
+              dt.datetime(2024, 3, 1))],
+            field_types=[3, 202, 6, 5, 7, 133]  # Integer, VarWChar, Currency, Double, Date, DBDate
+        )
+
+        assert fetch_rows_bulk(recordset) == [{
+            'id': 7,
+            'nom': 'DOLIPRANE',
+            'prix': 12.5,
+            'remise': None,
+            'date_vente': dt.datetime(2024, 3, 1, 10, 30),
+            'jour': dt.date(2024, 3, 1)
+        }]
+
+    def test_odbc_rows_converted_from_description(self):
+        description = [('id', int), ('nom', str), ('quantite', Decimal), ('date_vente', dt.datetime)]
+        rows = [(1, ' A ', Decimal('3'), dt.datetime(2024, 1, 2)), (2, '', None, None)]
+
+        assert rows_to_dicts(rows, ['id', 'nom', 'quantite', 'date_vente'], build_odbc_converters(description)) == [
+            {'id': 1, 'nom': 'A', 'quantite': 3, 'date_vente': dt.datetime(2024, 1, 2)},
+            {'id': 2, 'nom': None, 'quantite': None, 'date_vente': None}
+        ]
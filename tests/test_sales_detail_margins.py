@@ -0,0 +1,64 @@
+# tests/test_sales_detail_margins.py
+"""
+Tests du calcul vectoriel des marges des détails de ventes
+"""
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.transformers import SalesDetailTransformer
+
+
+@pytest.fixture
+def transformer():
+    return SalesDetailTransformer()
+
+
+class TestFixCalculationsBatch:
+
+    def test_missing_values_are_computed_and_rounded(self, transformer):
+        records = [{'sale_price': 3.85, 'purchase_price': 2.5, 'quantity_sold': 3}]
+
+        mismatches = transformer._fix_calculations_batch(records)
+
+        assert records[0]['line_total'] == Decimal('11.55')
+        assert records[0]['unit_profit'] == Decimal('1.3500')
+        assert records[0]['line_profit'] == Decimal('4.05')
+        assert records[0]['margin_percent'] == Decimal('35.06')
+        assert not any(mismatches.values())
+
+    def test_inconsistent_values_are_counted_and_replaced(self, transformer):
+        records = [
+            {'sale_price': 10.0, 'purchase_price': 6.0, 'quantity_sold': 2, 'line_total': 25.0, 'margin_percent': 40.0},
+            {'sale_price': 10.0, 'purchase_price': 6.0, 'quantity_sold': 2, 'line_total': 20.0, 'margin_percent': 12.0},
+        ]
+
+        mismatches = transformer._fix_calculations_batch(records)
+
+        assert mismatches == {'line_total': 1, 'unit_profit': 0, 'line_profit': 0, 'margin_percent': 1}
+        assert [record['line_total'] for record in records] == [Decimal('20.00'), Decimal('20.00')]
+        assert records[1]['margin_percent'] == Decimal('40.00')
+
+    def test_absent_inputs_leave_fields_untouched(self, transformer):
+        records = [{'sale_price': 0.0, 'quantity_sold': 1}, {'purchase_price': 2.0}]
+
+        transformer._fix_calculations_batch(records)
+
+        assert records[0] == {'sale_price': 0.0, 'quantity_sold': 1, 'line_total': Decimal('0.00')}
+        assert records[1] == {'purchase_price': 2.0}
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_record(self, transformer):
+        row = {'id': 1, 'id_sortie': 2, 'id_produit': 3, 'id_nom': 4, 'prix_vente': '3.8500',
+               'quantite': '2', 'prix_achat': '2.5000', 'benefice_ligne': '9.99'}
+
+        single = await transformer.transform_single_record(dict(row))
+        batch = await transformer.transform_batch([dict(row)])
+
+        for field in ('line_total', 'unit_profit', 'line_profit', 'margin_percent'):
+            assert batch[0][field] == single[field]
@@ -0,0 +1,91 @@
+# tests/test_select_list.py
+"""
+Tests de la projection SELECT sur les colonnes mappées par le transformateur
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.strategies import id_based_sync
+from app.sync.strategies.id_based_sync import IdBasedSyncStrategy
+
+CONFIG = {'table_name': 'products_catalog', 'hfsql_table': 'nomenclature', 'id_field': 'id'}
+
+
+class FakeConnector:
+    """Connecteur HFSQL factice: SELECT TOP 1 * renvoie une ligne (ou rien)"""
+
+    def __init__(self, columns=None, error=None):
+        self.columns = columns or []
+        self.error = error
+        self.queries = []
+
+    async def execute_query(self, query):
+        self.queries.append(query)
+        if self.error:
+            raise self.error
+        return [dict.fromkeys(self.columns)] if self.columns else []
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    id_based_sync._hfsql_columns_cache.clear()
+    id_based_sync._select_list_cache.clear()
+    yield
+    id_based_sync._hfsql_columns_cache.clear()
+    id_based_sync._select_list_cache.clear()
+
+
+class TestSelectList:
+
+    @pytest.mark.asyncio
+    async def test_projection_on_mapped_columns(self):
+        connector = FakeConnector(['ID', 'NOM', 'PRIX_ACHAT', 'PHOTO', 'NOTES'])
+        strategy = IdBasedSyncStrategy(CONFIG, connector, source_fields=['nom', 'prix_achat', 'id'])
+
+        assert await strategy.get_select_list() == 'id, nom, prix_achat'
+
+    @pytest.mark.asyncio
+    async def test_missing_columns_are_skipped(self):
+        connector = FakeConnector(['id', 'nom'])
+        strategy = IdBasedSyncStrategy(CONFIG, connector, source_fields=['nom', 'code_barre'])
+
+        assert await strategy.get_select_list() == 'id, nom'
+
+    @pytest.mark.asyncio
+    async def test_discovery_is_cached_per_table(self):
+        connector = FakeConnector(['id', 'nom', 'prix_achat'])
+
+        await IdBasedSyncStrategy(CONFIG, connector, source_fields=['nom']).get_select_list()
+        await IdBasedSyncStrategy(CONFIG, connector, source_fields=['prix_achat']).get_select_list()
+
+        assert len(connector.queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_without_mapping_select_star(self):
+        connector = FakeConnector(['id', 'nom'])
+
+        assert await IdBasedSyncStrategy(CONFIG, connector).get_select_list() == '*'
+        assert connector.queries == []
+
+    @pytest.mark.asyncio
+    async def test_failed_discovery_falls_back_to_select_star(self):
+        connector = FakeConnector(error=Exception("Erreur HFSQL"))
+        strategy = IdBasedSyncStrategy(CONFIG, connector, source_fields=['nom'])
+
+        assert await strategy.get_select_list() == '*'
+
+    @pytest.mark.asyncio
+    async def test_empty_table_falls_back_and_retries_later(self):
+        connector = FakeConnector()
+        strategy = IdBasedSyncStrategy(CONFIG, connector, source_fields=['nom'])
+
+        assert await strategy.get_select_list() == '*'
+
+        # Premières lignes arrivées: la découverte est retentée
+        connector.columns = ['id', 'nom', 'photo']
+        assert await strategy.get_select_list() == 'id, nom'
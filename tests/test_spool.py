@@ -0,0 +1,71 @@
+# tests/test_spool.py
+"""
+Tests du spool disque des pages HFSQL brutes
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.spool import PageSpool
+
+
+def make_records(first_id, last_id):
+    return [{'id': record_id, 'nom': f"Produit {record_id}", 'prix': 1.5 * record_id}
+            for record_id in range(first_id, last_id + 1)]
+
+
+class TestPageSpool:
+
+    def test_write_read_roundtrip(self, tmp_path):
+        spool = PageSpool(str(tmp_path), max_bytes=1024 * 1024)
+        records = make_records(1, 50)
+
+        page = spool.write('products_catalog', 0, 50, records)
+
+        assert spool.read(page) == records
+        assert spool.used_bytes == page.path.stat().st_size
+
+    def test_replay_chain_follows_checkpoint(self, tmp_path):
+        spool = PageSpool(str(tmp_path), max_bytes=1024 * 1024)
+        spool.write('products_catalog', 0, 10, make_records(1, 10))  # Déjà commitée
+        spool.write('products_catalog', 10, 20, make_records(11, 20))
+        spool.write('products_catalog', 20, 30, make_records(21, 30))
+        spool.write('products_catalog', 35, 40, make_records(36, 40))  # Ne se raccorde pas
+
+        chain = spool.replay_chain('products_catalog', 10)
+
+        assert [(page.after_id, page.last_id) for page in chain] == [(10, 20), (20, 30)]
+        assert len(spool.pages('products_catalog')) == 2
+
+    def test_budget_is_enforced(self, tmp_path):
+        spool = PageSpool(str(tmp_path), max_bytes=600)
+
+        assert spool.write('products_catalog', 0, 10, make_records(1, 10)) is not None
+        assert spool.write('products_catalog', 10, 1000, make_records(11, 1000)) is None
+        assert spool.used_bytes <= 600
+
+    def test_corrupted_page_is_removed(self, tmp_path):
+        spool = PageSpool(str(tmp_path), max_bytes=1024 * 1024)
+        page = spool.write('products_catalog', 0, 10, make_records(1, 10))
+
+        with open(page.path, 'r+b') as spool_file:
+            spool_file.seek(-4, 2)
+            spool_file.write(b'\x00\x00\x00\x00')
+
+        assert spool.read(page) is None
+        assert not page.path.exists()
+        assert spool.used_bytes == 0
+
+    def test_discard_through_and_restart(self, tmp_path):
+        spool = PageSpool(str(tmp_path), max_bytes=1024 * 1024)
+        spool.write('sales_orders', 0, 10, make_records(1, 10))
+        spool.write('sales_orders', 10, 20, make_records(11, 20))
+
+        assert spool.discard_through('sales_orders', 10) == 1
+
+        # Redémarrage: le volume occupé est recalculé depuis le disque
+        restarted = PageSpool(str(tmp_path), max_bytes=1024 * 1024)
+        assert restarted.used_bytes == spool.used_bytes
+        assert [page.last_id for page in restarted.pages('sales_orders')] == [20]
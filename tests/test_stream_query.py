@@ -0,0 +1,187 @@
+# tests/test_stream_query.py
+"""
+Tests de la lecture HFSQL en flux (paquets bornés, fermeture anticipée)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.utils import hfsql_connector2
+from app.utils.hfsql_connector import HFSQLConnector as OleDbConnector
+from app.utils.hfsql_connector2 import HFSQLConnector as OdbcConnector
+from app.sync.strategies.id_based_sync import IdBasedSyncStrategy
+
+
+class InlineExecutor:
+    """Exécuteur COM/ODBC factice: appelle la fonction sur place"""
+
+    async def run(self, function, *args):
+        return function(*args)
+
+
+class FakeField:
+    def __init__(self, name):
+        self.Name = name
+
+
+class FakeFields:
+    def __init__(self, names):
+        self.names = names
+        self.Count = len(names)
+
+    def __getitem__(self, index):
+        return FakeField(self.names[index])
+
+
+class FakeRecordset:
+    """Recordset ADO factice: GetRows, EOF, State, Close"""
+
+    def __init__(self, count):
+        self.rows = [(i, f'PRODUIT {i}') for i in range(1, count + 1)]
+        self.Fields = FakeFields(['id', 'nom'])
+        self.position = 0
+        self.getrows_sizes = []
+        self.State = 1
+
+    @property
+    def EOF(self):
+        return self.position >= len(self.rows)
+
+    def GetRows(self, rows):
+        self.getrows_sizes.append(rows)
+        chunk = self.rows[self.position:self.position + rows]
+        self.position += len(chunk)
+        return tuple(tuple(row[i] for row in chunk) for i in range(2))
+
+    def Close(self):
+        self.State = 0
+
+
+def ole_db_connector(recordset):
+    connector = OleDbConnector()
+    connector.is_connected = True
+    connector.opened = []
+    connector._get_executor = InlineExecutor
+
+    def open_recordset(query, cursor_type):
+        connector.opened.append(cursor_type)
+        return recordset
+
+    connector._open_recordset_sync = open_recordset
+    return connector
+
+
+class FakeCursor:
+    def __init__(self, count):
+        self.rows = [(i, f'PRODUIT {i}') for i in range(1, count + 1)]
+        self.description = [('id', int), ('nom', str)]
+        self.fetch_sizes = []
+        self.closed = False
+
+    def execute(self, query):
+        self.query = query
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeOdbcConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+class TestOleDbStreamQuery:
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_bounded(self):
+        recordset = FakeRecordset(1234)
+        connector = ole_db_connector(recordset)
+
+        chunks = [chunk async for chunk in connector.stream_query("SELECT id, nom FROM nomenclature",
+                                                                  chunk_size=500)]
+
+        assert [len(chunk) for chunk in chunks] == [500, 500, 234]
+        assert chunks[0][0] == {'id': 1, 'nom': 'PRODUIT 1'}
+        assert connector.opened == [0]  # adOpenForwardOnly
+        assert recordset.State == 0
+
+    @pytest.mark.asyncio
+    async def test_chunk_size_is_reevaluated_per_chunk(self):
+        recordset = FakeRecordset(100)
+        connector = ole_db_connector(recordset)
+        sizes = iter([10, 30, 60])
+
+        chunks = [chunk async for chunk in connector.stream_query("SELECT", chunk_size=lambda: next(sizes))]
+
+        assert [len(chunk) for chunk in chunks] == [10, 30, 60]
+
+    @pytest.mark.asyncio
+    async def test_early_aclose_closes_the_recordset(self):
+        recordset = FakeRecordset(10_000)
+        stream = ole_db_connector(recordset).stream_query("SELECT", chunk_size=500)
+
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert recordset.getrows_sizes == [500]
+        assert recordset.State == 0
+
+
+class TestOdbcStreamQuery:
+
+    @pytest.fixture(autouse=True)
+    def inline_executor(self, monkeypatch):
+        monkeypatch.setattr(hfsql_connector2, 'get_odbc_executor', InlineExecutor)
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_bounded(self):
+        cursor = FakeCursor(1234)
+        connector = OdbcConnector()
+        connector.connection = FakeOdbcConnection(cursor)
+
+        chunks = [chunk async for chunk in connector.stream_query("SELECT id, nom FROM nomenclature", 500)]
+
+        assert [len(chunk) for chunk in chunks] == [500, 500, 234]
+        assert chunks[-1][-1] == {'id': 1234, 'nom': 'PRODUIT 1234'}
+        assert cursor.closed
+
+    @pytest.mark.asyncio
+    async def test_early_aclose_closes_the_cursor(self):
+        cursor = FakeCursor(10_000)
+        connector = OdbcConnector()
+        connector.connection = FakeOdbcConnection(cursor)
+        stream = connector.stream_query("SELECT", 500)
+
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert cursor.fetch_sizes == [500]
+        assert cursor.closed
+
+
+class TestStreamNewRecords:
+
+    @pytest.mark.asyncio
+    async def test_batch_size_changes_apply_to_the_next_chunk(self):
+        connector = ole_db_connector(FakeRecordset(100))
+        strategy = IdBasedSyncStrategy({'table_name': 'products_catalog', 'hfsql_table': 'nomenclature',
+                                        'batch_size': 10}, connector)
+
+        sizes = []
+        async for records in strategy.stream_new_records(0, max_rows=100):
+            sizes.append(len(records))
+            strategy.batch_size = 40  # Taille adaptative réglée par le gestionnaire
+
+        assert sizes == [10, 40, 40, 10]
@@ -0,0 +1,79 @@
+# tests/test_string_cache.py
+"""
+Tests du cache de chaînes nettoyées partagé entre transformateurs
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.transformers.string_cache import StringCleanCache, reset_string_cache, get_string_cache
+from app.sync.transformers import SalesDetailTransformer
+
+
+def fresh(text):
+    """Nouvel objet chaîne, comme une valeur renvoyée par le pilote"""
+    return ''.join(list(text))
+
+
+@pytest.fixture(autouse=True)
+def restore_cache():
+    yield
+    reset_string_cache()
+
+
+class TestStringCleanCache:
+
+    def test_results_are_cleaned_and_shared(self):
+        cache = StringCleanCache(100)
+
+        first = cache.clean(fresh(' DOLIPRANE\x00 1000 '), 255)
+        second = cache.clean(fresh(' DOLIPRANE\x00 1000 '), 255)
+
+        assert first == 'DOLIPRANE 1000'
+        assert first is second
+        assert cache.get_status()['hits'] == 1
+
+    def test_max_length_is_part_of_the_key(self):
+        cache = StringCleanCache(100)
+
+        assert cache.clean('ABCDEF', 3) == 'ABC'
+        assert cache.clean('ABCDEF', 255) == 'ABCDEF'
+
+    def test_size_is_bounded(self):
+        cache = StringCleanCache(10)
+
+        for index in range(50):
+            cache.clean(f'PRODUIT {index}', 255)
+
+        assert cache.get_status()['size'] == 10
+
+
+class TestTransformersShareCache:
+
+    @pytest.mark.asyncio
+    async def test_repeated_values_share_one_object(self):
+        reset_string_cache(1000)
+        rows = [{'id': record_id, 'id_sortie': 1, 'id_produit': 2, 'id_nom': 3, 'prix_vente': '2.00',
+                 'quantite': '1', 'nom_produit': fresh(' PRODUIT A '), 'type_vente': fresh('CHIFA ')}
+                for record_id in range(1, 4)]
+
+        transformed = await SalesDetailTransformer().transform_batch(rows)
+
+        names = [record['product_name'] for record in transformed]
+        assert names == ['PRODUIT A'] * 3
+        assert names[0] is names[1] is names[2]
+        assert get_string_cache().get_status()['hits'] >= 4
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache(self):
+        assert reset_string_cache(0) is None
+        assert get_string_cache() is None
+
+        transformed = await SalesDetailTransformer().transform_batch(
+            [{'id': 1, 'id_sortie': 1, 'id_produit': 2, 'id_nom': 3, 'nom_produit': ' PRODUIT A '}])
+
+        assert transformed[0]['product_name'] == 'PRODUIT A'
@@ -0,0 +1,73 @@
+# tests/test_sync_drain.py
+"""
+Tests de la sync en mode drain (budget lignes/temps, checkpoint par page, retard restant)
+"""
+import pytest
+
+from conftest import product_rows
+
+
+@pytest.fixture
+def table_sync(make_table_sync):
+    """products_catalog depuis 10 lignes HFSQL en mémoire, par pages de 2"""
+    return make_table_sync(product_rows(1, 10), batch_size=2, max_rows_per_cycle=1000,
+                           max_seconds_per_cycle=60)
+
+
+class TestDrainMode:
+
+    @pytest.mark.asyncio
+    async def test_drains_until_hfsql_is_exhausted(self, table_sync):
+        result = await table_sync.sync_single_table(table_sync.table_config)
+
+        assert result.status == 'SUCCESS'
+        assert result.pages_processed == 5
+        assert result.last_sync_id == 10
+        assert result.remaining_lag == 0
+        # Table épuisée: MAX(id) HFSQL non interrogé
+        assert table_sync.max_id_queries == 0
+
+    @pytest.mark.asyncio
+    async def test_row_budget_stops_the_cycle(self, table_sync):
+        table_sync.table_config['max_rows_per_cycle'] = 4
+
+        result = await table_sync.sync_single_table(table_sync.table_config)
+
+        assert result.pages_processed == 2
+        assert table_sync.state['last_sync_id'] == 4
+        assert result.remaining_lag == 6
+
+        # Le cycle suivant reprend au checkpoint
+        result = await table_sync.sync_single_table(table_sync.table_config)
+        assert table_sync.loaded == list(range(1, 9))
+        assert result.remaining_lag == 2
+
+    @pytest.mark.asyncio
+    async def test_time_budget_stops_after_the_current_page(self, table_sync):
+        table_sync.table_config['max_seconds_per_cycle'] = 0
+
+        result = await table_sync.sync_single_table(table_sync.table_config)
+
+        assert result.pages_processed == 1
+        assert table_sync.state['last_sync_id'] == 2
+        assert result.remaining_lag == 8
+
+    @pytest.mark.asyncio
+    async def test_each_page_is_checkpointed(self, table_sync):
+        table_sync.fail_ids = {5}
+
+        result = await table_sync.sync_single_table(table_sync.table_config)
+
+        # Pages 1-2 et 3-4 commitées avant l'échec de la page 5-6
+        assert result.status == 'ERROR'
+        assert table_sync.loaded == [1, 2, 3, 4]
+        assert table_sync.state['last_sync_id'] == 4
+
+    @pytest.mark.asyncio
+    async def test_single_page_without_drain_mode(self, table_sync):
+        table_sync.table_config['drain_mode'] = False
+
+        result = await table_sync.sync_single_table(table_sync.table_config)
+
+        assert result.pages_processed == 1
+        assert result.last_sync_id == 2
@@ -0,0 +1,92 @@
+# tests/test_sync_pipeline.py
+"""
+Tests du pipeline extraction → transformation → chargement
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.pipeline import SyncPipeline
+
+
+class FakeSource:
+    """Flux HFSQL factice: chaque page coûte extract_seconds"""
+
+    def __init__(self, pages, extract_seconds=0.0, fail_at=None):
+        self.pages = pages
+        self.extract_seconds = extract_seconds
+        self.fail_at = fail_at
+        self.extracted = 0
+        self.closed = False
+
+    async def _generate(self):
+        try:
+            for index in range(self.pages):
+                await asyncio.sleep(self.extract_seconds)
+                if index == self.fail_at:
+                    raise Exception("Erreur lecture HFSQL")
+                self.extracted += 1
+                yield [{'id': index * 10 + i} for i in range(1, 11)]
+        finally:
+            self.closed = True
+
+    def __aiter__(self):
+        self._iterator = self._generate()
+        return self._iterator
+
+    async def aclose(self):
+        await self._iterator.aclose()
+
+
+async def double_ids(records):
+    return [{'hfsql_id': record['id'] * 2} for record in records]
+
+
+class TestSyncPipeline:
+
+    @pytest.mark.asyncio
+    async def test_extraction_overlaps_loading(self):
+        source = FakeSource(pages=4, extract_seconds=0.1)
+        checkpoints = []
+
+        start = time.perf_counter()
+        async for records, transformed in SyncPipeline(double_ids).run(source):
+            await asyncio.sleep(0.1)  # Chargement PostgreSQL simulé
+            checkpoints.append(max(record['id'] for record in records))
+        elapsed = time.perf_counter() - start
+
+        # Séquentiel: 4 × (0.1 + 0.1) = 0.8s; en pipeline ≈ 0.5s
+        assert elapsed < 0.7
+        assert checkpoints == [10, 20, 30, 40]
+
+    @pytest.mark.asyncio
+    async def test_bounded_queues_limit_read_ahead(self):
+        source = FakeSource(pages=20)
+        pipeline = SyncPipeline(double_ids, queue_size=1)
+        pages = pipeline.run(source)
+
+        await pages.__anext__()
+        await asyncio.sleep(0.05)  # Laisser les étages amont avancer au maximum
+
+        # Page consommée + une par file + une en attente dans chaque étage
+        assert source.extracted <= 5
+        await pages.aclose()
+        assert source.closed
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_is_raised_after_loaded_pages(self):
+        source = FakeSource(pages=5, fail_at=2)
+        checkpoints = []
+
+        with pytest.raises(Exception, match="Erreur lecture HFSQL"):
+            async for records, transformed in SyncPipeline(double_ids).run(source):
+                checkpoints.append(max(record['id'] for record in records))
+
+        assert checkpoints == [10, 20]
+        assert source.closed
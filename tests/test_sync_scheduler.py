@@ -0,0 +1,81 @@
+# tests/test_sync_scheduler.py
+"""
+Tests du planificateur par table (intervalle propre, fusion des déclenchements)
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.scheduler import SynergoSyncScheduler
+from app.sync.sync_manager import SyncResult
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = SynergoSyncScheduler()
+    scheduler.change_watcher = None
+    scheduler.runs = []
+    scheduler.sync_seconds = 0.0
+
+    async def fake_sync_tables(table_keys):
+        scheduler.runs.append(list(table_keys))
+        await asyncio.sleep(scheduler.sync_seconds)
+        return [SyncResult(table_name=table_key, status='NO_CHANGES') for table_key in table_keys]
+
+    monkeypatch.setattr(scheduler.sync_manager, 'sync_tables', fake_sync_tables)
+
+    # Intervalles en secondes: produits 0.3s, ventes 0.1s, autres jamais pendant le test
+    for table_key, config in scheduler.sync_manager.sync_tables_config.items():
+        config['sync_interval_minutes'] = 10
+    scheduler.sync_manager.sync_tables_config['products_catalog']['sync_interval_minutes'] = 0.3 / 60
+    scheduler.sync_manager.sync_tables_config['sales_details']['sync_interval_minutes'] = 0.1 / 60
+    return scheduler
+
+
+async def run_for(scheduler, seconds):
+    task = asyncio.create_task(scheduler.start_scheduler())
+    await asyncio.sleep(seconds)
+    await scheduler.stop_scheduler()
+    await task
+
+
+def count_runs(scheduler, table_key):
+    return sum(table_key in run for run in scheduler.runs)
+
+
+class TestSynergoSyncScheduler:
+
+    @pytest.mark.asyncio
+    async def test_each_table_follows_its_own_interval(self, scheduler):
+        await run_for(scheduler, 0.65)
+
+        assert set(scheduler.runs[0]) == set(scheduler.sync_manager.sync_tables_config)
+        assert count_runs(scheduler, 'sales_details') >= 5
+        assert count_runs(scheduler, 'products_catalog') == 3
+        assert count_runs(scheduler, 'sales_orders') == 1
+
+    @pytest.mark.asyncio
+    async def test_overlapping_triggers_are_coalesced(self, scheduler):
+        scheduler.sync_seconds = 0.25  # Sync plus longue que l'intervalle des ventes
+
+        await run_for(scheduler, 0.6)
+
+        # Jamais deux syncs simultanées d'une même table, pas de rattrapage empilé
+        assert count_runs(scheduler, 'sales_details') <= 3
+
+    @pytest.mark.asyncio
+    async def test_status_exposes_next_due_per_table(self, scheduler):
+        task = asyncio.create_task(scheduler.start_scheduler())
+        await asyncio.sleep(0.05)
+
+        status = scheduler.get_status()
+        assert set(status['tables_next_due']) == set(scheduler.sync_manager.sync_tables_config)
+        assert status['next_sync_time'] == min(status['tables_next_due'].values())
+
+        await scheduler.stop_scheduler()
+        await task
@@ -0,0 +1,79 @@
+# tests/test_sync_scheduling.py
+"""
+Tests de l'ordonnancement des tables selon les dépendances FK
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.sync_manager import SynergoSyncManager, SyncResult
+
+
+@pytest.fixture
+def sync_manager(monkeypatch):
+    manager = SynergoSyncManager()
+    manager.started = {}
+    manager.finished = {}
+
+    async def fake_sync_single_table(config):
+        manager.started[config['table_name']] = time.perf_counter()
+        await asyncio.sleep(0.1)
+        manager.finished[config['table_name']] = time.perf_counter()
+        return SyncResult(table_name=config['table_name'], status='NO_CHANGES')
+
+    async def noop(*args):
+        pass
+
+    monkeypatch.setattr(manager, 'sync_single_table', fake_sync_single_table)
+    monkeypatch.setattr(manager, '_log_sync_summary', noop)
+    monkeypatch.setattr(manager, '_trigger_analytics_refresh', noop)
+    return manager
+
+
+class TestSyncOrder:
+
+    def test_parents_come_first(self, sync_manager):
+        order = sync_manager.get_sync_order()
+
+        for table_key, config in sync_manager.sync_tables_config.items():
+            for dependency in config['depends_on']:
+                assert order.index(dependency) < order.index(table_key)
+
+    def test_cycle_is_rejected(self, sync_manager):
+        sync_manager.sync_tables_config['products_catalog']['depends_on'] = ['sales_details']
+
+        with pytest.raises(ValueError, match="circulaires"):
+            sync_manager.get_sync_order()
+
+
+class TestSyncAllActiveTables:
+
+    @pytest.mark.asyncio
+    async def test_independent_tables_run_concurrently(self, sync_manager):
+        sync_manager.hfsql_pool.max_size = 4
+
+        start = time.perf_counter()
+        results = await sync_manager.sync_all_active_tables()
+        elapsed = time.perf_counter() - start
+
+        # Chaîne la plus longue: produits → en-têtes → détails = 3 × 0.1s (5 × 0.1s en séquentiel)
+        assert elapsed < 0.45
+        assert len(results) == 5
+        for table_key, config in sync_manager.sync_tables_config.items():
+            for dependency in config['depends_on']:
+                assert sync_manager.started[table_key] >= sync_manager.finished[dependency]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_by_pool_size(self, sync_manager):
+        sync_manager.hfsql_pool.max_size = 1
+
+        start = time.perf_counter()
+        await sync_manager.sync_all_active_tables()
+
+        assert time.perf_counter() - start >= 0.5
@@ -0,0 +1,73 @@
+# tests/test_transform_executor.py
+"""
+Tests de l'étage de transformation multi-processus
+"""
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le backend au path
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from app.sync.transform_executor import TransformExecutor, split_chunks
+from app.sync.transformers import PurchaseDetailTransformer
+
+
+def make_rows(count):
+    return [{'id': record_id, 'id_produit': record_id % 7, 'nom_produit': f' PRODUIT {record_id} ',
+             'prix_achat': '2,50', 'type_entree': 'ACHAT'} for record_id in range(1, count + 1)]
+
+
+def without_timestamps(records):
+    return [{key: value for key, value in record.items() if key not in ('last_synced_at', 'created_at')}
+            for record in records]
+
+
+class TestSplitChunks:
+
+    def test_chunks_are_contiguous(self):
+        records = list(range(10))
+
+        chunks = split_chunks(records, max_chunks=3, min_chunk_rows=2)
+
+        assert len(chunks) == 3
+        assert [record for chunk in chunks for record in chunk] == records
+
+    def test_min_chunk_rows_limits_chunk_count(self):
+        assert len(split_chunks(list(range(10)), max_chunks=8, min_chunk_rows=5)) == 2
+        assert len(split_chunks(list(range(3)), max_chunks=8, min_chunk_rows=5)) == 1
+
+
+class TestTransformExecutor:
+
+    def test_transformer_is_picklable(self):
+        transformer = pickle.loads(pickle.dumps(PurchaseDetailTransformer()))
+
+        assert transformer.get_source_fields()[0] == 'id'
+
+    @pytest.mark.asyncio
+    async def test_small_batch_stays_in_process(self):
+        executor = TransformExecutor(max_workers=2, min_rows=100, enabled=True)
+
+        transformed = await executor.transform(PurchaseDetailTransformer(), make_rows(10))
+
+        assert len(transformed) == 10
+        assert executor.batches_in_process == 1
+        assert executor.get_status()['pool_started'] is False
+
+    @pytest.mark.asyncio
+    async def test_large_batch_matches_in_process_order(self):
+        executor = TransformExecutor(max_workers=2, min_rows=100, min_chunk_rows=50, enabled=True)
+        transformer = PurchaseDetailTransformer()
+        rows = make_rows(300)
+
+        try:
+            pooled = await executor.transform(transformer, rows)
+        finally:
+            executor.shutdown()
+
+        assert executor.batches_in_pool == 1
+        assert [record['hfsql_id'] for record in pooled] == list(range(1, 301))
+        assert without_timestamps(pooled) == without_timestamps(await transformer.transform_batch(rows))